@@ -0,0 +1,6 @@
+"""Benchmarks of uroboros.
+
+Run each benchmark as a module from the root of this repository.
+
+    $ python -m benchmarks.lazy_initialization
+"""
@@ -0,0 +1,98 @@
+"""Measure the cost of the generated bash completion per key stroke.
+
+Build a tree whose root has many sub commands, each with a few options,
+and generate its bash completion script. The script is sourced once as
+a shell does, then the completion function is called repeatedly.
+"""
+import argparse
+import shutil
+import subprocess
+import sys
+import time
+
+from typing import TYPE_CHECKING
+
+import uroboros
+from uroboros import completion
+
+if TYPE_CHECKING:
+    from typing import List, Tuple
+
+
+class LeafCommand(uroboros.Command):
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.short_description = 'Sub command {}'.format(name)
+
+    def build_option(self, parser):
+        parser.add_argument('--value', type=int, default=0)
+        parser.add_argument('--mode', choices=['fast', 'slow'])
+        parser.add_argument('--flag', action='store_true', default=False)
+        return parser
+
+    def run(self, args):
+        return uroboros.ExitStatus.SUCCESS
+
+
+class RootCommand(uroboros.Command):
+    name = 'root'
+
+    def run(self, args):
+        return uroboros.ExitStatus.SUCCESS
+
+
+def build_tree(width: int) -> 'uroboros.Command':
+    root = RootCommand()
+    root.add_command(*[LeafCommand('cmd{}'.format(i)) for i in range(width)])
+    return root
+
+
+def run_bash(script: str, words: 'List[str]', number: int) -> float:
+    """Return seconds to source the script and complete `number` times"""
+    source = '\n'.join([
+        script,
+        'COMP_WORDS=({})'.format(' '.join(words)),
+        'COMP_CWORD={}'.format(len(words) - 1),
+        'for ((n = 0; n < {}; n++)); do'.format(number),
+        '    _uroboros_complete_root',
+        'done',
+    ])
+    start = time.perf_counter()
+    subprocess.run(['bash'], input=source.encode(), check=True)
+    return time.perf_counter() - start
+
+
+def measure(width: int, number: int) -> 'Tuple[float, float, float]':
+    """Return seconds to generate the script, to source it and to complete
+    a word on average"""
+    root = build_tree(width)
+    start = time.perf_counter()
+    script = completion.generate(root, 'bash')
+    generate = time.perf_counter() - start
+    # Complete a value of the option of the last sub command
+    words = ['root', 'cmd{}'.format(width - 1), '--mode', "''"]
+    source = run_bash(script, words, 0)
+    total = run_bash(script, words, number)
+    return generate, source, (total - source) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--widths', type=int, nargs='+',
+                        default=[10, 100, 1000])
+    parser.add_argument('--number', type=int, default=100)
+    args = parser.parse_args()
+    if shutil.which('bash') is None:
+        sys.exit('bash is not installed.')
+    print('{:>8} {:>14} {:>12} {:>14}'.format(
+        'width', 'generate [ms]', 'source [ms]', 'complete [ms]'))
+    for width in args.widths:
+        generate, source, complete = measure(width, args.number)
+        print('{:>8} {:>14.3f} {:>12.3f} {:>14.3f}'.format(
+            width, generate * 1000, source * 1000, complete * 1000))
+
+
+if __name__ == '__main__':
+    main()
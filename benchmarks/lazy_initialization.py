@@ -0,0 +1,71 @@
+"""Compare the startup cost of eager and lazy initialization.
+
+Build a root command which has many sibling sub commands, then execute one
+of them. The cost of lazy initialization should stay flat as the number of
+siblings grows. Building the tree itself is not included.
+"""
+import argparse
+import timeit
+
+import uroboros
+
+
+class LeafCommand(uroboros.Command):
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.short_description = 'Sub command {}'.format(name)
+
+    def build_option(self, parser):
+        parser.add_argument('--value', type=int, default=0)
+        parser.add_argument('--flag', action='store_true', default=False)
+        return parser
+
+    def run(self, args):
+        return uroboros.ExitStatus.SUCCESS
+
+
+class EagerRootCommand(uroboros.Command):
+    name = 'root'
+
+    def run(self, args):
+        return uroboros.ExitStatus.SUCCESS
+
+
+class LazyRootCommand(EagerRootCommand):
+    lazy_initialization = True
+
+
+def build_tree(root_class, width: int) -> 'uroboros.Command':
+    root = root_class()
+    root.add_command(*[LeafCommand('cmd{}'.format(i)) for i in range(width)])
+    return root
+
+
+def measure(root_class, width: int, number: int) -> float:
+    """Return the average seconds to initialize a tree and execute a leaf"""
+    argv = ['cmd0', '--value', '1']
+    total = 0.0
+    for _ in range(number):
+        root = build_tree(root_class, width)
+        total += timeit.timeit(lambda: root.execute(argv), number=1)
+    return total / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--widths', type=int, nargs='+',
+                        default=[10, 100, 1000])
+    parser.add_argument('--number', type=int, default=5)
+    args = parser.parse_args()
+    print('{:>8} {:>12} {:>12}'.format('width', 'eager [ms]', 'lazy [ms]'))
+    for width in args.widths:
+        eager = measure(EagerRootCommand, width, args.number)
+        lazy = measure(LazyRootCommand, width, args.number)
+        print('{:>8} {:>12.3f} {:>12.3f}'.format(
+            width, eager * 1000, lazy * 1000))
+
+
+if __name__ == '__main__':
+    main()
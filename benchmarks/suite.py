@@ -0,0 +1,214 @@
+"""Benchmark suite for startup, initialization and dispatch.
+
+Each case generates a synthetic tree of the given shape and measures:
+
+- build: building the tree with `add_command`
+- initialize: `Command.initialize` of the whole tree
+- leaf: `execute` of the last leaf in a new tree
+- help: `execute` printing the help of the last leaf in a new tree
+- error: `execute` failing to parse the arguments in a new tree
+- peak_memory: peak bytes allocated to build and initialize the tree
+
+The import time of `uroboros` is measured in new interpreters.
+Times are the minimum of the repeats in seconds.
+
+    # Measure and store the results
+    $ python -m benchmarks.suite --output baseline.json
+    # Measure and compare with the baseline
+    $ python -m benchmarks.suite --baseline baseline.json
+
+The comparison exits with 1 if any metric is worse than the baseline by
+more than the threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+import uroboros
+
+from benchmarks.trees import build_tree, leaf_argv
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple
+
+# name: (width, depth, options, shared, lazy)
+CASES = {
+    'small': (5, 2, 1, False, False),
+    'wide': (1000, 1, 2, False, False),
+    'wide_lazy': (1000, 1, 2, False, True),
+    'deep': (1, 300, 1, False, False),
+    'balanced': (10, 3, 2, False, False),
+    'many_options': (100, 1, 20, False, False),
+    'shared_options': (100, 1, 20, True, False),
+    'wide_shared': (300, 1, 40, True, False),
+}
+
+_IMPORT_SCRIPT = (
+    'import time; start = time.perf_counter(); import uroboros; '
+    'print(time.perf_counter() - start)')
+
+
+def measure_import(repeat: int) -> float:
+    """Return seconds to import uroboros in a new interpreter"""
+    times = []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', _IMPORT_SCRIPT])
+        times.append(float(out))
+    return min(times)
+
+
+def _min_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _execute(root: 'uroboros.Command', argv: 'List[str]'):
+    """Execute the command without writing to stdout and stderr"""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        try:
+            root.execute(argv)
+        except SystemExit:
+            pass
+
+
+def _timed_initialize(spec: tuple, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        root = build_tree(*spec)
+        start = time.perf_counter()
+        root.initialize()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _timed_execute(spec: tuple, argv: 'List[str]', repeat: int) -> float:
+    """Measure `execute` of new trees, excluding building them"""
+    times = []
+    for _ in range(repeat):
+        root = build_tree(*spec)
+        start = time.perf_counter()
+        _execute(root, argv)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _peak_memory(spec: tuple) -> int:
+    tracemalloc.start()
+    try:
+        build_tree(*spec).initialize()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_case(spec: tuple, repeat: int) -> 'Dict[str, float]':
+    width, depth = spec[:2]
+    argv = leaf_argv(width, depth)
+    return {
+        'build': _min_time(lambda: build_tree(*spec), repeat),
+        'initialize': _timed_initialize(spec, repeat),
+        'leaf': _timed_execute(spec, argv, repeat),
+        'help': _timed_execute(spec, argv[:depth] + ['--help'], repeat),
+        'error': _timed_execute(spec, argv[:depth] + ['--unknown'], repeat),
+        'peak_memory': _peak_memory(spec),
+    }
+
+
+def run(cases: 'List[str]', repeat: int) -> 'Dict[str, Any]':
+    results = {'import': {'time': measure_import(repeat)}}
+    for name in cases:
+        results[name] = measure_case(CASES[name], repeat)
+    return {
+        'meta': {
+            'uroboros': uroboros.version,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current: 'Dict[str, Any]',
+            baseline: 'Dict[str, Any]',
+            threshold: float) -> 'List[Tuple[str, str, float, float]]':
+    """Return the metrics which are worse than the baseline by more than
+    the threshold (e.g. 0.2 for 20%)."""
+    regressions = []
+    for case, metrics in current['results'].items():
+        base_metrics = baseline['results'].get(case, {})
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if base and value > base * (1 + threshold):
+                regressions.append((case, metric, base, value))
+    return regressions
+
+
+def _format(metric: str, value: float) -> str:
+    if metric == 'peak_memory':
+        return '{:.1f} KiB'.format(value / 1024)
+    return '{:.3f} ms'.format(value * 1000)
+
+
+def print_results(data: 'Dict[str, Any]',
+                  baseline: 'Optional[Dict[str, Any]]' = None):
+    for case, metrics in data['results'].items():
+        for metric, value in metrics.items():
+            line = '{:<16} {:<12} {:>14}'.format(
+                case, metric, _format(metric, value))
+            base = None if baseline is None \
+                else baseline['results'].get(case, {}).get(metric)
+            if base:
+                line += ' {:>+8.1%}'.format(value / base - 1)
+            print(line)
+
+
+def main(argv: 'Optional[List[str]]' = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES),
+                        default=list(CASES), help='cases to measure')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of repeats of each measurement')
+    parser.add_argument('--output', metavar='FILE',
+                        help='write the results as JSON to FILE')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare the results with FILE')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='ratio of allowed regression (default: 0.2)')
+    args = parser.parse_args(argv)
+    data = run(args.cases, args.repeat)
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(data, baseline)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+    if baseline is None:
+        return 0
+    regressions = compare(data, baseline, args.threshold)
+    for case, metric, base, value in regressions:
+        print('Regression: {} {} {} -> {}'.format(
+            case, metric, _format(metric, base), _format(metric, value)),
+            file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
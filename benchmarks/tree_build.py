@@ -0,0 +1,76 @@
+"""Measure the time to build wide command trees.
+
+Commands are generated and added one by one as a service catalog does.
+The cost per command should stay flat as the number of commands grows.
+Use `--disable-gc` to exclude the cost of the garbage collector, which
+grows with the number of live objects.
+"""
+import argparse
+import gc
+import math
+import time
+
+import uroboros
+
+
+class GeneratedCommand(uroboros.Command):
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def run(self, args):
+        return uroboros.ExitStatus.SUCCESS
+
+
+def build_flat(size: int) -> 'uroboros.Command':
+    """Add all commands to the root one by one"""
+    root = GeneratedCommand('root')
+    for i in range(size):
+        root.add_command(GeneratedCommand('cmd{}'.format(i)))
+    return root
+
+
+def build_nested(size: int) -> 'uroboros.Command':
+    """Build groups of commands first, then add the groups to the root"""
+    width = int(math.sqrt(size))
+    root = GeneratedCommand('root')
+    for i in range(width):
+        group = GeneratedCommand('group{}'.format(i))
+        for j in range(width):
+            group.add_command(GeneratedCommand('cmd{}'.format(j)))
+        root.add_command(group)
+    return root
+
+
+def measure(build, size: int, disable_gc: bool) -> float:
+    gc.collect()
+    if disable_gc:
+        gc.disable()
+    try:
+        start = time.perf_counter()
+        build(size)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10000, 50000, 100000])
+    parser.add_argument('--disable-gc', action='store_true')
+    args = parser.parse_args()
+    print('{:>8} {:>10} {:>14} {:>10} {:>14}'.format(
+        'size', 'flat [ms]', 'flat [us/cmd]', 'nested [ms]',
+        'nested [us/cmd]'))
+    for size in args.sizes:
+        flat = measure(build_flat, size, args.disable_gc)
+        nested = measure(build_nested, size, args.disable_gc)
+        print('{:>8} {:>10.1f} {:>14.2f} {:>10.1f} {:>14.2f}'.format(
+            size, flat * 1000, flat / size * 1e6,
+            nested * 1000, nested / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
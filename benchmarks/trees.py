@@ -0,0 +1,89 @@
+"""Synthetic command trees for benchmarks."""
+from typing import TYPE_CHECKING
+
+import uroboros
+
+if TYPE_CHECKING:
+    from typing import List
+
+
+class GeneratedOption(uroboros.Option):
+    """Option adding a few arguments with a unique prefix"""
+
+    def __init__(self, prefix: str = 'opt'):
+        super().__init__()
+        self.prefix = prefix
+
+    def build_option(self, parser):
+        parser.add_argument('--{}-value'.format(self.prefix),
+                            type=int, default=0)
+        parser.add_argument('--{}-flag'.format(self.prefix),
+                            action='store_true', default=False)
+        return parser
+
+
+def shared_option_class(index: int) -> type:
+    """Return an option class which is instantiated once per tree"""
+    def __init__(self):
+        GeneratedOption.__init__(self, 'shared{}'.format(index))
+    return type('SharedOption{}'.format(index), (GeneratedOption,),
+                {'__init__': __init__})
+
+
+class GeneratedCommand(uroboros.Command):
+
+    def __init__(self, name: str, options: list):
+        super().__init__()
+        self.name = name
+        self.short_description = 'Generated command {}'.format(name)
+        self.options = options
+
+    def build_option(self, parser):
+        parser.add_argument('--value', type=int, default=0)
+        return parser
+
+    def run(self, args):
+        return uroboros.ExitStatus.SUCCESS
+
+
+def build_tree(width: int,
+               depth: int,
+               options: int = 0,
+               shared: bool = False,
+               lazy: bool = False) -> 'uroboros.Command':
+    """Build a tree in which each command has `width` sub commands down to
+    `depth` layers.
+
+    Args:
+        width (int): Number of sub commands of each command
+        depth (int): Number of layers below the root
+        options (int): Number of options of each command
+        shared (bool): Give options as classes shared in the tree instead
+            of instances for each command
+        lazy (bool): Initialize the tree lazily
+    """
+    option_classes = [shared_option_class(i) for i in range(options)]
+
+    def make_options():
+        if shared:
+            return list(option_classes)
+        return [GeneratedOption('opt{}'.format(i)) for i in range(options)]
+
+    root = GeneratedCommand('root', make_options())
+    root.lazy_initialization = lazy
+    layer = [root]
+    for _ in range(depth):
+        next_layer = []
+        for cmd in layer:
+            sub_commands = [GeneratedCommand('cmd{}'.format(i),
+                                             make_options())
+                            for i in range(width)]
+            cmd.add_command(*sub_commands)
+            next_layer.extend(sub_commands)
+        layer = next_layer
+    return root
+
+
+def leaf_argv(width: int, depth: int) -> 'List[str]':
+    """Arguments to execute the last leaf of the tree"""
+    return ['cmd{}'.format(width - 1)] * depth + ['--value', '1']
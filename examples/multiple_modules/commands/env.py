@@ -1,7 +1,5 @@
 from uroboros import Command, ExitStatus
 
-from .envs import get, list_
-
 
 class EnvCommand(Command):
 
@@ -17,6 +15,12 @@ class EnvCommand(Command):
 
 command = EnvCommand()
 command.add_command(
-    get.command,
-    list_.command
+    'commands.envs.get:command',
+    name='get',
+    short_description='Show value',
+)
+command.add_command(
+    'commands.envs.list_:command',
+    name='list',
+    short_description='Show all vars',
 )
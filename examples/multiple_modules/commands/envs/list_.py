@@ -15,12 +15,13 @@ class ListCommand(Command):
 
     def run(self, args):
         env_vars = os.environ
+        # Records are written in the format given by `--output`
         if args.key_only:
             for key in env_vars.keys():
-                print(key)
+                self.out.emit({'name': key})
         else:
             for key, val in env_vars.items():
-                print("{}={}".format(key, val))
+                self.out.emit({'name': key, 'value': val})
         return ExitStatus.SUCCESS
 
 
@@ -12,6 +12,12 @@ class RootCommand(uroboros.Command):
     long_description = 'Sample of uroboros. ' \
                        'Use multiple modules to make this app'
 
+    # Build the parsers of the specified commands only
+    lazy_initialization = True
+
+    # Add `--output FORMAT` option for the records of `env list`
+    allow_output = True
+
     def build_option(self, parser):
         parser.add_argument('--version',
                             action='store_true',
@@ -1,11 +1,18 @@
-from commands import root, version, env
+from commands import root
 
 
 def main():
     root_cmd = root.command
+    # Modules of these commands are imported only when they are used.
     root_cmd.add_command(
-        version.command,
-        env.command
+        'commands.version:command',
+        name='version',
+        short_description='Print version',
+    )
+    root_cmd.add_command(
+        'commands.env:command',
+        name='env',
+        short_description='Get or set env vars',
     )
     return root_cmd.execute()
 
@@ -0,0 +1,13 @@
+"""Commands registered by import strings in tests.
+
+Do not import this module from other test modules.
+"""
+from .base import SecondCommand, ThirdCommand
+
+
+class LazySecondCommand(SecondCommand):
+    short_description = 'second command'
+
+
+command = LazySecondCommand()
+command.add_command(ThirdCommand())
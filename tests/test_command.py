@@ -1,10 +1,17 @@
 import argparse
+import asyncio
+import collections
+import gc
+import io
 import logging
+import sys
+import time
+import weakref
 from unittest import mock
 
 import pytest
 
-from uroboros import Option
+from uroboros import Command, ExitStatus, Option
 from uroboros.errors import CommandDuplicateError
 from .base import RootCommand, SecondCommand, ThirdCommand
 
@@ -159,6 +166,17 @@ class TestCommand(object):
         expected = set([id(c) for c in add_commands])
         assert actual == expected
 
+    def test_add_sub_tree(self):
+        root, second, third = RootCommand(), SecondCommand(), ThirdCommand()
+        # Build the sub tree before adding it to the root
+        second.add_command(third)
+        assert third._layer == 1
+        root.add_command(second)
+        assert [root._layer, second._layer, third._layer] == [0, 1, 2]
+        assert third._parent_ids == {id(root), id(second), id(third)}
+        with pytest.raises(CommandDuplicateError):
+            third.add_command(root)
+
     def test_add_others(self):
         root = RootCommand()
         with pytest.raises(AssertionError):
@@ -332,6 +350,55 @@ class TestCommand(object):
             key = "after_validate_{}".format(cmd.name)
             assert getattr(args, key, None) == cmd.value
 
+    def test_hook_chain(self):
+        class Opt(Opt1):
+            def after_validate(self, safe_args):
+                return safe_args
+
+        class Cmd(Command):
+            name = 'cmd'
+
+            def run(self, args):
+                return ExitStatus.SUCCESS
+
+        opt = Opt()
+        root, cmd = RootCommand(), Cmd()
+        cmd.options = [Opt1(), opt]
+        chain = root._hook_chain([root, cmd])
+        # Hooks which are not overridden are dropped
+        assert chain['before_validate'] == [root.before_validate]
+        assert chain['validate'] == [root.validate]
+        assert chain['after_validate'] == [
+            root.after_validate, opt.after_validate]
+        assert root._hook_chain([root, cmd]) is chain
+
+    def test_hook_chain_validate(self):
+        class Opt(Opt1):
+            def validate(self, args):
+                return []
+
+        class Cmd(Command):
+            name = 'cmd'
+
+            def run(self, args):
+                return ExitStatus.SUCCESS
+
+        root, cmd = Cmd(), RootCommand()
+        root.options = [Opt()]
+        cmd.options = [Opt()]
+        # Validators of options are replaced by the one of the command
+        assert root._hook_chain([root, cmd])['validate'] == [
+            root.options[0].validate, cmd.validate]
+
+    def test_hook_chain_reset(self):
+        root = RootCommand()
+        root.add_command(SecondCommand())
+        root.execute(['second'])
+        chain = root._hook_chain([root, root.sub_commands[0]])
+        root.options = [Opt1()]
+        root.initialize()
+        assert root._hook_chain([root, root.sub_commands[0]]) is not chain
+
     def test_create_default_parser(self):
         class Opt(Option):
             def build_option(self, parser):
@@ -351,6 +418,60 @@ class TestCommand(object):
             args = cmd_parser.parse_args(argv)
             assert args.test == 'test'
 
+    def test_shared_option_actions(self):
+        class PathOption(Option):
+            def build_option(self, parser):
+                parser.add_argument('path')
+                parser.add_argument('-1', dest='one', action='store_true')
+                parser.set_defaults(shared=True)
+                return parser
+
+        class Cmd(Command):
+            options = [PathOption, Opt1]
+
+            def __init__(self, name):
+                super(Cmd, self).__init__()
+                self.name = name
+
+            def build_option(self, parser):
+                parser.add_argument('--value', type=int, default=0)
+                return parser
+
+            def run(self, args):
+                return ExitStatus.SUCCESS
+
+        root = Cmd('root')
+        root.options = []
+        subs = [Cmd('sub{}'.format(i)) for i in range(3)]
+        root.add_command(*subs)
+        root.initialize()
+        # Parsers of the commands with the same options share the actions
+        actions = [cmd._parser._actions for cmd in subs]
+        assert actions[0][1:3] == actions[1][1:3] == actions[2][1:3]
+        assert actions[0][1] is actions[2][1]
+        expected = argparse.ArgumentParser(
+            prog='root sub2',
+            parents=[o.get_parser() for o in subs[2].get_options()])
+        expected.add_argument('--value', type=int, default=0)
+        assert subs[2]._parser.format_help() == expected.format_help()
+        args = root._parser.parse_args(['sub2', '-1', 'a', '--value', '1'])
+        assert (args.path, args.one, args.value, args.shared) == \
+            ('a', True, 1, True)
+
+    def test_shared_option_conflict(self):
+        class HelpOption(Option):
+            def build_option(self, parser):
+                parser.add_argument('-h', action='store_true')
+                return parser
+
+        class Cmd(SecondCommand):
+            options = [HelpOption]
+
+        for cmd in [RootCommand(), SecondCommand()]:
+            cmd.add_command(Cmd())
+            with pytest.raises(argparse.ArgumentError):
+                cmd.initialize()
+
     @pytest.mark.parametrize(
         'option_objs', [
             [Opt1(), Opt2(), Opt3()],
@@ -381,3 +502,700 @@ class TestCommand(object):
         assert list(actual_classes) == list(expected_classes)
         # Inheritance source class is not modified
         assert RootCommand().get_options() == []
+
+
+def build_tree(cmd_set):
+    def add_command(cmd, sub_set):
+        for c, s in sub_set.items():
+            cmd.add_command(c)
+            add_command(c, s)
+    for root, sub_commands in cmd_set.items():
+        add_command(root, sub_commands)
+    return list(cmd_set.keys())[0]
+
+
+class LazyRootCommand(RootCommand):
+    lazy_initialization = True
+
+
+class TestLazyInitialization(object):
+
+    @pytest.mark.parametrize(
+        'argv,expected', [
+            ([], 'False'),
+            (['second', '--second', '0'], '0'),
+            (['third', '--third', 'third'], 'third'),
+        ]
+    )
+    def test_execute(self, argv, expected, capsys):
+        root = LazyRootCommand()
+        root.add_command(SecondCommand(), ThirdCommand())
+        assert root.execute(argv) == 0
+        assert capsys.readouterr().out.splitlines()[0] == expected
+
+    def test_build_only_path(self):
+        second, third = SecondCommand(), ThirdCommand()
+        fourth = ThirdCommand()
+        root = build_tree({
+            LazyRootCommand(): {second: {fourth: {}}, third: {}}})
+        root.execute(['second'])
+        assert second._parser is not None
+        assert third._parser is None
+        assert fourth._parser is None
+        # The tree is extended by the next execution
+        root.execute(['third'])
+        assert third._parser is not None
+        assert list(root._sub_parsers.choices) == ['second', 'third']
+
+    @pytest.mark.parametrize(
+        'argv', [
+            ['-h'],
+            ['second', '-h'],
+        ]
+    )
+    def test_help_shows_all_commands(self, argv, capsys):
+        root = build_tree({
+            LazyRootCommand(): {
+                SecondCommand(): {ThirdCommand(): {}}, ThirdCommand(): {}}})
+        eager = build_tree({
+            RootCommand(): {
+                SecondCommand(): {ThirdCommand(): {}}, ThirdCommand(): {}}})
+        with pytest.raises(SystemExit):
+            eager.execute(argv)
+        expected = capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            root.execute(argv)
+        assert capsys.readouterr().out == expected
+
+    def test_error_shows_all_commands(self, capsys):
+        root = LazyRootCommand()
+        root.add_command(SecondCommand(), ThirdCommand())
+        with pytest.raises(SystemExit):
+            root.execute(['fourth'])
+        assert "(choose from 'second', 'third')" in capsys.readouterr().err
+
+    def test_leaf_help_is_not_rebuilt(self, capsys):
+        second, third = SecondCommand(), ThirdCommand()
+        root = LazyRootCommand()
+        root.add_command(second, third)
+        with pytest.raises(SystemExit):
+            root.execute(['second', '-h'])
+        assert '--second' in capsys.readouterr().out
+        assert third._parser is None
+
+    def test_print_help(self, capsys):
+        root = LazyRootCommand()
+        root.add_command(SecondCommand(), ThirdCommand())
+        root.execute([])
+        capsys.readouterr()
+        root.print_help()
+        out = capsys.readouterr().out
+        assert '{second,third}' in out
+
+
+class TestLazyCommand(object):
+
+    module_name = 'tests.lazy_commands'
+
+    @pytest.fixture(autouse=True)
+    def unload(self):
+        sys.modules.pop(self.module_name, None)
+        yield
+        sys.modules.pop(self.module_name, None)
+
+    def build(self, root):
+        root.add_command(
+            '{}:command'.format(self.module_name),
+            name='second', short_description='second command')
+        root.add_command(ThirdCommand())
+        return root
+
+    @pytest.mark.parametrize('root_class', [LazyRootCommand, RootCommand])
+    def test_not_imported_until_dispatched(self, root_class, capsys):
+        # Without `lazy_initialization`, the parsers are built lazily too
+        root = self.build(root_class())
+        assert root.execute(['third']) == 0
+        assert self.module_name not in sys.modules
+        assert root.execute(['second', 'third']) == 0
+        assert self.module_name in sys.modules
+        assert capsys.readouterr().out.splitlines() == ['third', 'third']
+
+    def test_replaced_by_actual_command(self):
+        root = self.build(LazyRootCommand())
+        root.execute(['second', '--second', '0'])
+        second = root.sub_commands[0]
+        assert type(second).__name__ == 'LazySecondCommand'
+        assert second._layer == 1
+        assert second.sub_commands[0]._layer == 2
+
+    def test_initialize_imports_all(self):
+        root = self.build(RootCommand())
+        root.initialize()
+        assert self.module_name in sys.modules
+        assert root.execute(['third']) == 0
+
+    def test_import_class(self, capsys):
+        root = RootCommand()
+        root.add_command('tests.base:SecondCommand', name='second')
+        assert root.execute(['second']) == 0
+        assert capsys.readouterr().out.splitlines() == ['0']
+
+    @pytest.mark.parametrize('root_class', [LazyRootCommand, RootCommand])
+    def test_help_imports_all(self, root_class, capsys):
+        root = self.build(root_class())
+        with pytest.raises(SystemExit):
+            root.execute(['-h'])
+        assert 'second command' in capsys.readouterr().out
+        assert self.module_name in sys.modules
+
+    @pytest.mark.parametrize(
+        'commands,kwargs', [
+            (['tests.base:SecondCommand'], {}),
+            (['tests.base'], {'name': 'second'}),
+            (['tests.base:SecondCommand', 'tests.base:ThirdCommand'],
+             {'name': 'second'}),
+        ]
+    )
+    def test_invalid_import_string(self, commands, kwargs):
+        root = RootCommand()
+        with pytest.raises(AssertionError):
+            root.add_command(*commands, **kwargs)
+
+    def test_name_mismatch(self):
+        root = RootCommand()
+        root.add_command('tests.base:SecondCommand', name='other')
+        with pytest.raises(AssertionError):
+            root.execute(['other'])
+
+
+class NamedCommand(Command):
+
+    def __init__(self, name, *sub_commands, abbrev=False):
+        super(NamedCommand, self).__init__()
+        self.name = name
+        self.allow_sub_command_abbrev = abbrev
+        self.add_command(*sub_commands)
+
+    def run(self, args):
+        print(' '.join(cmd.name for cmd in self.get_sub_commands(args)) or
+              self.name)
+        return ExitStatus.SUCCESS
+
+
+class CountingOption(Option):
+    built = 0
+
+    def build_option(self, parser):
+        CountingOption.built += 1
+        parser.add_argument('--count', type=int, default=0)
+        return parser
+
+
+class OptionCommand(NamedCommand):
+    options = [CountingOption]
+
+
+class TestOptionRegistry(object):
+
+    def build(self):
+        root = OptionCommand('root')
+        root.add_command(OptionCommand('a', OptionCommand('b')))
+        return root
+
+    def test_shared_in_tree(self, monkeypatch, capsys):
+        monkeypatch.setattr(CountingOption, 'built', 0)
+        root = self.build()
+        a = root.sub_commands[0]
+        b = a.sub_commands[0]
+        options = root.get_options() + a.get_options() + b.get_options()
+        assert all(isinstance(opt, CountingOption) for opt in options)
+        assert len({id(opt) for opt in options}) == 1
+        assert root.execute(['--count', '1', 'a', 'b']) == ExitStatus.SUCCESS
+        assert root.execute(['a']) == ExitStatus.SUCCESS
+        assert CountingOption.built == 1
+        # Another tree has its own instance
+        assert self.build().get_options()[0] is not options[0]
+
+    def test_discarded_tree_is_collected(self):
+        root = self.build()
+        root.execute(['a', 'b'])
+        refs = [weakref.ref(root), weakref.ref(root.get_options()[0])]
+        del root
+        gc.collect()
+        assert [ref() for ref in refs] == [None, None]
+
+
+class TestDeepTree(object):
+
+    def build(self, depth):
+        root = NamedCommand('root')
+        cmd = root
+        for i in range(depth):
+            sub_cmd = NamedCommand('cmd{}'.format(i))
+            cmd.add_command(sub_cmd)
+            cmd = sub_cmd
+        return root, cmd
+
+    @pytest.mark.parametrize('lazy', [False, True])
+    def test_deeper_than_recursion_limit(self, lazy, capsys):
+        depth = sys.getrecursionlimit() + 100
+        root, leaf = self.build(depth)
+        root.lazy_initialization = lazy
+        argv = ['cmd{}'.format(i) for i in range(depth)]
+        assert root.execute(argv) == ExitStatus.SUCCESS
+        assert capsys.readouterr().out == argv[-1] + '\n'
+        args = root._parse(argv)
+        assert [c.name for c in root.get_sub_commands(args)] == argv
+        assert leaf._layer == depth
+        all_commands = root.get_all_sub_commands()
+        for _ in range(depth + 1):
+            (cmd, all_commands), = all_commands.items()
+        assert cmd is leaf and all_commands == {}
+
+    def test_move_sub_tree(self):
+        root, leaf = self.build(3)
+        assert leaf._layer == 3
+        other = NamedCommand('other')
+        other.add_command(NamedCommand('sub', root.sub_commands[0]))
+        assert leaf._layer == 4
+
+    @pytest.mark.parametrize('argv', [
+        ['cmd0', 'cmd1'],
+        ['--name', 'cmd0', 'cmd0', 'cmd1'],
+        ['cmd0', '--name', 'cmd1', 'cmd1', '--name', 'x'],
+        ['--name', 'cmd0'],
+    ])
+    def test_same_as_argparse(self, argv):
+        class NameOption(Option):
+            def build_option(self, parser):
+                parser.add_argument('--name')
+                return parser
+
+        class NameCommand(NamedCommand):
+            options = [NameOption()]
+
+        root = NameCommand('root')
+        cmd = root
+        for i in range(3):
+            sub_cmd = NameCommand('cmd{}'.format(i))
+            cmd.add_command(sub_cmd)
+            cmd = sub_cmd
+        root.initialize()
+        # The parser used directly parses the sub commands recursively
+        assert root._parse_args(argv) == root._parser.parse_args(argv)
+
+    def test_unrecognized_arguments(self, capsys):
+        root, _ = self.build(2)
+        with pytest.raises(SystemExit):
+            root.execute(['--a', 'cmd0', '--b', 'cmd1', '--c'])
+        err = capsys.readouterr().err
+        assert err.startswith('usage: root ')
+        assert 'unrecognized arguments: --a --b --c' in err
+
+
+class TestSubCommandAbbreviation(object):
+
+    def build(self, **kwargs):
+        return NamedCommand(
+            'root',
+            NamedCommand(
+                'env',
+                NamedCommand('get'), NamedCommand('getall'),
+                NamedCommand('set'),
+                abbrev=True),
+            NamedCommand('exec'),
+            **kwargs)
+
+    @pytest.mark.parametrize('argv,expected', [
+        (['env', 'get'], 'get'),
+        (['env', 'g'], None),
+        (['env', 'geta'], 'getall'),
+        (['env', 's'], 'set'),
+        (['env', 'x'], None),
+        (['e'], None),
+    ])
+    @pytest.mark.parametrize('lazy', [False, True])
+    def test_execute(self, argv, expected, lazy, capsys):
+        root = self.build()
+        root.lazy_initialization = lazy
+        if expected is None:
+            with pytest.raises(SystemExit) as e:
+                root.execute(argv)
+            assert e.value.code == ExitStatus.MISS_USAGE
+        else:
+            assert root.execute(argv) == ExitStatus.SUCCESS
+            assert capsys.readouterr().out == expected + '\n'
+
+    def test_section_has_full_name(self):
+        root = self.build()
+        args = root._parse(['env', 'se'])
+        assert getattr(args, '__layer1_command') is root.sub_commands[0]
+        assert getattr(args, '__layer1_parser') == 'set'
+
+    def test_added_after_lookup(self):
+        root = self.build(abbrev=True)
+        assert root._find_sub_command('ex').name == 'exec'
+        root.add_command(NamedCommand('export'))
+        assert root._find_sub_command('ex') is None
+        assert root._find_sub_command('exp').name == 'export'
+
+    def test_help_order(self):
+        root = self.build(abbrev=True)
+        root.initialize()
+        choices = root._sub_parsers.choices
+        assert isinstance(choices, collections.OrderedDict)
+        assert list(choices) == ['env', 'exec']
+
+    def test_dispatch_by_dict(self):
+        root = NamedCommand(
+            'root', *[NamedCommand('cmd{}'.format(i)) for i in range(1000)])
+        with mock.patch.object(Command, 'sub_commands', create=True,
+                               new_callable=mock.PropertyMock) as prop:
+            assert root._find_sub_command('cmd999').name == 'cmd999'
+        assert not prop.called
+
+
+class BatchRootCommand(RootCommand):
+    allow_batch = True
+
+
+class NumberCommand(Command):
+    name = 'number'
+
+    def build_option(self, parser):
+        parser.add_argument('--scale', type=int, default=1)
+        parser.add_argument('number', type=int)
+        return parser
+
+    def run(self, args):
+        print(args.number * args.scale)
+        return ExitStatus.SUCCESS
+
+
+class TestExecuteMany(object):
+
+    def test_execute_many(self, capsys):
+        root = RootCommand()
+        root.add_command(SecondCommand(), ThirdCommand())
+        actual = root.execute_many([
+            ['second'],
+            ['third', '--third', 'invalid'],
+            ['unknown'],
+            [],
+        ])
+        assert actual == [
+            ExitStatus.SUCCESS,
+            ExitStatus.FAILURE,
+            ExitStatus.MISS_USAGE,
+            ExitStatus.SUCCESS,
+        ]
+        assert capsys.readouterr().out.splitlines() == ['0', 'False']
+
+    def test_execute_many_reuses_parser(self):
+        root = RootCommand()
+        root.add_command(SecondCommand())
+        root.execute_many([['second']])
+        parser = root._parser
+        root.execute_many([['second'], []])
+        assert root._parser is parser
+
+    def test_batch_file(self, tmp_path, capsys):
+        batch = tmp_path / 'batch.txt'
+        batch.write_text(
+            '# comment\n'
+            'second --second 0\n'
+            '\n'
+            "third --third 'third'\n")
+        root = BatchRootCommand()
+        root.add_command(SecondCommand(), ThirdCommand())
+        assert root.execute(['--batch', str(batch)]) == ExitStatus.SUCCESS
+        assert capsys.readouterr().out.splitlines() == ['0', 'third']
+
+    def test_batch_stdin(self, monkeypatch, capsys):
+        monkeypatch.setattr(
+            'sys.stdin', io.StringIO('second\nsecond --second 1\n--root\n'))
+        root = BatchRootCommand()
+        root.add_command(SecondCommand())
+        assert root.execute(['--batch', '-']) == ExitStatus.FAILURE
+        assert capsys.readouterr().out.splitlines() == ['0']
+
+    def test_executor_options_in_entries(self, tmp_path, capsys, caplog):
+        nested = tmp_path / 'nested.txt'
+        nested.write_text('second\n')
+        root = BatchRootCommand()
+        root.allow_completion = True
+        root.add_command(SecondCommand())
+        opened = []
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            opened.append(f)
+            return f
+        with mock.patch('builtins.open', tracking_open):
+            statuses = root.execute_many([
+                ['--batch', str(nested)],
+                ['--xargs', 'second'],
+                ['--completion', 'bash'],
+                ['second'],
+            ])
+        assert statuses == [ExitStatus.MISS_USAGE] * 3 + [ExitStatus.SUCCESS]
+        assert capsys.readouterr().out.splitlines() == ['0']
+        assert [r[2] for r in caplog.record_tuples] == [
+            '{} cannot be used in the arguments of batch execution.'.format(
+                option) for option in ('--batch', '--xargs', '--completion')]
+        assert opened and all(f.closed for f in opened)
+
+    def test_batch_disabled(self, tmp_path):
+        root = RootCommand()
+        with pytest.raises(SystemExit):
+            root.execute(['--batch', str(tmp_path / 'batch.txt')])
+
+    @pytest.mark.parametrize('argv,stdin', [
+        (['--xargs', 'number', '--scale', '2'], '1\n\n2\n3'),
+        (['-0', '--xargs', 'number', '--scale', '2'], '1\x002\x00\x003\x00'),
+    ])
+    def test_xargs(self, argv, stdin, monkeypatch, capsys):
+        monkeypatch.setattr('sys.stdin', io.StringIO(stdin))
+        root = BatchRootCommand()
+        root.add_command(NumberCommand())
+        assert root.execute(argv) == ExitStatus.SUCCESS
+        assert capsys.readouterr().out.splitlines() == ['2', '4', '6']
+
+    def test_xargs_failure(self, monkeypatch, capsys):
+        monkeypatch.setattr('sys.stdin', io.StringIO('1\ninvalid\n2\n'))
+        root = BatchRootCommand()
+        root.add_command(NumberCommand())
+        assert root.execute(['--xargs', 'number']) == ExitStatus.MISS_USAGE
+        assert capsys.readouterr().out.splitlines() == ['1', '2']
+
+    def test_xargs_streams_records(self):
+        def stream():
+            for i in range(3):
+                yield '{}\n'.format(i)
+                # The record has been executed before the next one is read
+                assert executed == list(range(i + 1))
+        def run(args):
+            executed.append(args.number)
+            return ExitStatus.SUCCESS
+        executed = []
+        root = BatchRootCommand()
+        command = NumberCommand()
+        command.run = run
+        root.add_command(command)
+        assert root._execute_xargs(['number'], stream()) == \
+            ExitStatus.SUCCESS
+
+
+class AsyncOption(Option):
+
+    def build_option(self, parser):
+        parser.add_argument('--delay', type=float, default=0)
+        return parser
+
+    async def before_validate(self, unsafe_args):
+        await asyncio.sleep(unsafe_args.delay)
+        unsafe_args.option_before = True
+        return unsafe_args
+
+    async def validate(self, args):
+        if args.delay < 0:
+            return [Exception('delay must not be negative')]
+        return []
+
+
+class AsyncCommand(Command):
+    name = 'async'
+    options = [AsyncOption()]
+
+    async def after_validate(self, safe_args):
+        safe_args.command_after = True
+        return safe_args
+
+    async def run(self, args):
+        await asyncio.sleep(0)
+        print(args.option_before, args.command_after)
+        return 3
+
+
+class TestAsyncCommand(object):
+
+    def build(self):
+        root = RootCommand()
+        root.add_command(AsyncCommand(), SecondCommand())
+        return root
+
+    def test_execute(self, capsys):
+        root = self.build()
+        assert root.execute(['async']) == ExitStatus.EXIT_WITH_3
+        assert capsys.readouterr().out == 'True True\n'
+
+    def test_async_validation_error(self, caplog):
+        root = self.build()
+        assert root.execute(['async', '--delay', '-1']) == ExitStatus.FAILURE
+        assert caplog.record_tuples[0][2] == 'delay must not be negative'
+
+    def test_sync_command_without_loop(self, monkeypatch, capsys):
+        monkeypatch.setattr(asyncio, 'new_event_loop', None)
+        root = self.build()
+        assert root.execute(['second']) == ExitStatus.SUCCESS
+
+    def test_given_loop(self, capsys):
+        loop = asyncio.new_event_loop()
+        try:
+            root = self.build()
+            assert root.execute(['async'], loop=loop) == 3
+            assert not loop.is_closed()
+        finally:
+            loop.close()
+
+    def test_execute_async(self, capsys):
+        root = self.build()
+        loop = asyncio.new_event_loop()
+        try:
+            status = loop.run_until_complete(root.execute_async(['async']))
+        finally:
+            loop.close()
+        assert status == 3
+        assert capsys.readouterr().out == 'True True\n'
+
+    def test_execute_async_root_options(self, tmp_path, capsys, caplog):
+        class Root(BatchRootCommand):
+            allow_completion = True
+
+        root = Root()
+        root.add_command(AsyncCommand(), SecondCommand())
+        batch = tmp_path / 'batch.txt'
+        batch.write_text('second\n')
+        loop = asyncio.new_event_loop()
+        try:
+            # The same as `execute`
+            assert loop.run_until_complete(root.execute_async(
+                ['--completion', 'bash'])) == ExitStatus.SUCCESS
+            assert 'complete' in capsys.readouterr().out
+            # Executing the batch in the running loop is not supported
+            for argv in (['--batch', str(batch)], ['--xargs', 'second']):
+                assert loop.run_until_complete(root.execute_async(argv)) \
+                    == ExitStatus.MISS_USAGE
+        finally:
+            loop.close()
+        assert capsys.readouterr().out == ''
+        assert [r[2] for r in caplog.record_tuples] == [
+            '--batch cannot be used in `execute_async`.',
+            '--xargs cannot be used in `execute_async`.']
+
+    def test_execute_many(self, capsys):
+        root = self.build()
+        assert root.execute_many([['async'], ['second'], ['async']]) == \
+            [3, 0, 3]
+        assert capsys.readouterr().out.splitlines() == \
+            ['True True', '0', 'True True']
+
+    def test_run_returns_awaitable(self, capsys):
+        class Cmd(SecondCommand):
+            def run(self, args):
+                return asyncio.sleep(0, result=4)
+        root = RootCommand()
+        root.add_command(Cmd())
+        assert root.execute(['second']) == 4
+
+
+class SlowOption(Option):
+
+    def __init__(self, index, delay, fails=False):
+        super(SlowOption, self).__init__()
+        self.index = index
+        self.delay = delay
+        self.fails = fails
+
+    def build_option(self, parser):
+        return parser
+
+    def validate(self, args):
+        time.sleep(self.delay)
+        args.validated.append(self.index)
+        if self.fails:
+            return [Exception('option {} failed'.format(self.index))]
+        return []
+
+
+class AsyncSlowOption(SlowOption):
+
+    async def validate(self, args):
+        await asyncio.sleep(self.delay)
+        args.validated.append(self.index)
+        if self.fails:
+            return [Exception('option {} failed'.format(self.index))]
+        return []
+
+
+class ValidationRootCommand(Command):
+    name = 'root'
+
+    def __init__(self, options, **kwargs):
+        super(ValidationRootCommand, self).__init__()
+        self.options = options
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def before_validate(self, unsafe_args):
+        unsafe_args.validated = []
+        return unsafe_args
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+class TestConcurrentValidation(object):
+
+    def validate(self, root, caplog):
+        status = root.execute([])
+        return status, [r[2] for r in caplog.record_tuples]
+
+    def test_sequential_fail_fast(self, caplog):
+        root = ValidationRootCommand(
+            [SlowOption(0, 0, True), SlowOption(1, 0, True)],
+            validation_fail_fast=True)
+        status, messages = self.validate(root, caplog)
+        assert status == ExitStatus.FAILURE
+        assert messages == ['option 0 failed']
+
+    @pytest.mark.parametrize('option_class', [SlowOption, AsyncSlowOption])
+    def test_errors_in_order(self, option_class, caplog):
+        root = ValidationRootCommand(
+            [option_class(0, 0.2, True), option_class(1, 0, True)],
+            concurrent_validation=True)
+        status, messages = self.validate(root, caplog)
+        assert status == ExitStatus.FAILURE
+        assert messages == ['option 0 failed', 'option 1 failed']
+
+    @pytest.mark.parametrize('option_class', [SlowOption, AsyncSlowOption])
+    def test_run_concurrently(self, option_class):
+        root = ValidationRootCommand(
+            [option_class(i, 0.2) for i in range(5)],
+            concurrent_validation=True)
+        start = time.perf_counter()
+        assert root.execute([]) == ExitStatus.SUCCESS
+        assert time.perf_counter() - start < 0.2 * 5 / 2
+
+    @pytest.mark.parametrize('option_class', [SlowOption, AsyncSlowOption])
+    def test_fail_fast(self, option_class, caplog):
+        root = ValidationRootCommand(
+            [option_class(0, 1), option_class(1, 0, True)],
+            concurrent_validation=True,
+            validation_fail_fast=True)
+        start = time.perf_counter()
+        status, messages = self.validate(root, caplog)
+        assert time.perf_counter() - start < 1
+        assert status == ExitStatus.FAILURE
+        assert messages == ['option 1 failed']
+
+    def test_workers(self):
+        root = ValidationRootCommand(
+            [SlowOption(i, 0.1) for i in range(4)],
+            concurrent_validation=True,
+            validation_workers=1)
+        args = root._parse([])
+        args = root.before_validate(args)
+        assert root._validate_all(args, []) == []
+        assert args.validated == [0, 1, 2, 3]
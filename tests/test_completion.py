@@ -0,0 +1,98 @@
+import shutil
+import subprocess
+
+import pytest
+
+from uroboros import Command, ExitStatus, completion
+
+from .base import RootCommand, SecondCommand, ThirdCommand
+
+
+class ModeCommand(Command):
+    name = 'mode'
+    short_description = 'set the mode'
+
+    def build_option(self, parser):
+        parser.add_argument('--mode', choices=['fast', 'slow'])
+        parser.add_argument('--level', type=int, choices=[0, 1, 2])
+        parser.add_argument('--path')
+        return parser
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+class CompletionRootCommand(RootCommand):
+    allow_completion = True
+
+
+def build():
+    root = CompletionRootCommand()
+    second = SecondCommand()
+    second.add_command(ThirdCommand())
+    root.add_command(second, ModeCommand())
+    return root
+
+
+def complete(script, words):
+    """Run the bash completion function with `words` and return
+    the candidates."""
+    source = '\n'.join([
+        script,
+        'COMP_WORDS=({})'.format(' '.join(
+            "'{}'".format(word) for word in words)),
+        'COMP_CWORD={}'.format(len(words) - 1),
+        '_uroboros_complete_sample',
+        'printf "%s\\n" "${COMPREPLY[@]}"',
+    ])
+    out = subprocess.check_output(['bash', '-c', source])
+    return out.decode().split()
+
+
+@pytest.fixture(scope='module')
+def script():
+    return completion.generate(build(), 'bash', prog='sample')
+
+
+@pytest.mark.skipif(shutil.which('bash') is None,
+                    reason='bash is not installed')
+class TestBashCompletion(object):
+
+    @pytest.mark.parametrize('words,expected', [
+        (['sample', ''],
+         ['-h', '--help', '--completion', '--root', 'second', 'mode']),
+        (['sample', 's'], ['second']),
+        (['sample', '--root', 'second', ''],
+         ['-h', '--help', '--second', 'third']),
+        (['sample', 'second', '--second', 'third', ''],
+         ['-h', '--help', '--second', 'third']),
+        (['sample', 'second', '--second', '1', 't'], ['third']),
+        (['sample', 'second', 'third', '--t'], ['--third']),
+        (['sample', 'mode', '--mode', ''], ['fast', 'slow']),
+        (['sample', 'mode', '--level', ''], ['0', '1', '2']),
+        (['sample', 'mode', '--path', ''], []),
+        (['sample', 'mode', '--mode', 'fast', '--p'], ['--path']),
+    ])
+    def test_complete(self, script, words, expected):
+        assert complete(script, words) == expected
+
+
+@pytest.mark.parametrize('shell', completion.SHELLS)
+def test_generate(shell):
+    script = completion.generate(build(), shell)
+    assert script.startswith('# {} completion for root'.format(shell))
+    assert '_uroboros_complete_root' in script
+    assert "' second third'" in script
+    assert "'set the mode'" in script or shell != 'fish'
+
+
+def test_completion_option(capsys):
+    root = build()
+    assert root.execute(['--completion', 'bash']) == ExitStatus.SUCCESS
+    out = capsys.readouterr().out
+    assert out == completion.generate(build(), 'bash')
+
+
+def test_completion_disabled():
+    with pytest.raises(SystemExit):
+        RootCommand().execute(['--completion', 'bash'])
@@ -66,3 +66,31 @@ class TestExitStatus(object):
     def test_py35_invalid(self, exit_code):
         with pytest.raises(ValueError):
             ExitStatus(exit_code)
+
+    @pytest.mark.parametrize('name,exit_code', [
+        ('EXIT_WITH_3', 3),
+        ('EXIT_WITH_125', 125),
+        ('FATAL_SIGNAL_1', 129),
+        ('FATAL_SIGNAL_126', 254),
+    ])
+    def test_undefined_by_name(self, name, exit_code):
+        actual = getattr(ExitStatus, name)
+        assert actual is ExitStatus(exit_code)
+        assert actual is ExitStatus[name]
+        assert actual.name == name
+        assert isinstance(actual, ExitStatus)
+
+    @pytest.mark.parametrize('name', [
+        'EXIT_WITH_0', 'EXIT_WITH_03', 'EXIT_WITH_126', 'EXIT_WITH_200',
+        'FATAL_SIGNAL_0', 'FATAL_SIGNAL_2', 'FATAL_SIGNAL_127', 'UNKNOWN',
+    ])
+    def test_unknown_name(self, name):
+        with pytest.raises(AttributeError):
+            getattr(ExitStatus, name)
+        with pytest.raises(KeyError):
+            ExitStatus[name]
+
+    def test_defined_members(self):
+        ExitStatus(3)
+        assert [status.value for status in ExitStatus] == \
+            [0, 1, 2, 126, 127, 128, 130, 255]
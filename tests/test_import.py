@@ -0,0 +1,111 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import uroboros
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(uroboros.__file__)))
+
+SCRIPT = textwrap.dedent('''
+    import sys
+    import time
+
+    before = set(sys.modules)
+    started = time.perf_counter()
+    {statement}
+    elapsed = time.perf_counter() - started
+    {after}
+    modules = sorted(set(sys.modules) - before)
+
+    import json
+    print(json.dumps({{'elapsed': elapsed, 'modules': modules}}))
+''')
+
+# Modules which trivial commands need not import
+HEAVY_MODULES = [
+    'asyncio', 'concurrent.futures', 'hashlib', 'json', 'logging', 'shlex',
+    'tempfile', 'typing', 'uroboros.manifest',
+]
+
+VERSION_COMMAND = textwrap.dedent('''
+    class VersionCommand(Command):
+        name = 'version'
+
+        def run(self, args):
+            return ExitStatus.SUCCESS
+
+    assert VersionCommand().execute([]) == ExitStatus.SUCCESS
+''')
+
+# Modules of the package imported by `from uroboros import Command`
+COMMAND_MODULES = [
+    'uroboros', 'uroboros.command', 'uroboros.constants', 'uroboros.errors',
+    'uroboros.importtime', 'uroboros.instrumentation', 'uroboros.utils',
+]
+
+# Import time allowed in seconds. Wall clock time depends on the machine,
+# so that it is checked only if the environment variable is set.
+BUDGET_ENV = 'UROBOROS_IMPORT_BUDGET'
+BUDGET = {
+    'import uroboros': 0.005,
+    'from uroboros import Command, ExitStatus': 0.02,
+}
+
+
+def run(statement, after='', repeat=1):
+    script = SCRIPT.format(statement=statement, after=after)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    for name in ('UROBOROS_TIMING', 'UROBOROS_PROFILE',
+                 'UROBOROS_IMPORT_PROFILE'):
+        env.pop(name, None)
+    results = [json.loads(subprocess.check_output(
+        [sys.executable, '-c', script], env=env)) for _ in range(repeat)]
+    return min(r['elapsed'] for r in results), results[0]['modules']
+
+
+@pytest.mark.skipif('sys.version_info < (3, 7)')
+class TestImport(object):
+
+    def test_package(self):
+        _, modules = run('import uroboros')
+        assert modules == ['uroboros']
+
+    def test_attributes(self):
+        _, modules = run('import uroboros',
+                         'uroboros.Command, uroboros.ExitStatus, '
+                         'uroboros.Option, uroboros.utils')
+        assert 'uroboros.command' in modules
+        assert 'uroboros.utils' in modules
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            uroboros.unknown
+
+    def test_trivial_command(self):
+        _, modules = run('from uroboros import Command, ExitStatus',
+                         VERSION_COMMAND)
+        assert [m for m in HEAVY_MODULES if m in modules] == []
+
+    def test_command(self):
+        _, modules = run('from uroboros import Command, ExitStatus')
+        assert [m for m in modules if m.startswith('uroboros')] == \
+            COMMAND_MODULES
+        assert [m for m in HEAVY_MODULES if m in modules] == []
+
+    @pytest.mark.skipif(not os.environ.get(BUDGET_ENV),
+                        reason='{} is not set'.format(BUDGET_ENV))
+    @pytest.mark.parametrize('statement', sorted(BUDGET))
+    def test_budget(self, statement):
+        elapsed, _ = run(statement, repeat=5)
+        assert elapsed < BUDGET[statement]
+
+
+def test_star_import():
+    namespace = {}
+    exec('from uroboros import *', namespace)
+    names = set(namespace) - {'__builtins__'}
+    assert names == {'Command', 'Option', 'ExitStatus', 'version'}
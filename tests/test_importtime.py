@@ -0,0 +1,91 @@
+import sys
+import textwrap
+
+import pytest
+
+from uroboros import Command, ExitStatus
+from uroboros import importtime
+
+MODULE = '''
+import time
+
+from uroboros import Command, ExitStatus
+
+time.sleep({sleep})
+
+
+class {cls}(Command):
+    name = '{name}'
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+command = {cls}()
+'''
+
+
+class RootCommand(Command):
+    name = 'root'
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+@pytest.fixture
+def recorder(monkeypatch, tmpdir):
+    for name, sleep in [('eager', 0.01), ('slow', 0.05), ('lazy', 0.03),
+                        ('unused', 0)]:
+        tmpdir.join('importtime_{}.py'.format(name)).write(
+            textwrap.dedent(MODULE.format(
+                sleep=sleep, name=name, cls=name.capitalize() + 'Command')))
+    monkeypatch.syspath_prepend(str(tmpdir))
+    recorder = importtime.ImportRecorder()
+    monkeypatch.setattr(importtime, 'recorder', recorder)
+    recorder.install()
+    try:
+        yield recorder
+    finally:
+        recorder.uninstall()
+        for name in list(sys.modules):
+            if name.startswith('importtime_'):
+                del sys.modules[name]
+
+
+def report_rows(recorder):
+    return recorder.report().splitlines()[2:]
+
+
+class TestImportRecorder(object):
+
+    def test_report(self, recorder):
+        import importtime_eager
+        import importtime_slow
+        root = RootCommand()
+        root.add_command(importtime_eager.command, importtime_slow.command)
+        root.add_command('importtime_lazy:command', name='lazy')
+        root.add_command('importtime_unused:command', name='unused')
+        root.lazy_initialization = True
+        assert root.execute(['lazy']) == ExitStatus.SUCCESS
+        rows = report_rows(recorder)
+        assert [row.split(None, 3)[3] for row in rows] == [
+            'root slow (importtime_slow)',
+            'root lazy (importtime_lazy)',
+            'root eager (importtime_eager)',
+        ]
+        elapsed = float(rows[0].split()[0])
+        assert 50 <= elapsed < 1000
+
+    def test_size(self, recorder):
+        import importtime_eager
+        import importtime_slow
+        root = RootCommand()
+        root.add_command(importtime_eager.command, importtime_slow.command)
+        lines = recorder.report(size=1).splitlines()
+        assert lines[0] == 'uroboros import time by command (1 worst)'
+        assert len(lines) == 3
+
+    def test_imported_before(self, recorder):
+        root = RootCommand()
+        root.add_command(RootCommand())
+        assert report_rows(recorder) == []
@@ -0,0 +1,169 @@
+import io
+
+import pytest
+
+from uroboros import Command, ExitStatus, Option
+from uroboros import instrumentation
+
+
+class Recorder(instrumentation.Instrument):
+
+    def __init__(self):
+        self.events = []
+
+    def start(self, command):
+        self.events.append(('start', command.name))
+
+    def phase(self, name, command, elapsed):
+        assert elapsed >= 0
+        self.events.append(('phase', name))
+
+    def hook(self, name, owner, elapsed):
+        assert elapsed >= 0
+        self.events.append(('hook', name, instrumentation._label(owner)))
+
+    def finish(self, command, status):
+        self.events.append(('finish', status))
+
+
+class FlagOption(Option):
+
+    def build_option(self, parser):
+        parser.add_argument('--flag', action='store_true')
+        return parser
+
+    def before_validate(self, unsafe_args):
+        return unsafe_args
+
+    def validate(self, args):
+        return []
+
+    def after_validate(self, safe_args):
+        return safe_args
+
+
+class RootCommand(Command):
+    name = 'root'
+
+    def validate(self, args):
+        return []
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+class SubCommand(Command):
+    name = 'sub'
+
+    def __init__(self, coroutine=False):
+        super(SubCommand, self).__init__()
+        self.options = [FlagOption()]
+        if coroutine:
+            self.run = self.run_async
+
+    def before_validate(self, unsafe_args):
+        return unsafe_args
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+    async def run_async(self, args):
+        return ExitStatus.SUCCESS
+
+
+def build(instrument, coroutine=False):
+    root = RootCommand()
+    root.instrument = instrument
+    root.add_command(SubCommand(coroutine))
+    return root
+
+
+PHASES = [
+    instrumentation.PHASE_INITIALIZE,
+    instrumentation.PHASE_PARSE_ARGS,
+    instrumentation.PHASE_BEFORE_VALIDATE,
+    instrumentation.PHASE_VALIDATE,
+    instrumentation.PHASE_AFTER_VALIDATE,
+    instrumentation.PHASE_RUN,
+]
+
+# Hooks which are not overridden are not called
+HOOKS = [
+    ('before_validate', 'FlagOption'),
+    ('before_validate', 'sub'),
+    ('validate', 'root'),
+    ('validate', 'FlagOption'),
+    ('after_validate', 'FlagOption'),
+]
+
+
+class TestInstrument(object):
+
+    @pytest.mark.parametrize('coroutine', [False, True])
+    def test_execute(self, coroutine):
+        recorder = Recorder()
+        root = build(recorder, coroutine)
+        assert root.execute(['sub', '--flag']) == ExitStatus.SUCCESS
+        events = recorder.events
+        assert events[0] == ('start', 'root')
+        assert events[-1] == ('finish', ExitStatus.SUCCESS)
+        assert [e[1] for e in events if e[0] == 'phase'] == PHASES
+        hooks = [e[1:] for e in events if e[0] == 'hook']
+        assert hooks == HOOKS
+
+    def test_parse_error(self):
+        recorder = Recorder()
+        root = build(recorder)
+        with pytest.raises(SystemExit):
+            root.execute(['sub', '--unknown'])
+        assert recorder.events[-1] == ('finish', None)
+
+    def test_initialized_once(self):
+        recorder = Recorder()
+        root = build(recorder)
+        root.execute(['sub'])
+        root.execute(['sub'])
+        phases = [e[1] for e in recorder.events if e[0] == 'phase']
+        assert phases.count(instrumentation.PHASE_INITIALIZE) == 1
+
+    def test_lazy_initialization(self):
+        recorder = Recorder()
+        root = build(recorder)
+        root.lazy_initialization = True
+        root.execute(['sub'])
+        phases = [e[1] for e in recorder.events if e[0] == 'phase']
+        assert phases == PHASES[1:]
+
+
+class TestReporter(object):
+
+    def test_report(self):
+        stream = io.StringIO()
+        root = build(instrumentation.Reporter(stream))
+        root.execute(['sub'])
+        lines = stream.getvalue().splitlines()
+        assert lines[0] == 'uroboros timing: root (status: 0)'
+        labels = [line.split()[0] for line in lines[1:]]
+        assert labels == [
+            'initialize', 'parse_args',
+            'before_validate', 'FlagOption', 'sub',
+            'validate', 'root', 'FlagOption',
+            'after_validate', 'FlagOption',
+            'run', 'total']
+
+    def test_env(self, monkeypatch, capsys):
+        monkeypatch.delenv(instrumentation.ENV_NAME, raising=False)
+        assert instrumentation.from_env() is None
+        build(None).execute(['sub'])
+        assert capsys.readouterr().err == ''
+        monkeypatch.setenv(instrumentation.ENV_NAME, '1')
+        build(None).execute(['sub'])
+        assert capsys.readouterr().err.startswith('uroboros timing: root')
+
+    def test_env_path(self, monkeypatch, tmpdir):
+        path = str(tmpdir.join('timing.txt'))
+        monkeypatch.setenv(instrumentation.ENV_NAME, path)
+        build(None).execute(['sub'])
+        build(None).execute(['sub'])
+        with open(path) as f:
+            assert f.read().count('uroboros timing: root') == 2
@@ -0,0 +1,110 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from uroboros import Command, ExitStatus
+from uroboros.jobs import JobsOption
+
+
+class EchoCommand(Command):
+    name = 'echo'
+
+    def __init__(self, executor):
+        super(EchoCommand, self).__init__()
+        self.options = [JobsOption('words', executor=executor)]
+
+    def build_option(self, parser):
+        parser.add_argument('words', nargs='*')
+        return parser
+
+    def run(self, args):
+        for word in args.words:
+            if word.startswith('fail'):
+                return int(word[len('fail'):])
+            # Later inputs finish earlier
+            time.sleep(0.05 * (5 - len(word)))
+            print(word, os.getpid())
+        return ExitStatus.SUCCESS
+
+
+class RewriteCommand(EchoCommand):
+    """Command replacing the arguments after the options' hooks"""
+
+    def after_validate(self, safe_args):
+        args = argparse.Namespace(**vars(safe_args))
+        args.words = [word * 2 for word in safe_args.words]
+        args.suffix = '!'
+        return args
+
+    def run(self, args):
+        for word in args.words:
+            print(word + args.suffix, os.getpid())
+        return ExitStatus.SUCCESS
+
+
+class RootCommand(Command):
+    name = 'root'
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+def build(executor):
+    root = RootCommand()
+    root.add_command(EchoCommand(executor))
+    return root
+
+
+def words(out):
+    return [line.split()[0] for line in out.splitlines()]
+
+
+def pids(out):
+    return {line.split()[1] for line in out.splitlines()}
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+class TestJobsOption(object):
+
+    def test_sequential(self, executor, capsys):
+        root = build(executor)
+        assert root.execute(['echo', 'a', 'bb']) == ExitStatus.SUCCESS
+        out = capsys.readouterr().out
+        assert words(out) == ['a', 'bb']
+        assert pids(out) == {str(os.getpid())}
+
+    def test_ordered(self, executor, capsys):
+        root = build(executor)
+        argv = ['echo', '-j', '4', 'a', 'bb', 'ccc', 'dddd']
+        assert root.execute(argv) == ExitStatus.SUCCESS
+        out = capsys.readouterr().out
+        assert words(out) == ['a', 'bb', 'ccc', 'dddd']
+        if executor == 'process' and \
+                'fork' in multiprocessing.get_all_start_methods():
+            assert str(os.getpid()) not in pids(out)
+
+    def test_unordered(self, executor, capsys):
+        root = build(executor)
+        argv = ['echo', '-j', '4', '--unordered', 'a', 'bb', 'ccc', 'dddd']
+        assert root.execute(argv) == ExitStatus.SUCCESS
+        assert words(capsys.readouterr().out) == ['dddd', 'ccc', 'bb', 'a']
+
+    def test_aggregate_exit_status(self, executor, capsys):
+        root = build(executor)
+        argv = ['echo', '-j', '2', 'a', 'fail3', 'fail4', 'bb']
+        assert root.execute(argv) == ExitStatus.EXIT_WITH_3
+        assert words(capsys.readouterr().out) == ['a', 'bb']
+
+    def test_args_replaced_by_hooks(self, executor, capsys):
+        root = RootCommand()
+        root.add_command(RewriteCommand(executor))
+        assert root.execute(['echo', '-j', '2', 'a', 'b']) == \
+            ExitStatus.SUCCESS
+        assert words(capsys.readouterr().out) == ['aa!', 'bb!']
+
+    def test_negative_jobs(self, executor, capsys):
+        root = build(executor)
+        assert root.execute(['echo', '-j', '-1', 'a']) == ExitStatus.FAILURE
@@ -0,0 +1,220 @@
+import json
+import os
+import sys
+
+import pytest
+
+from uroboros import Command, Option, manifest
+from .base import RootCommand, SecondCommand, ThirdCommand
+
+
+class GroupOption(Option):
+
+    def build_option(self, parser):
+        group = parser.add_argument_group('group', 'grouped options')
+        group.add_argument('--level', type=int, choices=[1, 2, 3],
+                           default=1, help='level (default: %(default)s)')
+        exclusive = group.add_mutually_exclusive_group()
+        exclusive.add_argument('-q', '--quiet', action='store_true')
+        exclusive.add_argument('-v', '--verbose', action='count')
+        return parser
+
+
+class FullCommand(Command):
+    name = 'full'
+    short_description = 'full command'
+    long_description = 'command having various options'
+    options = [GroupOption()]
+
+    def build_option(self, parser):
+        parser.add_argument('paths', nargs='*', metavar='PATH')
+        parser.add_argument('--pair', nargs=2, metavar=('KEY', 'VALUE'))
+        parser.add_argument('--version', action='version', version='1.0')
+        parser.add_argument('-x', action='append', required=True)
+        return parser
+
+    def run(self, args):
+        return 0
+
+
+def build_tree():
+    root = RootCommand()
+    second = SecondCommand()
+    second.add_command(ThirdCommand(), FullCommand())
+    root.add_command(second)
+    return root
+
+
+class TestManifest(object):
+
+    def test_load_not_exists(self, tmp_path):
+        assert manifest.load(str(tmp_path / 'manifest.json')) is None
+
+    def test_load_broken(self, tmp_path):
+        path = tmp_path / 'manifest.json'
+        path.write_text('{')
+        assert manifest.load(str(path)) is None
+
+    @pytest.mark.parametrize('invalidation', ['mtime', 'hash'])
+    def test_dump_and_load(self, tmp_path, invalidation):
+        path = str(tmp_path / 'manifest.json')
+        dumped = manifest.dump(build_tree(), path, invalidation)
+        loaded = manifest.load(path)
+        assert loaded is not None
+        assert loaded.data == dumped.data
+        assert [c['name'] for c in loaded.commands] == \
+            ['root', 'second', 'third', 'full']
+
+    def test_version_mismatch(self, tmp_path, monkeypatch):
+        path = str(tmp_path / 'manifest.json')
+        manifest.dump(build_tree(), path)
+        monkeypatch.setattr(manifest, 'MANIFEST_VERSION', -1)
+        assert manifest.load(path) is None
+
+    @pytest.mark.parametrize('invalidation', ['mtime', 'hash'])
+    def test_stale(self, tmp_path, monkeypatch, invalidation):
+        module_dir = tmp_path / 'modules'
+        module_dir.mkdir()
+        source = module_dir / 'manifest_command.py'
+        source.write_text(
+            'from tests.base import SecondCommand\n'
+            'command = SecondCommand()\n')
+        monkeypatch.syspath_prepend(str(module_dir))
+        monkeypatch.delitem(sys.modules, 'manifest_command', raising=False)
+        root = RootCommand()
+        root.add_command('manifest_command:command', name='second')
+        path = str(tmp_path / 'manifest.json')
+        manifest.dump(root, path, invalidation)
+        assert manifest.load(path) is not None
+        source.write_text(source.read_text() + '# modified\n')
+        stat = os.stat(str(source))
+        os.utime(str(source), ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 10 ** 9))
+        assert manifest.load(path) is None
+
+    def test_load_broken_structure(self, tmp_path):
+        path = str(tmp_path / 'manifest.json')
+        cache = manifest.dump(build_tree(), path)
+        for key, value in [('sources', None), ('commands', [{}]),
+                           ('tree', None)]:
+            data = dict(cache.data)
+            data[key] = value
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            assert manifest.load(path, build_tree()) is None
+        with open(path, 'w') as f:
+            json.dump({'version': manifest.MANIFEST_VERSION,
+                       'uroboros': cache.data['uroboros']}, f)
+        assert manifest.load(path) is None
+
+    def test_tree_changed(self, tmp_path):
+        path = str(tmp_path / 'manifest.json')
+        manifest.dump(build_tree(), path)
+        assert manifest.load(path, build_tree()) is not None
+        # A sub command is added in the main script
+        root = build_tree()
+        root.add_command(ThirdCommand())
+        assert manifest.load(path, root) is None
+        # Commands by import strings are compared without loading them
+        root = RootCommand()
+        root.add_command('tests.base:SecondCommand', name='second')
+        manifest.dump(root, path)
+        root = RootCommand()
+        root.add_command('tests.base:SecondCommand', name='second')
+        assert manifest.load(path, root) is not None
+        assert root.sub_commands[0]._command is None
+
+    @pytest.mark.parametrize(
+        'argv,expected', [
+            ([], []),
+            (['--root'], []),
+            (['second'], ['second']),
+            (['second', '--second', '1', 'full', 'a'], ['second', 'full']),
+            (['second', '--', 'third'], ['second']),
+        ]
+    )
+    def test_resolve_path(self, tmp_path, argv, expected):
+        cache = manifest.dump(build_tree(), str(tmp_path / 'manifest.json'))
+        assert cache.resolve_path(argv) == expected
+
+    @pytest.mark.parametrize(
+        'argv,expected', [
+            (['s', 'f'], []),
+            (['second', 'f'], ['second', 'full']),
+            (['second', 't', '-h'], ['second', 'third']),
+            (['second', 'x'], ['second']),
+        ]
+    )
+    def test_resolve_abbreviated_path(self, tmp_path, argv, expected):
+        root = build_tree()
+        root.sub_commands[0].allow_sub_command_abbrev = True
+        cache = manifest.dump(root, str(tmp_path / 'manifest.json'))
+        assert cache.resolve_path(argv) == expected
+        assert cache.format_help(1) == root.sub_commands[0]._parser.format_help()
+
+    @pytest.mark.parametrize(
+        'argv,expected', [
+            (['-h'], 0),
+            (['second', '--help'], 1),
+            (['second', 'full', '-h'], 3),
+            (['second'], None),
+            (['--', '-h'], None),
+        ]
+    )
+    def test_find_help(self, tmp_path, argv, expected):
+        cache = manifest.dump(build_tree(), str(tmp_path / 'manifest.json'))
+        assert cache.find_help(argv) == expected
+
+    def test_format_help(self, tmp_path):
+        root = build_tree()
+        cache = manifest.dump(root, str(tmp_path / 'manifest.json'))
+        second = root.sub_commands[0]
+        parsers = [root._parser, second._parser] + \
+            [cmd._parser for cmd in second.sub_commands]
+        for index, parser in enumerate(parsers):
+            assert cache.format_help(index) == parser.format_help()
+
+
+class TestExecuteWithManifest(object):
+
+    module_name = 'tests.lazy_commands'
+
+    @pytest.fixture
+    def root(self, tmp_path):
+        sys.modules.pop(self.module_name, None)
+
+        class Root(RootCommand):
+            manifest_path = str(tmp_path / 'manifest.json')
+
+        root = Root()
+        root.add_command(
+            '{}:command'.format(self.module_name),
+            name='second', short_description='second command')
+        yield root
+        sys.modules.pop(self.module_name, None)
+
+    def test_build_manifest(self, root, capsys):
+        assert root.execute(['--root']) == 1
+        assert os.path.exists(root.manifest_path)
+
+    def test_help_without_import(self, root, capsys):
+        root.execute([])
+        sys.modules.pop(self.module_name)
+        expected = root._parser.format_help()
+        fresh = type(root)()
+        fresh.add_command(
+            '{}:command'.format(self.module_name),
+            name='second', short_description='second command')
+        capsys.readouterr()
+        with pytest.raises(SystemExit) as e:
+            fresh.execute(['-h'])
+        assert e.value.code == 0
+        assert capsys.readouterr().out == expected
+        assert self.module_name not in sys.modules
+        assert fresh._parser is None
+
+    def test_dispatch(self, root, capsys):
+        root.execute([])
+        capsys.readouterr()
+        assert root.execute(['second', 'third']) == 0
+        assert capsys.readouterr().out == 'third\n'
@@ -0,0 +1,198 @@
+import argparse
+import copy
+
+import pytest
+
+from uroboros import Command, ExitStatus, Option
+from uroboros.namespace import (
+    Deferred, LazyNamespace, defer, deferred, force, lazy_default)
+
+
+class Counter(object):
+
+    def __init__(self):
+        self.calls = []
+        # Shown in the error messages as the name of the type
+        self.__name__ = 'count'
+
+    def __call__(self, value):
+        self.calls.append(value)
+        return int(value)
+
+
+class CountOption(Option):
+
+    def __init__(self, counter):
+        super(CountOption, self).__init__()
+        self.counter = counter
+
+    def build_option(self, parser):
+        parser.add_argument('--count', type=deferred(self.counter))
+        parser.add_argument('--sizes', type=deferred(self.counter),
+                            nargs='*', default=[])
+        return parser
+
+    def after_validate(self, safe_args):
+        defer(safe_args, 'double', self.counter.__call__, '2')
+        return safe_args
+
+
+class ReadCommand(Command):
+    name = 'read'
+
+    def __init__(self, counter, read=True, lazy=True):
+        super(ReadCommand, self).__init__()
+        self.options = [CountOption(counter)]
+        if lazy:
+            self.namespace_class = LazyNamespace
+        self.read = read
+        self.values = None
+
+    def run(self, args):
+        if self.read:
+            self.values = (args.count, args.sizes)
+        return ExitStatus.SUCCESS
+
+
+class ForceCommand(ReadCommand):
+
+    def validate(self, args):
+        return force(args, 'count')
+
+
+class TestLazyNamespace(object):
+
+    def test_not_read(self):
+        counter = Counter()
+        cmd = ReadCommand(counter, read=False)
+        assert cmd.execute(['--count', '1', '--sizes', '2']) == \
+            ExitStatus.SUCCESS
+        assert counter.calls == []
+
+    def test_read_once(self):
+        counter = Counter()
+        namespace = LazyNamespace(count=Deferred(counter, '3'))
+        assert 'count' in namespace
+        assert namespace.count == 3
+        assert namespace.count == 3
+        assert counter.calls == ['3']
+        assert vars(namespace) == {'count': 3}
+
+    def test_execute(self):
+        counter = Counter()
+        cmd = ReadCommand(counter)
+        assert cmd.execute(['--count', '1', '--sizes', '2', '3']) == \
+            ExitStatus.SUCCESS
+        assert cmd.values == (1, [2, 3])
+        # `double` is never read
+        assert counter.calls == ['1', '2', '3']
+
+    def test_defer(self):
+        counter = Counter()
+        namespace = LazyNamespace()
+        defer(namespace, 'value', counter, '4')
+        assert counter.calls == []
+        assert namespace.value == 4
+        plain = argparse.Namespace()
+        defer(plain, 'value', counter, '5')
+        assert plain.value == 5
+
+    def test_conversion_error(self):
+        cmd = ReadCommand(Counter())
+        with pytest.raises(ValueError):
+            cmd.execute(['--count', 'x'])
+
+    def test_force(self, caplog):
+        counter = Counter()
+        cmd = ForceCommand(counter, read=False)
+        assert cmd.execute(['--count', 'x']) == ExitStatus.FAILURE
+        assert caplog.record_tuples[-1][2] == \
+            "argument count: invalid count value: 'x'"
+        assert cmd.execute(['--count', '1', '--sizes', '2']) == \
+            ExitStatus.SUCCESS
+        assert counter.calls == ['x', '1']
+
+    def test_force_list(self):
+        namespace = LazyNamespace(
+            sizes=[Deferred(int, '1'), Deferred(int, 'y')])
+        errors = force(namespace)
+        assert [str(e) for e in errors] == \
+            ["argument sizes: invalid int value: 'y'"]
+        assert 'sizes' not in vars(namespace)
+
+    def test_plain_namespace(self):
+        counter = Counter()
+        cmd = ReadCommand(counter, read=True, lazy=False)
+        assert cmd.execute(['--count', '1', '--sizes', '2']) == \
+            ExitStatus.SUCCESS
+        assert cmd.values == (1, [2])
+        assert counter.calls == ['1', '2', '2']
+
+    def test_plain_namespace_error(self, capsys):
+        cmd = ReadCommand(Counter(), lazy=False)
+        with pytest.raises(SystemExit):
+            cmd.execute(['--count', 'x'])
+        assert "argument count: invalid count value: 'x'" in \
+            capsys.readouterr().err
+
+    def test_copy(self):
+        counter = Counter()
+        namespace = LazyNamespace(count=Deferred(counter, '1'))
+        copied = copy.copy(namespace)
+        assert copied.count == 1
+        assert namespace.count == 1
+        assert counter.calls == ['1']
+
+    def test_repr(self):
+        namespace = LazyNamespace(count=Deferred(int, '1'))
+        assert repr(namespace) == "LazyNamespace(count=<deferred int('1')>)"
+        assert namespace == argparse.Namespace(count=1)
+
+
+class ProbeCommand(Command):
+    name = 'probe'
+
+    def __init__(self, probe, lazy=True):
+        super(ProbeCommand, self).__init__()
+        if lazy:
+            self.namespace_class = LazyNamespace
+        self.probe = probe
+        self.jobs = None
+
+    def build_option(self, parser):
+        parser.add_argument('--jobs', type=int,
+                            default=lazy_default(self.probe, '8'),
+                            help='Number of jobs (default: %(default)s)')
+        return parser
+
+    def run(self, args):
+        self.jobs = args.jobs
+        return ExitStatus.SUCCESS
+
+
+class TestLazyDefault(object):
+
+    @pytest.mark.parametrize('lazy', [True, False])
+    def test_given(self, lazy):
+        probe = Counter()
+        cmd = ProbeCommand(probe, lazy)
+        assert cmd.execute(['--jobs', '2']) == ExitStatus.SUCCESS
+        assert cmd.jobs == 2
+        assert probe.calls == []
+
+    @pytest.mark.parametrize('lazy', [True, False])
+    def test_cached(self, lazy):
+        probe = Counter()
+        cmd = ProbeCommand(probe, lazy)
+        assert cmd.execute_many([[], [], ['--jobs', '1']]) == \
+            [ExitStatus.SUCCESS] * 3
+        assert cmd.jobs == 1
+        assert probe.calls == ['8']
+
+    def test_help(self, capsys):
+        probe = Counter()
+        cmd = ProbeCommand(probe, lazy=False)
+        with pytest.raises(SystemExit):
+            cmd.execute(['-h'])
+        assert probe.calls == []
+        assert "<deferred count('8')>" in capsys.readouterr().out
@@ -0,0 +1,215 @@
+import io
+import json
+
+import pytest
+
+from uroboros import Command, ExitStatus
+from uroboros import output
+from uroboros.errors import OutputClosedError
+from uroboros.jobs import JobsOption
+
+
+class ClosedStream(io.StringIO):
+
+    def write(self, text):
+        raise BrokenPipeError()
+
+
+class CountingStream(io.StringIO):
+
+    def __init__(self):
+        super(CountingStream, self).__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super(CountingStream, self).write(text)
+
+
+RECORDS = [
+    {'name': 'alpha', 'size': 1},
+    {'name': 'b', 'size': 100},
+]
+
+
+class TestOutput(object):
+
+    def test_ndjson(self):
+        stream = io.StringIO()
+        out = output.create('ndjson', stream)
+        out.emit_many(RECORDS)
+        out.emit([1, None])
+        assert stream.getvalue() == ''
+        out.close()
+        lines = stream.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == RECORDS + [[1, None]]
+
+    def test_csv(self):
+        stream = io.StringIO()
+        out = output.create('csv', stream)
+        out.emit_many(RECORDS)
+        out.emit({'size': 3, 'name': 'c,d'})
+        out.close()
+        assert stream.getvalue() == \
+            'name,size\nalpha,1\nb,100\n"c,d",3\n'
+
+    def test_table(self):
+        stream = io.StringIO()
+        out = output.create('table', stream)
+        out.emit_many(RECORDS)
+        out.close()
+        assert stream.getvalue() == \
+            'name   size\n' \
+            'alpha     1\n' \
+            'b       100\n'
+
+    def test_table_sample(self, monkeypatch):
+        monkeypatch.setattr(output, 'TABLE_SAMPLE_SIZE', 2)
+        stream = io.StringIO()
+        out = output.create('table', stream)
+        out.emit_many(RECORDS)
+        out.flush()
+        # Widths are decided by the first records
+        assert stream.getvalue().count('\n') == 3
+        out.emit({'name': 'longer', 'size': 2})
+        out.close()
+        assert stream.getvalue().splitlines()[-1] == 'longer     2'
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            output.create('xml')
+
+    def test_buffered(self):
+        stream = CountingStream()
+        out = output.create('ndjson', stream)
+        out.emit_many({'value': 'x' * 100} for _ in range(2000))
+        out.close()
+        assert len(stream.getvalue().splitlines()) == 2000
+        assert stream.writes <= 4
+
+    def test_closed(self):
+        out = output.create('ndjson', ClosedStream())
+        with pytest.raises(OutputClosedError):
+            out.emit_many({'value': 'x' * 100} for _ in range(2000))
+        assert out.closed
+        with pytest.raises(OutputClosedError):
+            out.emit({'value': 1})
+
+
+class ListCommand(Command):
+    name = 'list'
+
+    def __init__(self, count=2):
+        super(ListCommand, self).__init__()
+        self.count = count
+
+    def run(self, args):
+        for i in range(self.count):
+            self.out.emit({'index': i, 'name': 'item{}'.format(i)})
+        return ExitStatus.SUCCESS
+
+
+class RootCommand(Command):
+    name = 'root'
+    allow_output = True
+    output_format = 'ndjson'
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+def build(count=2):
+    root = RootCommand()
+    root.add_command(ListCommand(count))
+    return root
+
+
+class TestCommandOutput(object):
+
+    def test_default_format(self, capsys):
+        assert build().execute(['list']) == ExitStatus.SUCCESS
+        assert capsys.readouterr().out == \
+            '{"index": 0, "name": "item0"}\n{"index": 1, "name": "item1"}\n'
+
+    def test_output_option(self, capsys):
+        root = build()
+        assert root.execute(['--output', 'csv', 'list']) == ExitStatus.SUCCESS
+        assert capsys.readouterr().out == 'index,name\n0,item0\n1,item1\n'
+        # The format is chosen in each execution
+        assert root.execute(['list']) == ExitStatus.SUCCESS
+        assert capsys.readouterr().out.startswith('{"index": 0')
+
+    def test_no_output_option(self, capsys):
+        class PlainRootCommand(RootCommand):
+            allow_output = False
+
+        root = PlainRootCommand()
+        with pytest.raises(SystemExit):
+            root.execute(['--output', 'csv'])
+        assert '--output' not in capsys.readouterr().out
+
+    def test_broken_pipe(self, monkeypatch):
+        monkeypatch.setattr('sys.stdout', ClosedStream())
+        root = build(count=5000)
+        status = root.execute(['list'])
+        assert status == ExitStatus.FATAL_SIGNAL_13
+        assert int(status) == 141
+
+    def test_broken_pipe_on_return(self, monkeypatch):
+        # Records fitting in the buffer are written after `run` returns
+        monkeypatch.setattr('sys.stdout', ClosedStream())
+        assert build().execute(['list']) == ExitStatus.FATAL_SIGNAL_13
+
+    def test_async(self, capsys):
+        class AsyncListCommand(ListCommand):
+
+            async def run(self, args):
+                return super(AsyncListCommand, self).run(args)
+
+        root = RootCommand()
+        root.add_command(AsyncListCommand())
+        assert root.execute(['--output', 'csv', 'list']) == \
+            ExitStatus.SUCCESS
+        assert capsys.readouterr().out == 'index,name\n0,item0\n1,item1\n'
+
+
+class WordsCommand(Command):
+    name = 'words'
+
+    def __init__(self, executor, count=1):
+        super(WordsCommand, self).__init__()
+        self.options = [JobsOption('words', executor=executor)]
+        self.count = count
+
+    def build_option(self, parser):
+        parser.add_argument('words', nargs='*')
+        return parser
+
+    def run(self, args):
+        for word in args.words:
+            for _ in range(self.count):
+                self.out.emit({'word': word})
+        return ExitStatus.SUCCESS
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_jobs(executor, capsys):
+    root = RootCommand()
+    root.add_command(WordsCommand(executor))
+    argv = ['--output', 'csv', 'words', '-j', '3', 'a', 'b', 'c']
+    assert root.execute(argv) == ExitStatus.SUCCESS
+    assert capsys.readouterr().out == \
+        'word\na\nword\nb\nword\nc\n'
+
+
+def test_jobs_thread(capsys):
+    root = RootCommand()
+    root.add_command(WordsCommand('thread', count=100))
+    words = [str(i) for i in range(20)]
+    for _ in range(5):
+        assert root.execute(['words', '-j', '8'] + words) == \
+            ExitStatus.SUCCESS
+        lines = capsys.readouterr().out.splitlines()
+        # Records of each job are neither lost nor mixed with the others
+        assert lines == ['{{"word": "{}"}}'.format(word)
+                         for word in words for _ in range(100)]
@@ -0,0 +1,110 @@
+import os
+import pstats
+import time
+
+import pytest
+
+from uroboros import Command, ExitStatus
+from uroboros import profiling
+
+
+def busy(seconds):
+    # Consume CPU time to be sampled on SIGPROF
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+class RootCommand(Command):
+    name = 'root'
+
+    def run(self, args):
+        return ExitStatus.SUCCESS
+
+
+class BusyCommand(Command):
+    name = 'busy'
+
+    def before_validate(self, unsafe_args):
+        busy(0.05)
+        return unsafe_args
+
+    def run(self, args):
+        busy(0.2)
+        return ExitStatus.SUCCESS
+
+
+def execute(argv):
+    root = RootCommand()
+    root.add_command(BusyCommand())
+    return root.execute(argv)
+
+
+@pytest.fixture
+def output(monkeypatch, tmpdir):
+    path = str(tmpdir.join('{name}.out'))
+    monkeypatch.setenv(profiling.ENV_OUTPUT, path)
+    return path.format(name='root')
+
+
+def function_names(path):
+    return {name for _, _, name in pstats.Stats(path).stats}
+
+
+class TestProfiler(object):
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.delenv(profiling.ENV_NAME, raising=False)
+        assert profiling.from_env() is None
+
+    def test_unknown(self, monkeypatch, output):
+        monkeypatch.setenv(profiling.ENV_NAME, 'unknown')
+        assert profiling.from_env() is None
+        assert execute(['busy']) == ExitStatus.SUCCESS
+        assert not os.path.exists(output)
+
+    def test_cprofile(self, monkeypatch, output):
+        monkeypatch.setenv(profiling.ENV_NAME, 'cprofile')
+        assert execute(['busy']) == ExitStatus.SUCCESS
+        names = function_names(output)
+        assert {'initialize', 'before_validate', 'run'} <= names
+
+    def test_cprofile_phase(self, monkeypatch, output):
+        monkeypatch.setenv(profiling.ENV_NAME, 'cprofile')
+        monkeypatch.setenv(profiling.ENV_PHASE, 'run')
+        assert execute(['busy']) == ExitStatus.SUCCESS
+        names = function_names(output)
+        assert 'run' in names
+        assert 'initialize' not in names
+        assert 'before_validate' not in names
+
+    def test_default_path(self, monkeypatch, tmpdir):
+        monkeypatch.chdir(tmpdir)
+        monkeypatch.setenv(profiling.ENV_NAME, 'cprofile')
+        execute(['busy'])
+        execute(['busy'])
+        # Executions in a process do not overwrite the others
+        paths = sorted(tmpdir.listdir())
+        assert len(paths) == 2
+        for path in paths:
+            name, pid, seq, extension = path.basename.split('.')
+            assert (name, pid, extension) == ('root', str(os.getpid()), 'prof')
+        seqs = sorted(int(path.basename.split('.')[2]) for path in paths)
+        assert seqs[1] == seqs[0] + 1
+
+    @pytest.mark.skipif(not hasattr(__import__('signal'), 'setitimer'),
+                        reason='setitimer is not available')
+    def test_sample(self, monkeypatch, output):
+        monkeypatch.setenv(profiling.ENV_NAME, 'sample')
+        monkeypatch.setenv(profiling.ENV_PHASE, 'run')
+        monkeypatch.setenv(profiling.ENV_INTERVAL, '0.001')
+        assert execute(['busy']) == ExitStatus.SUCCESS
+        with open(output) as f:
+            lines = f.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0
+            # Only the run phase is sampled
+            assert 'before_validate' not in stack
+        assert any('run (' in line and 'busy (' in line for line in lines)
@@ -0,0 +1,208 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from uroboros import server
+from .base import RootCommand
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, 'AF_UNIX'), reason='Unix domain socket is required')
+
+SERVER_SCRIPT = """
+import os
+import sys
+
+from uroboros import Command, server
+from tests.base import RootCommand, SecondCommand
+
+
+class PidCommand(Command):
+    name = 'pid'
+
+    def run(self, args):
+        import gc
+        import time
+        print(os.getpid(), getattr(gc, 'get_freeze_count', lambda: 1)())
+        time.sleep(0.3)
+        return 0
+
+
+class EnvCommand(Command):
+    name = 'env'
+
+    def run(self, args):
+        print(os.environ.get('UROBOROS_TEST'), os.getcwd())
+        print(sys.stdin.read().upper(), end='')
+        return 3
+
+
+root = RootCommand()
+root.add_command(SecondCommand(), EnvCommand(), PidCommand())
+server.serve(root, sys.argv[1], int(sys.argv[2]), float(sys.argv[3]))
+"""
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(tmp_path_factory, workers, timeout=10.0):
+    path = str(tmp_path_factory.mktemp('server') / 'uroboros.sock')
+    proc = subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT, path, str(workers),
+         str(timeout)],
+        cwd=ROOT_DIR)
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        time.sleep(0.05)
+    return proc, path
+
+
+@pytest.fixture(scope='module')
+def socket_path(tmp_path_factory):
+    proc, path = start_server(tmp_path_factory, 0, timeout=0.5)
+    yield path
+    proc.terminate()
+    proc.wait()
+
+
+def call(socket_path, tmp_path, argv, stdin=b'', **kwargs):
+    paths = [str(tmp_path / name) for name in ('stdin', 'stdout', 'stderr')]
+    with open(paths[0], 'wb') as f:
+        f.write(stdin)
+    with open(paths[0], 'rb') as i, open(paths[1], 'wb') as o, \
+            open(paths[2], 'wb') as e:
+        status = server.call(socket_path, argv,
+                             stdio=(i.fileno(), o.fileno(), e.fileno()),
+                             **kwargs)
+    outputs = []
+    for path in paths[1:]:
+        with open(path, 'r') as f:
+            outputs.append(f.read())
+    return status, outputs[0], outputs[1]
+
+
+class TestServer(object):
+
+    def test_execute(self, socket_path, tmp_path):
+        status, out, _ = call(socket_path, tmp_path, ['second'])
+        assert status == 0
+        assert out == '0\n'
+
+    def test_env_cwd_stdin(self, socket_path, tmp_path):
+        status, out, _ = call(
+            socket_path, tmp_path, ['env'], stdin=b'hello\n',
+            env={'UROBOROS_TEST': 'value'}, cwd=str(tmp_path))
+        assert status == 3
+        assert out == 'value {}\nHELLO\n'.format(
+            os.path.realpath(str(tmp_path)))
+
+    def test_validation_error(self, socket_path, tmp_path):
+        status, _, err = call(
+            socket_path, tmp_path, ['second', '--second', '1'])
+        assert status == 1
+        assert 'second' in err
+
+    def test_usage_error(self, socket_path, tmp_path):
+        status, _, err = call(socket_path, tmp_path, ['unknown'])
+        assert status == 2
+        assert 'invalid choice' in err
+
+    def test_help(self, socket_path, tmp_path):
+        status, out, _ = call(socket_path, tmp_path, ['-h'])
+        assert status == 0
+        assert out.startswith('usage: root')
+
+    def test_socket_permission(self, socket_path):
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+    def test_invalid_cwd(self, socket_path, tmp_path):
+        status, _, err = call(socket_path, tmp_path, ['second'],
+                              cwd=str(tmp_path / 'missing'))
+        assert status == 1
+        assert 'missing' in err
+        # The server keeps working
+        assert call(socket_path, tmp_path, ['second'])[0] == 0
+
+    def test_missing_fds(self, socket_path, tmp_path):
+        with open(str(tmp_path / 'stdin'), 'wb') as f:
+            f.write(b'')
+        with open(str(tmp_path / 'stdin'), 'rb') as i:
+            assert server.call(socket_path, ['second'],
+                               stdio=(i.fileno(),)) == 1
+
+    def test_stalled_client(self, socket_path, tmp_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stalled:
+            stalled.connect(socket_path)
+            started = time.monotonic()
+            assert call(socket_path, tmp_path, ['second'])[0] == 0
+            assert time.monotonic() - started < 5
+
+    def test_sequential_requests(self, socket_path, tmp_path):
+        for value in range(3):
+            status, out, _ = call(socket_path, tmp_path, [])
+            assert status == 0
+            assert out == 'False\n'
+
+
+class TestBind(object):
+
+    def test_not_socket(self, tmp_path):
+        path = tmp_path / 'file'
+        path.write_text('data')
+        srv = server.Server(RootCommand(), str(path))
+        with pytest.raises(FileExistsError):
+            srv.bind()
+        assert path.read_text() == 'data'
+
+    def test_stale_socket(self, tmp_path, monkeypatch):
+        def umask(mask):
+            raise AssertionError('The umask of the process is changed.')
+        monkeypatch.setattr(os, 'umask', umask)
+        path = str(tmp_path / 'uroboros.sock')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(path)
+        srv = server.Server(RootCommand(), path)
+        srv.bind()
+        try:
+            assert os.stat(path).st_mode & 0o777 == 0o600
+        finally:
+            srv.close()
+        assert not os.path.exists(path)
+
+
+class TestPreforkServer(object):
+
+    def test_workers(self, tmp_path_factory):
+        proc, path = start_server(tmp_path_factory, 2)
+        results = []
+
+        def request(i):
+            tmp_path = tmp_path_factory.mktemp('client')
+            results.append(call(path, tmp_path, ['pid']))
+
+        threads = [threading.Thread(target=request, args=(i,))
+                   for i in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        pids = set()
+        for status, out, _ in results:
+            assert status == 0
+            pid, freeze_count = map(int, out.split())
+            assert freeze_count > 0
+            pids.add(pid)
+        assert len(pids) == 2
+        assert proc.pid not in pids
+
+        proc.terminate()
+        assert proc.wait() == 0
+        assert not os.path.exists(path)
+        for pid in pids:
+            with pytest.raises(ProcessLookupError):
+                os.kill(pid, 0)
@@ -1,8 +1,10 @@
+import io
 from unittest import mock
 
 import pytest
 
 from uroboros import utils
+from uroboros.constants import ExitStatus
 
 incrementer = mock.MagicMock()
 incrementer.method = lambda x: x+1
@@ -21,3 +23,53 @@ decrementer.method = lambda x: x-1
 )
 def test_call_one_by_one(objs, expected):
     assert utils.call_one_by_one(objs, "method", 0) == expected
+
+
+@pytest.mark.parametrize(
+    'statuses,expected', [
+        ([], ExitStatus.SUCCESS),
+        ([0, 0], ExitStatus.SUCCESS),
+        ([0, 2, 1], ExitStatus.MISS_USAGE),
+        ([1, 0], ExitStatus.FAILURE),
+        ([0, 256], ExitStatus.OUT_OF_RANGE),
+    ]
+)
+def test_aggregate_exit_status(statuses, expected):
+    assert utils.aggregate_exit_status(statuses) == expected
+
+
+@pytest.mark.parametrize(
+    'code,expected', [
+        (None, 0),
+        (2, 2),
+        ('message', 1),
+    ]
+)
+def test_get_exit_code(code, expected):
+    assert utils.get_exit_code(code) == expected
+
+
+@pytest.mark.parametrize('text,separator,expected', [
+    ('a\nb c\n\nd', '\n', ['a', 'b c', '', 'd']),
+    ('a\x00b\nc\x00', '\x00', ['a', 'b\nc']),
+    ('abc\x00de\x00f', '\x00', ['abc', 'de', 'f']),
+])
+def test_iter_records(text, separator, expected):
+    stream = io.StringIO(text)
+    assert list(utils.iter_records(stream, separator, bufsize=2)) == expected
+
+
+def test_lazy_logger():
+    import logging
+
+    class Logged(object):
+        logger = utils.LazyLogger('uroboros.test_lazy_logger')
+
+    real = logging.getLogger('uroboros.test_lazy_logger')
+    assert Logged.logger is real
+    assert isinstance(Logged().logger, logging.Logger)
+    Logged.logger.propagate = False
+    try:
+        assert real.propagate is False
+    finally:
+        real.propagate = True
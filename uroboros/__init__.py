@@ -1,6 +1,39 @@
-from .command import Command  # NOQA
-from .option import Option  # NOQA
-from .constants import ExitStatus  # NOQA
-
+import sys as _sys
 
 version = "0.2.5"
+
+# Names exported by `from uroboros import *`. The lazy attributes are
+# imported by it.
+__all__ = ['Command', 'Option', 'ExitStatus', 'version']
+
+# Modules of the attributes of this package. They are imported on the first
+# access, so that importing this package alone costs little.
+_LAZY_ATTRIBUTES = {
+    'Command': 'uroboros.command',
+    'Option': 'uroboros.option',
+    'ExitStatus': 'uroboros.constants',
+}
+
+# Sub modules which were imported with this package
+_SUBMODULES = ('command', 'constants', 'errors', 'manifest', 'option', 'utils')
+
+if _sys.version_info >= (3, 7):
+    def __getattr__(name):
+        import importlib
+        if name in _SUBMODULES:
+            return importlib.import_module('{}.{}'.format(__name__, name))
+        module_name = _LAZY_ATTRIBUTES.get(name)
+        if module_name is None:
+            raise AttributeError(
+                "module '{}' has no attribute '{}'".format(__name__, name))
+        value = getattr(importlib.import_module(module_name), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+else:
+    # Module `__getattr__` is not supported
+    from .command import Command  # NOQA
+    from .option import Option  # NOQA
+    from .constants import ExitStatus  # NOQA
@@ -1,23 +1,137 @@
 import abc
 import argparse
-import logging
+import collections
+import importlib
 import sys
-from typing import TYPE_CHECKING
 
 from uroboros import errors
+from uroboros import importtime
+from uroboros import instrumentation
 from uroboros import utils
-from uroboros.constants import ExitStatus
+from uroboros.constants import TYPE_CHECKING, ExitStatus
 
 if TYPE_CHECKING:
-    from typing import List, Dict, Optional, Union, Set
+    import asyncio
+    from typing import (
+        Any, Awaitable, Callable, List, Dict, Iterable, Iterator, Optional,
+        Union, Set, TextIO, Tuple, Type)
+    from uroboros.instrumentation import Instrument
+    from uroboros.output import Output
     from uroboros.option import Option
     CommandDict = Dict['Command', 'Optional[Command]']
+    PrefixTable = Dict[str, Optional[str]]
+    InitTask = Tuple['Command', argparse.ArgumentParser, Optional[List[str]],
+                     bool]
+    Hook = Callable[[argparse.Namespace], Any]
+    HookChain = Dict[str, List[Hook]]
+    OptionActions = Dict[Tuple[Option, ...], Optional['_ParentActions']]
+
+# Record the imports of the modules of commands defined after this
+importtime.enable_from_env()
+
+# Destination of `--batch` option
+_BATCH_DEST = '__batch_file'
+_XARGS_DEST = '__xargs_template'
+_NULL_DEST = '__xargs_null'
+_COMPLETION_DEST = '__completion_shell'
+_OUTPUT_DEST = '__output_format'
+
+# Attribute receiving the sub parser to parse the rest of the arguments
+_SUB_PARSER_DEST = '__sub_parser'
+
+# Methods of commands and options which can be coroutine functions
+_HOOK_NAMES = ('before_validate', 'validate', 'after_validate')
+
+
+class _PartialArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser built only for a part of the command tree.
+
+    The help and error messages of an incomplete parser lack some sub
+    commands, so this raises `errors.PartialParserError` instead of
+    printing them.
+    """
+
+    # Whether the parsers of all sub commands have been built
+    complete = False
+
+    def print_help(self, file=None):
+        if not self.complete:
+            raise errors.PartialParserError(self.prog)
+        return super().print_help(file)
+
+    def error(self, message: str):
+        if not self.complete:
+            raise errors.PartialParserError(self.prog)
+        return super().error(message)
+
+
+class _AbbrevChoices(collections.OrderedDict):
+    """Sub parsers keyed by names which also accept unique prefixes.
+
+    This is ordered as argparse's one, so that the sub commands are shown
+    in the order of registration on Python 3.5.
+    """
+
+    def __init__(self, command: 'Command'):
+        super().__init__()
+        self.command = command
+
+    def resolve(self, name: str) -> str:
+        """Return the full name of the sub command abbreviated to `name`,
+        or `name` itself if it is not an abbreviation."""
+        cmd = self.command._find_sub_command(name)
+        return name if cmd is None else cmd.name
+
+    def __contains__(self, name: 'Any') -> bool:
+        return super().__contains__(self.resolve(name))
+
+    def __missing__(self, name: str) -> 'argparse.ArgumentParser':
+        full_name = self.resolve(name)
+        if full_name == name:
+            raise KeyError(name)
+        return self[full_name]
+
+
+class _LayeredSubParsersAction(argparse._SubParsersAction):
+    """Sub parsers action leaving the rest of the arguments to the caller.
+
+    argparse parses the arguments of a sub command inside this action, so
+    that the depth of the recursion grows with the depth of the tree.
+    `Command._parse_args` parses the layers one by one instead. It marks the
+    namespace by `_SUB_PARSER_DEST`, and this action stores the sub parser
+    and its arguments there. Unmarked namespaces are parsed as argparse does.
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if not hasattr(namespace, _SUB_PARSER_DEST):
+            return super().__call__(parser, namespace, values, option_string)
+        parser_name = values[0]
+        setattr(namespace, self.dest, parser_name)
+        try:
+            sub_parser = self._name_parser_map[parser_name]
+        except KeyError:
+            raise argparse.ArgumentError(
+                self, 'unknown parser {!r} (choices: {})'.format(
+                    parser_name, ', '.join(self._name_parser_map)))
+        setattr(namespace, _SUB_PARSER_DEST, (sub_parser, values[1:]))
+
+
+class _AbbrevSubParsersAction(_LayeredSubParsersAction):
+    """Sub parsers action accepting unique prefixes of the names"""
+
+    def __init__(self, *args, command: 'Command', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.choices = self._name_parser_map = _AbbrevChoices(command)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        values = [self.choices.resolve(values[0])] + values[1:]
+        super().__call__(parser, namespace, values, option_string)
 
 
 class Command(metaclass=abc.ABCMeta):
     """Define all actions as command."""
 
-    logger = logging.getLogger(__name__)
+    logger = utils.LazyLogger(__name__)
 
     # Name of this command. This name is used as command name in CLI directly.
     name = None  # type: Optional[str]
@@ -32,23 +146,126 @@ class Command(metaclass=abc.ABCMeta):
     # Option for this command
     options = []  # type: List[Option]
 
+    # Build only the parsers of the commands specified in the arguments.
+    # The others are built when the help or an error message needs them.
+    # This is referred only in the root command.
+    lazy_initialization = False
+
+    # Path of the manifest caching the command tree. If it is given, the
+    # commands are dispatched and the help is rendered from the manifest, and
+    # the parsers are built lazily. The manifest is rebuilt when it is stale.
+    # This is referred only in the root command.
+    manifest_path = None  # type: Optional[str]
+
+    # Add `--batch FILE` option which executes each line of FILE as arguments.
+    # This is referred only in the root command.
+    allow_batch = False
+
+    # Version of the structure of all trees to invalidate cached depths
+    _tree_version = 0
+
+    # Accept unique prefixes of the names of the sub commands of this command
+    # (e.g. `env g` for `env get`).
+    allow_sub_command_abbrev = False
+
+    # Add `--completion SHELL` option printing the shell completion script
+    # to the root command
+    allow_completion = False
+
+    # Run validators of the commands and options concurrently in threads
+    # (or on the event loop if they are coroutine functions). The errors are
+    # reported in the order of the validators. This is referred only in
+    # the root command.
+    concurrent_validation = False
+
+    # Maximum number of threads for the concurrent validation.
+    # If None is given, one thread is used for each validator.
+    validation_workers = None  # type: Optional[int]
+
+    # Stop the validation when any validator reports errors.
+    # This is referred only in the root command.
+    validation_fail_fast = False
+
+    # Receiver of the timings of the phases of the execution and the hooks.
+    # `UROBOROS_TIMING` and `UROBOROS_PROFILE` environment variables add
+    # the reporter and the profiler. See `uroboros.instrumentation`.
+    # This is referred only in the root command.
+    instrument = None  # type: Optional[Instrument]
+
+    # Class of the parsed arguments. `uroboros.namespace.LazyNamespace`
+    # converts the values declared as deferred on the first access.
+    # This is referred only in the root command.
+    namespace_class = None  # type: Optional[Type[argparse.Namespace]]
+
+    # Format of the records written to `out` ('ndjson', 'csv' or 'table').
+    # This is referred only in the root command.
+    output_format = 'table'
+
+    # Add `--output FORMAT` option choosing the format of the records.
+    # This is referred only in the root command.
+    allow_output = False
+
     def __init__(self):
-        # Remember the depth of nesting
-        self._layer = 0
+        # The command which this command is added to
+        self._parent = None  # type: Optional[Command]
+        # Depth of nesting when this command has no parent
+        self._root_layer = 0
+        # Depth of nesting and the root command cached with the version of
+        # the tree structure
+        self._cached_position = (-1, 0, self)  # type: Tuple[int, int, Command]
+        # Instances of the options given as classes in this tree.
+        # This is referred only in the root command.
+        self._option_registry = {}  # type: Dict[Type[Option], Option]
+        # Actions of the lists of options shared by the commands in this
+        # tree. This is referred only in the root command.
+        self._option_actions = {}  # type: OptionActions
+        # Ids of the parents registered by `register_parent`
+        self._registered_parent_ids = set()  # type: Set[int]
 
         self.sub_commands = []  # type: List[Command]
-        self._parent_ids = {id(self)}  # type: Set[int]
+        self._sub_command_ids = set()  # type: Set[int]
+        # Sub commands by their names to dispatch
+        self._sub_commands_by_name = {}  # type: Dict[str, Command]
+        # Unique prefixes of the names of sub commands.
+        # This is built on demand and cleared when a sub command is added.
+        self._sub_command_prefixes = None  # type: Optional[PrefixTable]
 
         # The option parser for this command
         # This is enabled after initialization.
         self._parser = None  # type: Optional[argparse.ArgumentParser]
+        # The sub parsers action holding the parsers of sub commands
+        self._sub_parsers = None  # type: Optional[argparse.Action]
 
-    def execute(self, argv: 'List[str]' = None) -> int:
+        # The import string if this command is registered lazily
+        self._import_path = None  # type: Optional[str]
+
+        # Hooks of the options and this command by their names. Hooks which
+        # are not overridden are dropped. This is compiled on demand and
+        # cleared when the parser is built.
+        self._hooks = None  # type: Optional[HookChain]
+        # Hooks of the paths from this command to the executed commands.
+        # This is referred only in the root command.
+        self._hook_chains = {}  # type: Dict[Tuple[Command, ...], HookChain]
+
+        # The sink of the records opened on demand while executing this
+        # command, and its format
+        self._out = None  # type: Optional[Output]
+        self._output_format = None  # type: Optional[str]
+
+    def execute(self,
+                argv: 'List[str]' = None,
+                loop: 'Optional[asyncio.AbstractEventLoop]' = None) -> int:
         """Execute the command and return exit code (integer)
 
+        If `run`, hooks or validators of the commands and options are
+        coroutine functions, they are run on an event loop.
+
         Args:
             argv (:obj: List[str], optional): Arguments to parse. If None is
                 given (e.g. do not pass any args), try to parse `sys.argv` .
+            loop (:obj: asyncio.AbstractEventLoop, optional): Event loop to
+                run coroutines. It must not be running. If None is given,
+                a new event loop is created and closed when it is required.
 
         Returns:
             int: Exit status code
@@ -56,35 +273,463 @@ class Command(metaclass=abc.ABCMeta):
         assert getattr(self, "name", None) is not None, \
             "{} does not have `name` attribute.".format(
                 self.__class__.__name__)
+        if argv is None:
+            argv = sys.argv[1:]
+        instrument = self._get_instrument()
+        if instrument is None:
+            return self._execute(argv, loop)
+        instrument.start(self)
+        status = None
         try:
-            self._check_initialized()
-        except errors.CommandNotRegisteredError:
-            self.initialize()
+            status = self._execute(argv, loop, instrument)
+            return status
+        finally:
+            instrument.finish(self, status)
+
+    def _execute(self,
+                 argv: 'List[str]',
+                 loop: 'Optional[asyncio.AbstractEventLoop]' = None,
+                 instrument: 'Optional[Instrument]' = None) -> int:
+        args = self._parse(argv, instrument)
+        status = self._execute_root_options(args, loop)
+        if status is not None:
+            return status
+        status = self._execute_parsed(args, instrument)
+        if utils.is_awaitable(status):
+            status = utils.run_until_complete(status, loop)
+        return status
+
+    async def execute_async(self, argv: 'List[str]' = None) -> int:
+        """Execute the command in the running event loop.
+
+        This is a coroutine version of `execute`. The synchronous `run`,
+        hooks and validators are called as they are.
+
+        Args:
+            argv (:obj: List[str], optional): Arguments to parse. If None is
+                given (e.g. do not pass any args), try to parse `sys.argv` .
+
+        Returns:
+            int: Exit status code
+        """
         if argv is None:
             argv = sys.argv[1:]
-        args = self._parser.parse_args(argv)
+        instrument = self._get_instrument()
+        if instrument is not None:
+            instrument.start(self)
+        status = None
+        try:
+            args = self._parse(argv, instrument)
+            status = self._execute_root_options(args, in_loop=True)
+            if status is None:
+                status = await self._execute_parsed_async(
+                    args, self.get_sub_commands(args), instrument)
+            return status
+        finally:
+            if instrument is not None:
+                instrument.finish(self, status)
+
+    def _execute_root_options(self,
+                              args: 'argparse.Namespace',
+                              loop: 'Optional[asyncio.AbstractEventLoop]'
+                              = None,
+                              in_loop: bool = False) -> 'Optional[int]':
+        """Execute the options of the root command changing the way to
+        execute (`--batch`, `--xargs` and `--completion`).
+
+        Args:
+            args (argparse.Namespace): Parsed arguments
+            loop (:obj: asyncio.AbstractEventLoop, optional): Event loop to
+                run coroutines of the batch execution
+            in_loop (bool): Called in a running event loop. The batch
+                execution is not available since it runs the loop.
+
+        Returns:
+            Optional[int]: Exit status, or None if none of them is given
+        """
+        batch_file = getattr(args, _BATCH_DEST, None)
+        shell = getattr(args, _COMPLETION_DEST, None)
+        if batch_file is None and shell is not None:
+            from uroboros import completion
+            sys.stdout.write(completion.generate(self, shell))
+            return ExitStatus.SUCCESS
+        if in_loop:
+            option = _find_executor_option(args)
+            if option is None:
+                return None
+            self.logger.error(
+                "{} cannot be used in `execute_async`.".format(option))
+            return ExitStatus.MISS_USAGE
+        if batch_file is not None:
+            return self._execute_batch(batch_file, loop)
+        template = getattr(args, _XARGS_DEST, None)
+        if template is not None:
+            return self._execute_xargs(
+                template, sys.stdin, getattr(args, _NULL_DEST), loop)
+        return None
+
+    def _get_instrument(self) -> 'Optional[Instrument]':
+        return instrumentation.from_env(self.instrument)
+
+    def execute_many(self,
+                     argvs: 'Iterable[List[str]]',
+                     loop: 'Optional[asyncio.AbstractEventLoop]' = None
+                     ) -> 'List[ExitStatus]':
+        """Execute the command for each arguments in order.
+
+        The parsers and hooks initialized once are reused for all arguments.
+        An error of parsing does not stop the execution. It results in the
+        exit status given to `SystemExit` instead. The options of the root
+        command changing the way to execute (`--batch`, `--xargs` and
+        `--completion`) fail with `ExitStatus.MISS_USAGE`.
+
+        Args:
+            argvs (Iterable[List[str]]): Arguments to parse for each execution
+            loop (:obj: asyncio.AbstractEventLoop, optional): Event loop to
+                run coroutines. See `execute`.
+
+        Returns:
+            List[ExitStatus]: Exit status of each execution
+        """
+        return list(self._iter_execute(argvs, loop))
+
+    def _iter_execute(self,
+                      argvs: 'Iterable[List[str]]',
+                      loop: 'Optional[asyncio.AbstractEventLoop]' = None
+                      ) -> 'Iterator[ExitStatus]':
+        own_loop = None
+        try:
+            for argv in argvs:
+                try:
+                    args = self._parse(argv)
+                except SystemExit as e:
+                    yield utils.to_exit_status(utils.get_exit_code(e.code))
+                    continue
+                option = _find_executor_option(args)
+                if option is not None:
+                    self.logger.error(
+                        "{} cannot be used in the arguments of batch "
+                        "execution.".format(option))
+                    yield ExitStatus.MISS_USAGE
+                    continue
+                status = self._execute_parsed(args)
+                if utils.is_awaitable(status):
+                    # Share an event loop among all executions
+                    if loop is None:
+                        loop = own_loop = utils.new_event_loop()
+                    status = loop.run_until_complete(status)
+                yield status
+        finally:
+            if own_loop is not None:
+                own_loop.close()
+
+    def _execute_batch(self,
+                       batch_file: 'TextIO',
+                       loop: 'Optional[asyncio.AbstractEventLoop]' = None
+                       ) -> 'ExitStatus':
+        """Execute each line of `batch_file` as arguments.
+
+        Empty lines and lines starting with '#' are ignored.
+
+        Returns:
+            ExitStatus: The first exit status which is not success
+        """
+        import shlex
+
+        def read_argvs():
+            for line in batch_file:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield shlex.split(line)
+        try:
+            return utils.aggregate_exit_status(
+                self._iter_execute(read_argvs(), loop))
+        finally:
+            if batch_file is not sys.stdin:
+                batch_file.close()
+
+    def _execute_xargs(self,
+                       template: 'List[str]',
+                       stream: 'TextIO',
+                       null: bool = False,
+                       loop: 'Optional[asyncio.AbstractEventLoop]' = None
+                       ) -> 'ExitStatus':
+        """Execute `template` with each record of `stream` appended.
+
+        Records are read one by one, so that the memory is bounded
+        regardless of the number of records. Empty records are ignored.
+
+        Args:
+            template (List[str]): Arguments preceding each record
+            stream (TextIO): Stream of the records
+            null (bool): Records are separated by NUL instead of newline
+
+        Returns:
+            ExitStatus: The first exit status which is not success
+        """
+        separator = '\0' if null else '\n'
+        argvs = (template + [record]
+                 for record in utils.iter_records(stream, separator)
+                 if record)
+        return utils.aggregate_exit_status(self._iter_execute(argvs, loop))
+
+    def _parse(self,
+               argv: 'List[str]',
+               instrument: 'Optional[Instrument]' = None
+               ) -> 'argparse.Namespace':
+        if self.manifest_path is not None or self.lazy_initialization or \
+                self._has_lazy_commands():
+            # The parsers are built on demand while parsing
+            with instrumentation.time_phase(
+                    instrument, instrumentation.PHASE_PARSE_ARGS, self):
+                if self.manifest_path is not None:
+                    return self._parse_with_manifest(argv)
+                return self._parse_lazily(argv)
+        try:
+            self._check_initialized()
+        except errors.CommandNotRegisteredError:
+            with instrumentation.time_phase(
+                    instrument, instrumentation.PHASE_INITIALIZE, self):
+                self.initialize()
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_PARSE_ARGS, self):
+            return self._parse_args(argv)
+
+    def _has_lazy_commands(self) -> bool:
+        """Whether the tree has commands given as import strings.
+
+        Their modules are imported only on demand, so that the parsers are
+        built lazily as `lazy_initialization` even if it is not set.
+        """
+        if self._parser is not None:
+            # Decided at the first parsing
+            return isinstance(self._parser, _PartialArgumentParser)
+        stack = [self]
+        while stack:
+            cmd = stack.pop()
+            if cmd._import_path is not None:
+                return True
+            stack.extend(cmd.sub_commands)
+        return False
+
+    def _parse_args(self, argv: 'List[str]') -> 'argparse.Namespace':
+        # Each layer is parsed on the arguments up to the name of its sub
+        # command, so that the cost of parsing does not grow with the depth.
+        namespace_class = self.namespace_class or argparse.Namespace
+        args = None
+        unrecognized = []  # type: List[str]
+        cmd, parser, layer, start = self, self._parser, self._layer, 0
+        while True:
+            stop = cmd._find_sub_command_index(argv, start)
+            if stop is not None:
+                stop += 1
+                layer_args, extras, sub = self._parse_layer(
+                    parser, argv[start:stop], namespace_class)
+                if sub is None or len(sub[1]) > 0:
+                    # The name was taken as a value of an option
+                    stop = None
+            if stop is None:
+                stop = len(argv)
+                layer_args, extras, sub = self._parse_layer(
+                    parser, argv[start:], namespace_class)
+            if args is None:
+                args = layer_args
+            else:
+                # Defaults of the sub command override the parent's ones
+                for key, value in vars(layer_args).items():
+                    setattr(args, key, value)
+            unrecognized.extend(extras)
+            if sub is None:
+                break
+            parser, rest = sub
+            start = stop - len(rest)
+            layer += 1
+            cmd = parser.get_default(utils.get_args_command_name(layer))
+            namespace_class = argparse.Namespace
+        if len(unrecognized) > 0:
+            self._parser.error(
+                'unrecognized arguments: {}'.format(' '.join(unrecognized)))
+        # Deferred values exist only if the module has been imported
+        namespace_module = sys.modules.get('uroboros.namespace')
+        if namespace_module is not None and \
+                not isinstance(args, namespace_module.LazyNamespace):
+            exceptions = namespace_module.force(args)
+            if len(exceptions) > 0:
+                self._parser.error(str(exceptions[0]))
+        return args
+
+    @staticmethod
+    def _parse_layer(parser: 'argparse.ArgumentParser',
+                     argv: 'List[str]',
+                     namespace_class: 'Type[argparse.Namespace]'
+                     ) -> 'Tuple[argparse.Namespace, List[str], Any]':
+        """Parse the arguments of a command without its sub commands.
+
+        Returns:
+            Tuple[argparse.Namespace, List[str], Any]: Parsed arguments,
+                unrecognized ones, and the sub parser with the rest of the
+                arguments or None
+        """
+        namespace = namespace_class()
+        setattr(namespace, _SUB_PARSER_DEST, None)
+        namespace, extras = parser.parse_known_args(argv, namespace)
+        sub = getattr(namespace, _SUB_PARSER_DEST)
+        delattr(namespace, _SUB_PARSER_DEST)
+        return namespace, extras, sub
+
+    def _execute_parsed(self,
+                        args: 'argparse.Namespace',
+                        instrument: 'Optional[Instrument]' = None
+                        ) -> 'Union[ExitStatus, Awaitable[ExitStatus]]':
+        """Execute parsed arguments.
+
+        Returns:
+            Union[ExitStatus, Awaitable[ExitStatus]]: Exit status, or an
+                awaitable of it if any of hooks, validators and `run` is
+                a coroutine function.
+        """
         commands = self.get_sub_commands(args)
+        if self._has_coroutine(args, commands):
+            return self._execute_parsed_async(args, commands, instrument)
         # Run hook before validation
-        args = self._pre_hook(args, commands)
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_BEFORE_VALIDATE, self):
+            args = self._pre_hook(args, commands, instrument)
         # Execute validation recursively
-        exceptions = self._validate_all(args, commands)
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_VALIDATE, self):
+            exceptions = self._validate_all(args, commands, instrument)
         # Exit with ExitStatus.FAILURE when the parameter validation is failed
         if len(exceptions) > 0:
             for exc in exceptions:
                 self.logger.error(str(exc))
             return ExitStatus.FAILURE
         # Run hook after validation
-        args = self._pre_hook_validated(args, commands)
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_AFTER_VALIDATE, self):
+            args = self._pre_hook_validated(args, commands, instrument)
         # Execute command
-        exit_code = args.func(args)
-        # FIXME: Just return when drop support for Python 3.5
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_RUN, self):
+            return self._run(args, commands[-1] if commands else self)
+
+    async def _execute_parsed_async(
+            self,
+            args: 'argparse.Namespace',
+            sub_commands: 'List[Command]',
+            instrument: 'Optional[Instrument]' = None) -> 'ExitStatus':
+        commands = [self] + sub_commands
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_BEFORE_VALIDATE, self):
+            args = await self._run_hooks_async(
+                args, commands, 'before_validate', instrument)
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_VALIDATE, self):
+            exceptions = await self._validate_all_async(
+                args, commands, instrument)
+        if len(exceptions) > 0:
+            for exc in exceptions:
+                self.logger.error(str(exc))
+            return ExitStatus.FAILURE
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_AFTER_VALIDATE, self):
+            args = await self._run_hooks_async(
+                args, commands, 'after_validate', instrument)
+        with instrumentation.time_phase(
+                instrument, instrumentation.PHASE_RUN, self):
+            return await utils.maybe_await(
+                self._run(args, sub_commands[-1] if sub_commands else self))
+
+    def _run(self,
+             args: 'argparse.Namespace',
+             command: 'Command'
+             ) -> 'Union[ExitStatus, Awaitable[ExitStatus]]':
+        """Call `run` of the command, then flush the records given to
+        its `out`."""
+        command._output_format = \
+            getattr(args, _OUTPUT_DEST, None) or self.output_format
+        try:
+            exit_code = args.func(args)
+        except errors.OutputClosedError:
+            command._close_output()
+            return _broken_pipe_status()
+        except BaseException:
+            command._close_output()
+            raise
+        if utils.is_awaitable(exit_code):
+            return self._await_run(exit_code, command)
+        return command._finish_output(utils.to_exit_status(exit_code))
+
+    async def _await_run(self,
+                         exit_code: 'Awaitable[Any]',
+                         command: 'Command') -> 'ExitStatus':
         try:
-            return ExitStatus(exit_code)
-        except ValueError:
-            if isinstance(exit_code, int):
-                if exit_code < 0 or exit_code > 255:
-                    return ExitStatus.OUT_OF_RANGE
-            return ExitStatus.INVALID
+            exit_code = await exit_code
+        except errors.OutputClosedError:
+            command._close_output()
+            return _broken_pipe_status()
+        except BaseException:
+            command._close_output()
+            raise
+        return command._finish_output(utils.to_exit_status(exit_code))
+
+    @property
+    def out(self) -> 'Output':
+        """The sink of the records written by `run`.
+
+        Records given to `out.emit` are serialized in the format chosen by
+        `--output` (see `allow_output`) or `output_format` of the root
+        command, and written to stdout in large chunks. The rest is flushed
+        when `run` returns. Each job of `uroboros.jobs.JobsOption` has its
+        own sink. See `uroboros.output`.
+        """
+        jobs_module = sys.modules.get('uroboros.jobs')
+        if jobs_module is not None:
+            out = jobs_module.job_output(self)
+            if out is not None:
+                return out
+        if self._out is None:
+            self._out = self._create_output()
+        return self._out
+
+    def _create_output(self) -> 'Output':
+        from uroboros import output
+        output_format = self._output_format or \
+            self._position()[1].output_format
+        return output.create(output_format, sys.stdout)
+
+    def _close_output(self) -> bool:
+        """Flush the records given to `out`.
+
+        Returns:
+            bool: False if the reader of the output has gone
+        """
+        out, self._out = self._out, None
+        if out is None:
+            return True
+        try:
+            out.close()
+        except errors.OutputClosedError:
+            return False
+        return True
+
+    def _finish_output(self, status: 'ExitStatus') -> 'ExitStatus':
+        if self._close_output():
+            return status
+        return _broken_pipe_status()
+
+    def _has_coroutine(self,
+                       args: 'argparse.Namespace',
+                       sub_commands: 'List[Command]') -> bool:
+        """Whether any of hooks, validators and `run` is a coroutine
+        function."""
+        if utils.is_coroutine_function(getattr(args, 'func', None)):
+            return True
+        for chain in self._hook_chain([self] + sub_commands).values():
+            for hook in chain:
+                if utils.is_coroutine_function(hook):
+                    return True
+        return False
 
     @abc.abstractmethod
     def run(self, args: 'argparse.Namespace') -> 'Union[ExitStatus, int]':
@@ -117,105 +762,428 @@ class Command(metaclass=abc.ABCMeta):
         """
         return parser
 
-    def initialize(self, parser: 'Optional[argparse.ArgumentParser]' = None):
+    def initialize(self,
+                   parser: 'Optional[argparse.ArgumentParser]' = None,
+                   path: 'Optional[List[str]]' = None):
         """Initialize this command and its sub commands recursively.
 
         Args:
             parser (argparse.ArgumentParser): ArgumentParser of parent command
+            path (:obj: List[str], optional): Names of the sub commands to
+                initialize from this command to the leaf. If None is given,
+                all sub commands are initialized.
         """
         if parser is None:
-            self._parser = self._create_default_parser()
-        else:
-            self._parser = parser
+            parser = self._create_default_parser(
+                argparse.ArgumentParser if path is None
+                else _PartialArgumentParser)
+        self._initialize_tree([(self, parser, path, True)])
+
+    def _initialize_sub_parsers(self,
+                                parser: 'argparse.ArgumentParser',
+                                path: 'Optional[List[str]]' = None):
+        """Build the parsers of sub commands, or extend the ones built
+        partially."""
+        self._initialize_tree([(self, parser, path, False)])
+
+    @staticmethod
+    def _initialize_tree(tasks: 'List[InitTask]'):
+        """Initialize commands in depth-first order.
+
+        The tree is traversed with a stack instead of recursion, so that
+        a deep tree does not exceed the recursion limit.
+
+        Args:
+            tasks (List[InitTask]): Commands with their parsers, the paths
+                to initialize and whether to initialize the commands
+                themselves or only their sub parsers.
+        """
+        while tasks:
+            cmd, parser, path, new = tasks.pop()
+            if new:
+                cmd._initialize_parser(parser)
+            tasks.extend(reversed(cmd._add_sub_parsers(parser, path)))
+
+    def _initialize_parser(self, parser: 'argparse.ArgumentParser'):
+        self._parser = parser
+        self._sub_parsers = None
+        # Options may have been changed
+        self._hooks = None
+        self._hook_chains = {}
         # Add validator
-        cmd_name = utils.get_args_command_name(self._layer)
-        self._parser.set_defaults(**{cmd_name: self})
+        self._parser.set_defaults(**{self._command_key: self})
         # Add function to execute
         self._parser.set_defaults(func=self.run)
         self.build_option(self._parser)
-        self._initialize_sub_parsers(self._parser)
 
-    def _initialize_sub_parsers(self, parser: 'argparse.ArgumentParser'):
+    def _add_sub_parsers(self,
+                         parser: 'argparse.ArgumentParser',
+                         path: 'Optional[List[str]]' = None
+                         ) -> 'List[InitTask]':
+        """Add the parsers of the sub commands on the path.
+
+        Returns:
+            List[InitTask]: Sub commands to initialize next
+        """
         if len(self.sub_commands) == 0:
-            return
-        parser = parser.add_subparsers(
-            dest=utils.get_args_section_name(self._layer),
-            title="Sub commands",
-        )
-        for cmd in self.sub_commands:
-            sub_parser = parser.add_parser(
+            parser.complete = True
+            return []
+        if self._sub_parsers is None:
+            kwargs = {'action': _LayeredSubParsersAction}
+            if self.allow_sub_command_abbrev:
+                kwargs.update(action=_AbbrevSubParsersAction, command=self)
+            self._sub_parsers = parser.add_subparsers(
+                dest=utils.get_args_section_name(self._layer),
+                title="Sub commands",
+                **kwargs
+            )
+        if path is None:
+            targets = self.sub_commands
+            sub_path = None
+        else:
+            cmd = self._find_sub_command(path[0]) if path else None
+            targets = [] if cmd is None else [cmd]
+            sub_path = path[1:]
+        built_parsers = self._sub_parsers.choices
+        tasks = []
+        for cmd in targets:
+            cmd = self._load_sub_command(cmd)
+            if cmd.name in built_parsers:
+                # Extend the tree which has already been built partially
+                tasks.append((cmd, cmd._parser, sub_path, False))
+                continue
+            sub_parser = self._sub_parsers.add_parser(
                 name=cmd.name,
                 description=cmd.long_description,
                 help=cmd.short_description,
-                parents=[o.get_parser() for o in cmd.get_options()],
             )
-            cmd.initialize(sub_parser)
+            cmd._add_option_actions(sub_parser)
+            tasks.append((cmd, sub_parser, sub_path, True))
+        if path is None:
+            self._sort_sub_parsers()
+            parser.complete = True
+        return tasks
+
+    def _sort_sub_parsers(self):
+        """Sort the sub parsers in the order of `sub_commands`.
+
+        The parsers built lazily are added in the order of use.
+        """
+        names = [cmd.name for cmd in self.sub_commands]
+        choices = self._sub_parsers.choices
+        if list(choices) == names:
+            return
+        parsers = [(name, choices[name]) for name in names]
+        choices.clear()
+        choices.update(parsers)
+        order = {name: i for i, name in enumerate(names)}
+        self._sub_parsers._choices_actions.sort(key=lambda a: order[a.dest])
 
-    def _create_default_parser(self) -> 'argparse.ArgumentParser':
-        parser = argparse.ArgumentParser(
+    def _find_sub_command(self, name: str) -> 'Optional[Command]':
+        """Find the sub command by its name or its unique prefix if
+        `allow_sub_command_abbrev` is set."""
+        cmd = self._sub_commands_by_name.get(name)
+        if cmd is not None or not self.allow_sub_command_abbrev:
+            return cmd
+        if self._sub_command_prefixes is None:
+            self._sub_command_prefixes = utils.build_prefix_table(
+                self._sub_commands_by_name)
+        full_name = self._sub_command_prefixes.get(name)
+        if full_name is None:
+            return None
+        return self._sub_commands_by_name[full_name]
+
+    def _find_sub_command_index(self,
+                                argv: 'List[str]',
+                                start: int = 0) -> 'Optional[int]':
+        """Find the index of the first name of a sub command in `argv`
+        from `start`, or None if there is no such argument."""
+        for i in range(start, len(argv)):
+            if argv[i] == '--':
+                break
+            if self._find_sub_command(argv[i]) is not None:
+                return i
+        return None
+
+    def _resolve_path(self, argv: 'List[str]') -> 'List[str]':
+        """Find the names of sub commands specified in `argv`.
+
+        This does not parse `argv`, so an option value which has the same
+        name as a sub command may be taken wrongly. It is harmless since
+        such a mistake is detected by the parser as an error.
+
+        Args:
+            argv (List[str]): Arguments to parse
+
+        Returns:
+            List[str]: Names of the sub commands from this command to the leaf
+        """
+        path = []
+        cmd = self
+        for arg in argv:
+            if arg == '--':
+                break
+            sub_cmd = cmd._find_sub_command(arg)
+            if sub_cmd is None:
+                continue
+            # Sub commands of a lazy command are known after loading it
+            cmd = cmd._load_sub_command(sub_cmd)
+            path.append(cmd.name)
+        return path
+
+    def _parse_lazily(self,
+                      argv: 'List[str]',
+                      path: 'Optional[List[str]]' = None
+                      ) -> 'argparse.Namespace':
+        """Parse `argv` with the parsers of the specified commands only.
+
+        If the parsers built partially cannot complete parsing (e.g. the help
+        or an error message is required), build all of them and parse again.
+        """
+        if path is None:
+            path = self._resolve_path(argv)
+        if self._parser is None:
+            self.initialize(path=path)
+        else:
+            self._initialize_sub_parsers(self._parser, path)
+        try:
+            return self._parse_args(argv)
+        except errors.PartialParserError:
+            pass
+        self.initialize()
+        return self._parse_args(argv)
+
+    def _parse_with_manifest(self,
+                             argv: 'List[str]') -> 'argparse.Namespace':
+        """Parse `argv` with the help of the manifest.
+
+        The help is printed from the manifest and exits as argparse does.
+        """
+        from uroboros import manifest
+        cache = manifest.load(self.manifest_path, self)
+        if cache is None:
+            cache = manifest.dump(self, self.manifest_path)
+        help_index = cache.find_help(argv)
+        if help_index is not None:
+            cache.print_help(help_index)
+            sys.exit(ExitStatus.SUCCESS)
+        return self._parse_lazily(argv, cache.resolve_path(argv))
+
+    def _create_default_parser(
+            self,
+            parser_class: 'Type[argparse.ArgumentParser]'
+            = argparse.ArgumentParser) -> 'argparse.ArgumentParser':
+        parser = parser_class(
             prog=self.name,
             description=self.long_description,
-            parents=[o.get_parser() for o in self.get_options()]
         )
+        self._add_option_actions(parser)
+        if self.allow_batch:
+            parser.add_argument(
+                '--batch', dest=_BATCH_DEST, metavar='FILE',
+                type=argparse.FileType('r'),
+                help='execute each line of FILE as arguments '
+                     '("-" reads stdin)')
+            parser.add_argument(
+                '--xargs', dest=_XARGS_DEST, metavar='ARGS',
+                nargs=argparse.REMAINDER,
+                help='execute ARGS followed by each line of stdin '
+                     '(must be the last option)')
+            parser.add_argument(
+                '-0', '--null', dest=_NULL_DEST, action='store_true',
+                help='lines of stdin given to --xargs are separated '
+                     'by NUL')
+        if self.allow_completion:
+            parser.add_argument(
+                '--completion', dest=_COMPLETION_DEST, metavar='SHELL',
+                choices=('bash', 'zsh', 'fish'),
+                help='print the completion script for SHELL '
+                     '(bash, zsh or fish)')
+        if self.allow_output:
+            parser.add_argument(
+                '--output', dest=_OUTPUT_DEST, metavar='FORMAT',
+                choices=('ndjson', 'csv', 'table'),
+                help='format of the records (ndjson, csv or table, '
+                     'default: {})'.format(self.output_format))
         parser.set_defaults(func=self.run)
         return parser
 
-    def add_command(self, *commands: 'Command') -> 'Command':
+    def add_command(self,
+                    *commands: 'Union[Command, str]',
+                    name: 'Optional[str]' = None,
+                    short_description: 'Optional[str]' = None,
+                    long_description: 'Optional[str]' = None) -> 'Command':
         """Add sub command to this command.
 
         Add one or more commands to this command.
         The added commands are callable as its sub command.
 
+        A command can be given as an import string like
+        "package.module:command" with its name and descriptions. The module
+        is imported only when the command is dispatched or its parser is
+        built (e.g. the full help is rendered).
+
         Args:
-            commands: An instance of sub commands
+            commands: An instance of sub commands or an import string
+            name (:obj: str, optional): Name of the command given as
+                an import string.
+            short_description (:obj: str, optional): Short description of
+                the command given as an import string.
+            long_description (:obj: str, optional): Description of
+                the command given as an import string.
         """
         for command in commands:
-            assert isinstance(command, Command), \
-                "Given command is not an instance of `uroboros.Command` or" \
-                "an instance of its subclass."
-            assert getattr(command, "name", None) is not None, \
-                "{} does not have `name` attribute.".format(
-                    command.__class__.__name__)
-            command_id = id(command)
-            if command_id in self._parent_ids or \
-                    command_id in self._sub_command_ids:
-                raise errors.CommandDuplicateError(command, self)
-            command.register_parent(self._parent_ids)
-            command.increment_nest(self._layer)
+            if isinstance(command, str):
+                assert len(commands) == 1, \
+                    "Only one import string can be added at once."
+                assert name is not None, \
+                    "`name` is required to add '{}'.".format(command)
+                command = LazyCommand(
+                    command, name, short_description, long_description)
+            self._attach(command)
             self.sub_commands.append(command)
+            self._sub_command_ids.add(id(command))
+            self._sub_commands_by_name[command.name] = command
+        self._sub_command_prefixes = None
+        return self
+
+    def _attach(self, command: 'Command'):
+        assert isinstance(command, Command), \
+            "Given command is not an instance of `uroboros.Command` or" \
+            "an instance of its subclass."
+        assert getattr(command, "name", None) is not None, \
+            "{} does not have `name` attribute.".format(
+                command.__class__.__name__)
+        command_id = id(command)
+        if command_id in self._sub_command_ids or \
+                command_id in self._registered_parent_ids or \
+                command is self:
+            raise errors.CommandDuplicateError(command, self)
+        # Only a command having sub commands can be a parent of this command
+        if command.sub_commands and self._has_ancestor(command_id):
+            raise errors.CommandDuplicateError(command, self)
+        # The depth and the parents of the sub tree of the command are
+        # derived from this link, so that they need not be rewritten.
+        # Cached depths become stale only if a command having sub commands
+        # or a parent is moved.
+        if command.sub_commands or command._parent is not None:
+            Command._tree_version += 1
+        command._parent = self
+        if importtime.recorder is not None:
+            importtime.recorder.add_command(command)
+
+    def _load(self) -> 'Command':
+        """Return the command which this command stands for.
+
+        Returns:
+            Command: This command itself
+        """
         return self
 
+    def _load_sub_command(self, command: 'Command') -> 'Command':
+        """Load the given sub command and replace it in `sub_commands`."""
+        loaded = command._load()
+        if loaded is command:
+            return command
+        self._attach(loaded)
+        loaded._import_path = command._import_path
+        self.sub_commands[self.sub_commands.index(command)] = loaded
+        self._sub_command_ids.discard(id(command))
+        self._sub_command_ids.add(id(loaded))
+        self._sub_commands_by_name[loaded.name] = loaded
+        return loaded
+
+    def _position(self) -> 'Tuple[int, Command]':
+        """Return the depth of nesting and the root command.
+
+        They are cached until the structure of the tree is changed.
+        """
+        version = Command._tree_version
+        # Follow the parents up to the one whose position is cached
+        chain = []
+        cmd = self
+        while cmd is not None and cmd._cached_position[0] != version:
+            chain.append(cmd)
+            cmd = cmd._parent
+        if cmd is None:
+            root = chain[-1]
+            layer = root._root_layer - 1
+        else:
+            _, layer, root = cmd._cached_position
+        for cmd in reversed(chain):
+            layer += 1
+            cmd._cached_position = (version, layer, root)
+        return self._cached_position[1:]
+
+    @property
+    def _layer(self) -> int:
+        """Depth of nesting"""
+        return self._position()[0]
+
     @property
-    def _sub_command_ids(self) -> 'Set[int]':
-        return {id(cmd) for cmd in self.sub_commands}
+    def _command_key(self) -> str:
+        """Name of the attribute holding this command in parsed args"""
+        return utils.get_args_command_name(self._layer)
+
+    def _iter_ancestors(self) -> 'Iterator[Command]':
+        """Yield this command and its parents up to the root."""
+        cmd = self
+        while cmd is not None:
+            yield cmd
+            cmd = cmd._parent
+
+    def _has_ancestor(self, command_id: int) -> bool:
+        for cmd in self._iter_ancestors():
+            if id(cmd) == command_id or \
+                    command_id in cmd._registered_parent_ids:
+                return True
+        return False
+
+    @property
+    def _parent_ids(self) -> 'Set[int]':
+        """Ids of this command and its parents"""
+        ids = set()
+        for cmd in self._iter_ancestors():
+            ids.add(id(cmd))
+            ids |= cmd._registered_parent_ids
+        return ids
 
     def register_parent(self, parent_ids: 'Set[int]'):
         """Register parent command
 
         This function is used internaly.
         Register all parent command ids to check that the command has
-        already been registered.
+        already been registered. `add_command` does not need this since
+        the parents are followed from the command itself.
 
         Args:
             parent_ids (Set[int]): Set of parent command instance ids
         """
-        self._parent_ids |= parent_ids
-        for cmd in self.sub_commands:
-            cmd.register_parent(self._parent_ids)
+        stack = [(self, parent_ids)]
+        while stack:
+            cmd, ids = stack.pop()
+            cmd._registered_parent_ids |= ids
+            ids = cmd._parent_ids
+            stack.extend((sub_cmd, ids) for sub_cmd in cmd.sub_commands)
 
     def increment_nest(self, parent_layer_count: int):
         """Increment the depth of this command and its children.
 
         This function is used internaly.
-        Increment the nest of this command and its children recursively.
+        Set the depth of this command as the root of its sub tree.
+        `add_command` does not need this since the depth is counted from
+        the parents of the command.
 
         Args:
             parent_layer_count (int): Number of nest of parent command.
         """
-        self._layer = parent_layer_count + 1
-        # Propagate the increment to sub commands
-        for cmd in self.sub_commands:
-            cmd.increment_nest(self._layer)
+        stack = [(self, parent_layer_count + 1)]
+        while stack:
+            cmd, layer = stack.pop()
+            if cmd._parent is None:
+                cmd._root_layer = layer
+                Command._tree_version += 1
+            stack.extend((sub_cmd, layer + 1) for sub_cmd in cmd.sub_commands)
 
     def get_sub_commands(self, args: 'argparse.Namespace') -> 'List[Command]':
         """Get the list of `Command` specified by CLI except myself.
@@ -230,11 +1198,12 @@ class Command(metaclass=abc.ABCMeta):
         commands = []
         # Do not include myself
         layer = self._layer + 1
-        while hasattr(args, utils.get_args_command_name(layer)):
-            cmd = getattr(args, utils.get_args_command_name(layer))
+        while True:
+            cmd = getattr(args, utils.get_args_command_name(layer), None)
+            if cmd is None:
+                return commands
             commands.append(cmd)
             layer += 1
-        return commands
 
     def get_all_sub_commands(self) -> 'Dict[Command, CommandDict]':
         """Get all child commands of this command including itself.
@@ -259,20 +1228,58 @@ class Command(metaclass=abc.ABCMeta):
         Returns:
            Dict[Command, CommandDict]: All child commands of this command.
         """
-        commands_dict = {}
-        for sub_cmd in self.sub_commands:
-            commands_dict.update(sub_cmd.get_all_sub_commands())
-        return {
-            self: commands_dict,
-        }
+        commands_dict = {}  # type: CommandDict
+        stack = [(self, commands_dict)]
+        while stack:
+            cmd, cmd_dict = stack.pop()
+            sub_dict = cmd_dict[cmd] = {}
+            stack.extend((sub_cmd, sub_dict) for sub_cmd in cmd.sub_commands)
+        return commands_dict
 
     def get_options(self) -> 'List[Option]':
         """Get all uroboros.`Option instance of this `Command.
 
+        An option given as a class is instantiated once per tree.
+
         Returns:
             List[Option]: List of uroboros.Option instance
         """
-        return [opt() if type(opt) == type else opt for opt in self.options]
+        registry = self._position()[1]._option_registry
+        options = []
+        for opt in self.options:
+            if isinstance(opt, type):
+                # Share an instance among the commands in this tree
+                instance = registry.get(opt)
+                if instance is None:
+                    instance = registry[opt] = opt()
+                opt = instance
+            options.append(opt)
+        return options
+
+    def _add_option_actions(self, parser: 'argparse.ArgumentParser'):
+        """Add the arguments of the options as `parents` of argparse does.
+
+        The actions of a list of options which is added again in this tree
+        are merged once, and added to each parser in bulk.
+        """
+        options = self.get_options()
+        if len(options) == 0:
+            return
+        registry = self._position()[1]._option_actions
+        key = tuple(options)
+        actions = registry.get(key)
+        if actions is None:
+            if key not in registry:
+                # Merging costs more unless the options are shared
+                registry[key] = None
+                for opt in options:
+                    _add_parent(parser, opt.get_parser())
+                return
+            merged = argparse.ArgumentParser(add_help=False)
+            for opt in options:
+                _add_parent(merged, opt.get_parser())
+            actions = registry[key] = _ParentActions(merged)
+        actions.add_to(parser)
 
     def print_help(self):
         """Helper method for print the help message of this command.
@@ -285,32 +1292,88 @@ class Command(metaclass=abc.ABCMeta):
             This function can be called after initialization.
         """
         self._check_initialized()
+        # Sub commands may have been skipped by lazy initialization
+        if not getattr(self._parser, 'complete', False):
+            self._initialize_sub_parsers(self._parser)
         return self._parser.print_help()
 
     def _pre_hook(self,
                   args: 'argparse.Namespace',
-                  sub_commands: 'List[Command]') -> 'argparse.Namespace':
-        return utils.call_one_by_one(
-            [self] + sub_commands,
-            "_hook",
-            args,
-            hook_name="before_validate"
-        )
+                  sub_commands: 'List[Command]',
+                  instrument: 'Optional[Instrument]' = None
+                  ) -> 'argparse.Namespace':
+        return self._run_hooks(
+            args, [self] + sub_commands, 'before_validate', instrument)
 
-    def _hook(self,
-              args: 'argparse.Namespace',
-              hook_name: str) -> 'argparse.Namespace':
-        for opt in self.get_options():
-            assert hasattr(opt, hook_name), \
-                "{} does not have '{}' method".format(
-                    opt.__class__.__name__, hook_name)
-            args = getattr(opt, hook_name)(args)
-        assert hasattr(self, hook_name), \
-            "{} does not have '{}' method".format(
-                self.__class__.__name__, hook_name)
-        args = getattr(self, hook_name)(args)
+    def _run_hooks(self,
+                   args: 'argparse.Namespace',
+                   commands: 'List[Command]',
+                   hook_name: str,
+                   instrument: 'Optional[Instrument]' = None
+                   ) -> 'argparse.Namespace':
+        chain = self._hook_chain(commands)[hook_name]
+        if instrument is None:
+            for hook in chain:
+                args = hook(args)
+            return args
+        for hook in chain:
+            with instrumentation.time_hook(
+                    instrument, hook_name, _hook_owner(hook)):
+                args = hook(args)
+        return args
+
+    async def _run_hooks_async(self,
+                               args: 'argparse.Namespace',
+                               commands: 'List[Command]',
+                               hook_name: str,
+                               instrument: 'Optional[Instrument]' = None
+                               ) -> 'argparse.Namespace':
+        for hook in self._hook_chain(commands)[hook_name]:
+            with instrumentation.time_hook(
+                    instrument, hook_name, _hook_owner(hook)):
+                args = await utils.maybe_await(hook(args))
         return args
 
+    def _hook_chain(self, commands: 'List[Command]') -> 'HookChain':
+        """Return the hooks of the commands from the root in order of calls.
+
+        The chain is compiled once for each path, so that executing a path
+        repeatedly (e.g. in batch or server mode) only calls the hooks.
+        """
+        key = tuple(commands)
+        chain = self._hook_chains.get(key)
+        if chain is None:
+            chain = {name: [hook for cmd in commands
+                            for hook in cmd._get_hooks(name)]
+                     for name in _HOOK_NAMES}
+            self._hook_chains[key] = chain
+        return chain
+
+    def _get_hooks(self, hook_name: str) -> 'List[Hook]':
+        if self._hooks is None:
+            self._hooks = self._compile_hooks()
+        return self._hooks[hook_name]
+
+    def _compile_hooks(self) -> 'HookChain':
+        """Bind the hooks of the options and this command in order of calls.
+
+        Hooks which are not overridden do nothing, so that they are dropped.
+        Validators of options are listed separately unless `validate` of
+        this command is overridden.
+        """
+        from uroboros.option import Option
+        options = self.get_options()
+        hooks = {}
+        for name in _HOOK_NAMES:
+            own_hook = _overridden_hook(self, Command, name)
+            if name == 'validate' and own_hook is not None:
+                hooks[name] = [own_hook]
+                continue
+            chain = [_overridden_hook(opt, Option, name) for opt in options]
+            chain.append(own_hook)
+            hooks[name] = [hook for hook in chain if hook is not None]
+        return hooks
+
     def before_validate(self,
                         unsafe_args: 'argparse.Namespace'
                         ) -> 'argparse.Namespace':
@@ -331,10 +1394,99 @@ class Command(metaclass=abc.ABCMeta):
 
     def _validate_all(self,
                       args: 'argparse.Namespace',
-                      sub_commands: 'List[Command]') -> 'List[Exception]':
+                      sub_commands: 'List[Command]',
+                      instrument: 'Optional[Instrument]' = None
+                      ) -> 'List[Exception]':
+        commands = [self] + sub_commands
+        if self.concurrent_validation:
+            # Validators overlap, so that only the phase is timed
+            return self._validate_concurrently(args, commands)
         exceptions = []
-        for cmd in [self] + sub_commands:
-            exceptions.extend(cmd.validate(args))
+        for validator in self._hook_chain(commands)['validate']:
+            with instrumentation.time_hook(
+                    instrument, 'validate', _hook_owner(validator)):
+                exceptions.extend(validator(args))
+            if len(exceptions) > 0 and self.validation_fail_fast:
+                break
+        return exceptions
+
+    def _validate_concurrently(self,
+                               args: 'argparse.Namespace',
+                               commands: 'List[Command]'
+                               ) -> 'List[Exception]':
+        """Run validators in threads.
+
+        The exceptions are ordered as the validators regardless of the order
+        of completion. In fail-fast mode, validators which have not started
+        yet are cancelled and the running ones are left behind.
+        """
+        from concurrent import futures
+        validators = self._hook_chain(commands)['validate']
+        executor = futures.ThreadPoolExecutor(
+            max_workers=self.validation_workers or len(validators) or 1)
+        try:
+            fs = [executor.submit(validator, args)
+                  for validator in validators]
+            if self.validation_fail_fast:
+                for future in futures.as_completed(fs):
+                    if future.exception() is not None or future.result():
+                        break
+                for future in fs:
+                    future.cancel()
+            else:
+                futures.wait(fs)
+            exceptions = []
+            for future in fs:
+                if future.done() and not future.cancelled():
+                    exceptions.extend(future.result())
+            return exceptions
+        finally:
+            executor.shutdown(wait=not self.validation_fail_fast)
+
+    async def _validate_all_async(self,
+                                  args: 'argparse.Namespace',
+                                  commands: 'List[Command]',
+                                  instrument: 'Optional[Instrument]' = None
+                                  ) -> 'List[Exception]':
+        """Await validators.
+
+        In concurrent mode, coroutine validators are run concurrently on
+        the event loop and the others are run in the default executor.
+        """
+        import asyncio
+        exceptions = []
+        validators = self._hook_chain(commands)['validate']
+        if not self.concurrent_validation:
+            for validator in validators:
+                with instrumentation.time_hook(
+                        instrument, 'validate', _hook_owner(validator)):
+                    exceptions.extend(
+                        await utils.maybe_await(validator(args)))
+                if len(exceptions) > 0 and self.validation_fail_fast:
+                    break
+            return exceptions
+        loop = asyncio.get_event_loop()
+        fs = []
+        for validator in validators:
+            if utils.is_coroutine_function(validator):
+                fs.append(asyncio.ensure_future(validator(args)))
+            else:
+                fs.append(loop.run_in_executor(None, validator, args))
+        if self.validation_fail_fast:
+            pending = set(fs)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(f.exception() is not None or f.result()
+                       for f in done):
+                    break
+            for future in pending:
+                future.cancel()
+        else:
+            await asyncio.wait(fs)
+        for future in fs:
+            if future.done() and not future.cancelled():
+                exceptions.extend(future.result())
         return exceptions
 
     def validate(self, args: 'argparse.Namespace') -> 'List[Exception]':
@@ -347,20 +1499,17 @@ class Command(metaclass=abc.ABCMeta):
             List[Exception]: The list of exceptions
         """
         exceptions = []
-        for opt in self.options:
+        for opt in self.get_options():
             exceptions.extend(opt.validate(args))
         return exceptions
 
     def _pre_hook_validated(self,
                             args: 'argparse.Namespace',
-                            sub_commands: 'List[Command]'
+                            sub_commands: 'List[Command]',
+                            instrument: 'Optional[Instrument]' = None
                             ) -> 'argparse.Namespace':
-        return utils.call_one_by_one(
-            [self] + sub_commands,
-            "_hook",
-            args,
-            hook_name='after_validate'
-        )
+        return self._run_hooks(
+            args, [self] + sub_commands, 'after_validate', instrument)
 
     def after_validate(self,
                        safe_args: 'argparse.Namespace'
@@ -389,3 +1538,138 @@ class Command(metaclass=abc.ABCMeta):
         """
         if self._parser is None:
             raise errors.CommandNotRegisteredError(self.name)
+
+
+def _find_executor_option(args: 'argparse.Namespace') -> 'Optional[str]':
+    """Return the option of the root command changing the way to execute
+    (e.g. `--batch`) given in `args`, or None if nothing is given."""
+    batch_file = getattr(args, _BATCH_DEST, None)
+    if batch_file is not None:
+        if batch_file is not sys.stdin:
+            # Opened by argparse
+            batch_file.close()
+        return '--batch'
+    if getattr(args, _XARGS_DEST, None) is not None:
+        return '--xargs'
+    if getattr(args, _COMPLETION_DEST, None) is not None:
+        return '--completion'
+    return None
+
+
+def _broken_pipe_status() -> 'ExitStatus':
+    # Same as the process killed by SIGPIPE, e.g. by `| head`
+    return ExitStatus.FATAL_SIGNAL_13
+
+
+def _add_parent(parser: 'argparse.ArgumentParser',
+                parent: 'argparse.ArgumentParser'):
+    """Add the actions and defaults of `parent` as `parents` argument"""
+    parser._add_container_actions(parent)
+    parser._defaults.update(parent._defaults)
+
+
+class _ParentActions(object):
+    """Actions of a parent parser to add to many parsers.
+
+    `parents` of argparse registers the actions one by one, checking the
+    conflicts of each of them for each parser. They have been checked in
+    the parent, so that they are added in bulk unless they conflict with
+    the actions of the parser.
+    """
+
+    __slots__ = ('parser', 'option_strings', 'mergeable')
+
+    def __init__(self, parser: 'argparse.ArgumentParser'):
+        self.parser = parser
+        self.option_strings = parser._option_string_actions.keys()
+        # Other groups are merged by argparse
+        self.mergeable = len(parser._action_groups) == 2 and \
+            len(parser._mutually_exclusive_groups) == 0
+
+    def add_to(self, parser: 'argparse.ArgumentParser'):
+        parent = self.parser
+        if not self.mergeable or parser.conflict_handler != 'error' or \
+                not self.option_strings.isdisjoint(
+                    parser._option_string_actions):
+            # argparse resolves or reports the conflicts
+            _add_parent(parser, parent)
+            return
+        # `container` of the actions is left to the first parser. It is
+        # referred only to resolve conflicts.
+        parser._actions.extend(parent._actions)
+        parser._positionals._group_actions.extend(
+            parent._positionals._group_actions)
+        parser._optionals._group_actions.extend(
+            parent._optionals._group_actions)
+        parser._option_string_actions.update(parent._option_string_actions)
+        if parent._has_negative_number_optionals and \
+                not parser._has_negative_number_optionals:
+            parser._has_negative_number_optionals.append(True)
+        parser._defaults.update(parent._defaults)
+
+
+def _overridden_hook(obj: 'Any', base: type, name: str) -> 'Optional[Hook]':
+    """Return the bound hook unless it is the one of the base class"""
+    hook = getattr(obj, name)
+    if getattr(hook, '__func__', None) is getattr(base, name):
+        return None
+    return hook
+
+
+def _hook_owner(hook: 'Hook') -> 'Any':
+    return getattr(hook, '__self__', hook)
+
+
+class LazyCommand(Command):
+    """Command which is imported when it is used.
+
+    This holds the name and descriptions of the actual command instead of
+    importing it. The actual command is loaded from the import string like
+    "package.module:command". If the attribute is a subclass of `Command`,
+    it is instantiated.
+    """
+
+    def __init__(self,
+                 import_path: str,
+                 name: str,
+                 short_description: 'Optional[str]' = None,
+                 long_description: 'Optional[str]' = None):
+        super().__init__()
+        assert ':' in import_path, \
+            "'{}' is not a form of 'package.module:command'.".format(
+                import_path)
+        self._import_path = import_path
+        self.name = name
+        self.short_description = short_description
+        self.long_description = long_description \
+            if long_description is not None else short_description
+        self._command = None  # type: Optional[Command]
+
+    def _load(self) -> 'Command':
+        """Import the actual command.
+
+        Returns:
+            Command: The actual command
+        """
+        if self._command is not None:
+            return self._command
+        module_name, attr = self._import_path.split(':', 1)
+        if importtime.recorder is None:
+            module = importlib.import_module(module_name)
+        else:
+            with importtime.recorder.measure_load():
+                module = importlib.import_module(module_name)
+        command = getattr(module, attr)
+        if isinstance(command, type):
+            command = command()
+        assert isinstance(command, Command), \
+            "'{}' is not an instance of `uroboros.Command`.".format(
+                self._import_path)
+        assert command.name == self.name, \
+            "'{}' is registered as '{}' but its name is '{}'.".format(
+                self._import_path, self.name, command.name)
+        self._command = command
+        return command
+
+    def run(self, args: 'argparse.Namespace') -> 'Union[ExitStatus, int]':
+        return self._load().run(args)
@@ -0,0 +1,243 @@
+"""Shell completion scripts generated from the command tree.
+
+The names of sub commands and the option strings of each command are
+embedded in the script as its index, so that completing a word runs only
+the shell. Neither python nor the modules of the commands are loaded on
+each key stroke. Generate the script again when the tree is changed.
+
+    $ python sample.py --completion bash > ~/.local/share/bash-completion/completions/sample
+"""  # NOQA
+import argparse
+import re
+import shlex
+
+from uroboros import manifest
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple
+    from uroboros.command import Command
+    # Key of the path, candidates with descriptions and choices of the
+    # options taking a value
+    Entry = Tuple[str, List[Tuple[str, str]], Dict[str, Optional[List[str]]]]
+
+SHELLS = ('bash', 'zsh', 'fish')
+
+
+def generate(command: 'Command',
+             shell: str,
+             prog: 'Optional[str]' = None) -> str:
+    """Generate the completion script of the command tree.
+
+    All commands in the tree are loaded and initialized.
+
+    Args:
+        command (Command): The root command
+        shell (str): 'bash', 'zsh' or 'fish'
+        prog (:obj: str, optional): Name of the executable to complete.
+            If None is given, the name of the root command is used.
+
+    Returns:
+        str: The completion script
+    """
+    assert shell in SHELLS, "Unknown shell '{}'.".format(shell)
+    prog = prog or command.name
+    entries = _index(manifest.build(command))
+    func = '_uroboros_complete_' + re.sub(r'\W', '_', prog)
+    if shell == 'fish':
+        return _generate_fish(entries, prog, func)
+    script = _generate_bash(entries, prog, func)
+    if shell == 'zsh':
+        return '# zsh completion for {} generated by uroboros\n' \
+               'autoload -U +X bashcompinit && bashcompinit\n{}' \
+               .format(prog, script)
+    return '# bash completion for {} generated by uroboros\n{}' \
+        .format(prog, script)
+
+
+def _index(cache: 'manifest.Manifest') -> 'List[Entry]':
+    entries = []  # type: List[Entry]
+    for node in cache.commands:
+        parent = node['parent']
+        key = '' if parent is None \
+            else '{} {}'.format(entries[parent][0], node['name'])
+        words = []
+        values = {}
+        for action in node['actions']:
+            if action['action'] == 'parsers':
+                words.extend((name, help_ or '')
+                             for name, help_ in action['choices'])
+                continue
+            if action['help'] == argparse.SUPPRESS:
+                continue
+            for option in action['option_strings']:
+                words.append((option, action['help'] or ''))
+                if action['nargs'] != 0:
+                    values[option] = _choices(action['choices'])
+        entries.append((key, words, values))
+    return entries
+
+
+def _choices(choices: 'Any') -> 'Optional[List[str]]':
+    # Choices other than a list are dumped as a string in the manifest
+    if not isinstance(choices, list):
+        return None
+    return [str(choice) for choice in choices]
+
+
+def _sub_command_keys(entries: 'List[Entry]') -> 'List[str]':
+    return [key for key, _, _ in entries[1:]]
+
+
+def _sh_patterns(words: 'List[str]') -> str:
+    return '|'.join(shlex.quote(word) for word in words)
+
+
+def _generate_bash(entries: 'List[Entry]', prog: str, func: str) -> str:
+    lines = [
+        '{}() {{'.format(func),
+        '    local cur="${COMP_WORDS[COMP_CWORD]}" path="" prev="" word i',
+        '    local skip=0',
+        '    COMPREPLY=()',
+        '    for ((i = 1; i < COMP_CWORD; i++)); do',
+        '        word="${COMP_WORDS[i]}"',
+        '        if ((skip)); then',
+        '            skip=0',
+        '            continue',
+        '        fi',
+        '        prev="$word"',
+    ]
+    keys = _sub_command_keys(entries)
+    if keys:
+        lines += [
+            '        case "$path $word" in',
+            '            {})'.format(_sh_patterns(keys)),
+            '                path="$path $word"',
+            '                continue',
+            '                ;;',
+            '        esac',
+        ]
+    takes_value = [(key, values) for key, _, values in entries if values]
+    if takes_value:
+        lines.append('        case "$path" in')
+        for key, values in takes_value:
+            lines.append('            {}) case "$word" in {}) skip=1 ;; '
+                         'esac ;;'.format(shlex.quote(key),
+                                          _sh_patterns(sorted(values))))
+        lines.append('        esac')
+    lines += [
+        '    done',
+        '    if ((skip)); then',
+    ]
+    choices = [('{} {}'.format(key, option), values[option])
+               for key, _, values in entries
+               for option in sorted(values) if values[option]]
+    if choices:
+        lines.append('        case "$path $prev" in')
+        for key, words in choices:
+            lines.append(
+                '            {}) COMPREPLY=($(compgen -W {} -- "$cur")) ;;'
+                .format(shlex.quote(key), shlex.quote(' '.join(words))))
+        lines.append('        esac')
+    lines += [
+        '        return 0',
+        '    fi',
+        '    case "$path" in',
+    ]
+    for key, words, _ in entries:
+        lines.append(
+            '        {}) COMPREPLY=($(compgen -W {} -- "$cur")) ;;'
+            .format(shlex.quote(key),
+                    shlex.quote(' '.join(word for word, _ in words))))
+    lines += [
+        '    esac',
+        '}',
+        'complete -o default -F {} {}'.format(func, shlex.quote(prog)),
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def _fish_quote(value: str) -> str:
+    return "'{}'".format(value.replace('\\', '\\\\').replace("'", "\\'"))
+
+
+def _fish_patterns(words: 'List[str]') -> str:
+    return ' '.join(_fish_quote(word) for word in words)
+
+
+def _generate_fish(entries: 'List[Entry]', prog: str, func: str) -> str:
+    lines = [
+        '# fish completion for {} generated by uroboros'.format(prog),
+        'function {}'.format(func),
+        '    set -l tokens (commandline -opc)',
+        "    set -l path ''",
+        "    set -l prev ''",
+        '    set -l skip 0',
+        '    set -e tokens[1]',
+        '    for word in $tokens',
+        '        if test $skip -eq 1',
+        '            set skip 0',
+        '            continue',
+        '        end',
+        '        set prev $word',
+    ]
+    keys = _sub_command_keys(entries)
+    if keys:
+        lines += [
+            '        switch "$path $word"',
+            '            case {}'.format(_fish_patterns(keys)),
+            '                set path "$path $word"',
+            '                continue',
+            '        end',
+        ]
+    takes_value = [(key, values) for key, _, values in entries if values]
+    if takes_value:
+        lines.append('        switch "$path"')
+        for key, values in takes_value:
+            lines += [
+                '            case {}'.format(_fish_quote(key)),
+                '                contains -- $word {}; and set skip 1'
+                .format(_fish_patterns(sorted(values))),
+            ]
+        lines.append('        end')
+    lines += [
+        '    end',
+        '    if test $skip -eq 1',
+    ]
+    choices = [('{} {}'.format(key, option), values[option])
+               for key, _, values in entries
+               for option in sorted(values) if values[option]]
+    if choices:
+        lines.append('        switch "$path $prev"')
+        for key, words in choices:
+            lines += [
+                '            case {}'.format(_fish_quote(key)),
+                "                printf '%s\\n' {}".format(
+                    _fish_patterns(words)),
+                '                return',
+            ]
+        lines.append('        end')
+    lines += [
+        '        __fish_complete_path (commandline -ct)',
+        '        return',
+        '    end',
+        '    switch "$path"',
+    ]
+    parent_keys = {key.rsplit(' ', 1)[0] for key in keys}
+    for key, words, _ in entries:
+        lines.append('        case {}'.format(_fish_quote(key)))
+        if words:
+            lines.append("            printf '%s\\t%s\\n' {}".format(
+                ' '.join('{} {}'.format(_fish_quote(word), _fish_quote(desc))
+                         for word, desc in words)))
+        if key not in parent_keys:
+            # Leaf commands may take paths
+            lines.append('            __fish_complete_path '
+                         '(commandline -ct)')
+    lines += [
+        '    end',
+        'end',
+        'complete -c {} -f -a {}'.format(
+            _fish_quote(prog), _fish_quote('({})'.format(func))),
+    ]
+    return '\n'.join(lines) + '\n'
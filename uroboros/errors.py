@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from uroboros.constants import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from uroboros import Command
@@ -38,3 +38,21 @@ class CommandDuplicateError(Exception):
             " in '{parent}' or its parents.".format(
                 name=self.command.__class__.__name__,
                 parent=self.parent.__class__.__name__)
+
+
+class PartialParserError(Exception):
+    """The parser has been built only for a part of the command tree"""
+
+    def __init__(self, prog: str):
+        self.prog = prog
+
+    def __str__(self):
+        return "The parser of '{prog}' has not been built completely." \
+            .format(prog=self.prog)
+
+
+class OutputClosedError(BrokenPipeError):
+    """The reader of the output has gone (e.g. `| head`)"""
+
+    def __str__(self):
+        return "The reader of the output has been closed."
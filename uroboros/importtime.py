@@ -0,0 +1,190 @@
+"""Import time and memory of the modules of each command.
+
+Set `UROBOROS_IMPORT_PROFILE` environment variable to record the imports
+after `uroboros` is imported, and print the commands whose modules took the
+longest time to import to stderr when the process exits. Give a path
+instead of `1` to append the report to the file.
+
+    $ UROBOROS_IMPORT_PROFILE=1 python main.py version
+    uroboros import time by command (10 worst)
+       time (ms)   rss (KiB)  modules  command
+          52.107       10240       35  main env get (commands.envs.get)
+    ...
+
+Each command is attributed the time to import the module defining its
+class, including the modules which were imported for the first time by it.
+Commands added by import strings are measured when they are loaded.
+The commands which are never loaded are not listed, since they do not slow
+down the startup. `-X importtime` of python shows the details of each
+module.
+"""
+import atexit
+import builtins
+import os
+import sys
+import time
+
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple
+    from uroboros.command import Command
+    # Seconds, bytes of resident memory and number of the imported modules
+    Record = Tuple[float, int, int]
+    Commands = List[Command]
+
+ENV_NAME = 'UROBOROS_IMPORT_PROFILE'
+
+# Number of the commands in the report
+REPORT_SIZE = 10
+
+# The recorder enabled by `enable`
+recorder = None  # type: Optional[ImportRecorder]
+
+
+def _rss() -> int:
+    """Return the bytes of resident memory of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Peak instead of current on platforms without procfs
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class ImportRecorder(object):
+    """Record the imports through `builtins.__import__`"""
+
+    def __init__(self):
+        # Records of the modules by the innermost import creating them
+        self.modules = {}  # type: Dict[str, Record]
+        # Records of the modules of commands loaded from import strings
+        self.loads = {}  # type: Dict[str, Record]
+        self.commands = []  # type: Commands
+        self._known = set(sys.modules)
+        self._original_import = None  # type: Any
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, *args, **kwargs) -> 'Any':
+        count = len(sys.modules)
+        rss = _rss()
+        started = time.perf_counter()
+        try:
+            return self._original_import(*args, **kwargs)
+        finally:
+            if len(sys.modules) != count:
+                self._record(self.modules, (time.perf_counter() - started,
+                                            _rss() - rss,
+                                            len(sys.modules) - count))
+
+    def _record(self, records: 'Dict[str, Record]', record: 'Record'):
+        # Modules created by inner imports are already known
+        new = sys.modules.keys() - self._known
+        self._known |= new
+        for name in new:
+            records[name] = record
+
+    def measure_load(self) -> 'Any':
+        """Context manager to record the import of a lazy command"""
+        return _LoadTimer(self)
+
+    def add_command(self, command: 'Command'):
+        self.commands.append(command)
+
+    def report(self, size: int = REPORT_SIZE) -> str:
+        """Return the report of the commands which took the longest"""
+        from uroboros.command import LazyCommand
+        by_module = {}  # type: Dict[str, Commands]
+        for command in self.commands:
+            if isinstance(command, LazyCommand):
+                # The loaded command is added when it is loaded
+                continue
+            module = type(command).__module__
+            by_module.setdefault(module, [])
+            if command not in by_module[module]:
+                by_module[module].append(command)
+        rows = []
+        for module, commands in by_module.items():
+            record = self.loads.get(module) or self.modules.get(module)
+            if record is None:
+                # Imported before the recorder was enabled
+                continue
+            labels = ', '.join(_path(command) for command in commands)
+            rows.append((record, '{} ({})'.format(labels, module)))
+        rows.sort(key=lambda row: row[0][0], reverse=True)
+        lines = [
+            'uroboros import time by command ({} worst)'.format(size),
+            '{:>12} {:>11} {:>8}  {}'.format(
+                'time (ms)', 'rss (KiB)', 'modules', 'command'),
+        ]
+        for (elapsed, rss, count), label in rows[:size]:
+            lines.append('{:>12.3f} {:>11} {:>8}  {}'.format(
+                elapsed * 1000, rss // 1024, count, label))
+        return '\n'.join(lines) + '\n'
+
+
+class _LoadTimer(object):
+
+    def __init__(self, recorder: ImportRecorder):
+        self.recorder = recorder
+
+    def __enter__(self):
+        self.count = len(sys.modules)
+        self.rss = _rss()
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.recorder._record(self.recorder.loads, (
+            time.perf_counter() - self.started,
+            _rss() - self.rss,
+            len(sys.modules) - self.count))
+        return False
+
+
+def _path(command: 'Command') -> str:
+    return ' '.join(reversed([cmd.name for cmd in command._iter_ancestors()]))
+
+
+def enable(path: 'Optional[str]' = None) -> ImportRecorder:
+    """Start recording and report at exit.
+
+    Args:
+        path (:obj: str, optional): Path of the file to append the report
+            to. stderr is used by default.
+    """
+    global recorder
+    if recorder is not None:
+        return recorder
+    recorder = ImportRecorder()
+    recorder.install()
+
+    def write_report():
+        recorder.uninstall()
+        report = recorder.report()
+        if path is None:
+            sys.stderr.write(report)
+            return
+        with open(path, 'a') as f:
+            f.write(report)
+    atexit.register(write_report)
+    return recorder
+
+
+def enable_from_env():
+    value = os.environ.get(ENV_NAME)
+    if value:
+        enable(None if value in ('1', 'stderr') else value)
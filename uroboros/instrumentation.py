@@ -0,0 +1,274 @@
+"""Timings of the phases of `Command.execute`.
+
+Set an `Instrument` to `instrument` of the root command to receive the
+elapsed time of each phase of the execution and of each hook of the
+commands and options.
+
+    class SlowHooks(Instrument):
+        def hook(self, name, owner, elapsed):
+            if elapsed > 0.1:
+                print('{} of {} is slow'.format(name, owner))
+
+    RootCommand.instrument = SlowHooks()
+
+`Reporter` writing a summary of the timings to stderr is added when
+`UROBOROS_TIMING` environment variable is set. Give a path of a file to
+append the summary to the file instead.
+
+    $ UROBOROS_TIMING=1 python sample.py hello
+
+The profiler of `uroboros.profiling` is added when `UROBOROS_PROFILE` is set.
+"""
+import os
+import sys
+import time
+
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple, Union
+    # Names and seconds
+    Timings = List[Tuple[str, float]]
+    HookTimings = Dict[str, Timings]
+    from uroboros.command import Command
+    from uroboros.constants import ExitStatus
+
+ENV_NAME = 'UROBOROS_TIMING'
+# Defined here not to import `uroboros.profiling` unless it is set
+PROFILE_ENV_NAME = 'UROBOROS_PROFILE'
+
+# Phases in order of execution.
+# `parse_args` includes building the parsers on demand in lazy
+# initialization.
+PHASE_INITIALIZE = 'initialize'
+PHASE_PARSE_ARGS = 'parse_args'
+PHASE_BEFORE_VALIDATE = 'before_validate'
+PHASE_VALIDATE = 'validate'
+PHASE_AFTER_VALIDATE = 'after_validate'
+PHASE_RUN = 'run'
+
+clock = time.perf_counter
+
+
+class Instrument(object):
+    """Receiver of the timings. Override methods to use."""
+
+    def start(self, command: 'Command'):
+        """Called when `command` starts execution"""
+
+    def enter_phase(self, name: str, command: 'Command'):
+        """Called when a phase of the execution of `command` starts"""
+
+    def phase(self, name: str, command: 'Command', elapsed: float):
+        """Called when a phase of the execution of `command` finishes.
+
+        Args:
+            name (str): One of `PHASE_*`
+            command (Command): The executed command
+            elapsed (float): Elapsed seconds
+        """
+
+    def hook(self, name: str, owner: 'Any', elapsed: float):
+        """Called when a hook of a command or an option returns.
+
+        Args:
+            name (str): 'before_validate', 'validate' or 'after_validate'
+            owner (Union[Command, Option]): The owner of the hook
+            elapsed (float): Elapsed seconds
+        """
+
+    def finish(self,
+               command: 'Command',
+               status: 'Optional[Union[ExitStatus, int]]'):
+        """Called when the execution of `command` finishes.
+
+        `status` is None if the execution raised an exception (e.g.
+        `SystemExit` on an error of parsing).
+        """
+
+
+class CompositeInstrument(Instrument):
+    """Pass the timings to each of the instruments in order"""
+
+    def __init__(self, instruments: 'List[Instrument]'):
+        self.instruments = instruments
+
+    def start(self, command: 'Command'):
+        for instrument in self.instruments:
+            instrument.start(command)
+
+    def enter_phase(self, name: str, command: 'Command'):
+        for instrument in self.instruments:
+            instrument.enter_phase(name, command)
+
+    def phase(self, name: str, command: 'Command', elapsed: float):
+        for instrument in self.instruments:
+            instrument.phase(name, command, elapsed)
+
+    def hook(self, name: str, owner: 'Any', elapsed: float):
+        for instrument in self.instruments:
+            instrument.hook(name, owner, elapsed)
+
+    def finish(self,
+               command: 'Command',
+               status: 'Optional[Union[ExitStatus, int]]'):
+        for instrument in self.instruments:
+            instrument.finish(command, status)
+
+
+class _PhaseTimer(object):
+    __slots__ = ('instrument', 'name', 'command', 'started')
+
+    def __init__(self, instrument: Instrument, name: str,
+                 command: 'Command'):
+        self.instrument = instrument
+        self.name = name
+        self.command = command
+
+    def __enter__(self):
+        self.instrument.enter_phase(self.name, self.command)
+        self.started = clock()
+
+    def __exit__(self, *exc_info):
+        elapsed = clock() - self.started
+        self.instrument.phase(self.name, self.command, elapsed)
+        return False
+
+
+class _HookTimer(object):
+    __slots__ = ('instrument', 'name', 'owner', 'started')
+
+    def __init__(self, instrument: Instrument, name: str, owner: 'Any'):
+        self.instrument = instrument
+        self.name = name
+        self.owner = owner
+
+    def __enter__(self):
+        self.started = clock()
+
+    def __exit__(self, *exc_info):
+        self.instrument.hook(self.name, self.owner, clock() - self.started)
+        return False
+
+
+class _NullTimer(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def time_phase(instrument: 'Optional[Instrument]',
+               name: str,
+               command: 'Command') -> 'Any':
+    """Context manager to time a phase. It does nothing if `instrument` is
+    None."""
+    if instrument is None:
+        return _NULL_TIMER
+    return _PhaseTimer(instrument, name, command)
+
+
+def time_hook(instrument: 'Optional[Instrument]',
+              name: str,
+              owner: 'Any') -> 'Any':
+    """Context manager to time a hook. It does nothing if `instrument` is
+    None."""
+    if instrument is None:
+        return _NULL_TIMER
+    return _HookTimer(instrument, name, owner)
+
+
+def from_env(instrument: 'Optional[Instrument]' = None
+             ) -> 'Optional[Instrument]':
+    """Add the instruments enabled by the environment variables.
+
+    Args:
+        instrument (:obj: Instrument, optional): The instrument set in the
+            command
+
+    Returns:
+        Optional[Instrument]: The instrument to use, or None if nothing is
+            enabled
+    """
+    instruments = [] if instrument is None else [instrument]
+    value = os.environ.get(ENV_NAME)
+    if value:
+        if value in ('1', 'stderr'):
+            instruments.append(Reporter())
+        else:
+            instruments.append(Reporter(path=value))
+    if os.environ.get(PROFILE_ENV_NAME):
+        from uroboros import profiling
+        profiler = profiling.from_env()
+        if profiler is not None:
+            instruments.append(profiler)
+    if len(instruments) <= 1:
+        return instruments[0] if instruments else None
+    return CompositeInstrument(instruments)
+
+
+def _label(owner: 'Any') -> str:
+    name = getattr(owner, 'name', None)
+    if isinstance(name, str):
+        return name
+    return type(owner).__name__
+
+
+class Reporter(Instrument):
+    """Write the timings of each execution in milliseconds"""
+
+    def __init__(self, stream: 'Any' = None, path: 'Optional[str]' = None):
+        """
+        Args:
+            stream (:obj: TextIO, optional): Stream to write to. stderr
+                is used by default.
+            path (:obj: str, optional): Path of a file to append to instead
+                of the stream
+        """
+        self.stream = stream
+        self.path = path
+        self.started = 0.0
+        self.phases = []  # type: Timings
+        self.hooks = {}  # type: HookTimings
+
+    def start(self, command: 'Command'):
+        self.started = clock()
+        self.phases = []
+        self.hooks = {}
+
+    def phase(self, name: str, command: 'Command', elapsed: float):
+        self.phases.append((name, elapsed))
+
+    def hook(self, name: str, owner: 'Any', elapsed: float):
+        self.hooks.setdefault(name, []).append((_label(owner), elapsed))
+
+    def finish(self,
+               command: 'Command',
+               status: 'Optional[Union[ExitStatus, int]]'):
+        total = clock() - self.started
+        lines = ['uroboros timing: {} (status: {})'.format(
+            command.name, 'error' if status is None else int(status))]
+        for name, elapsed in self.phases:
+            lines.append(self._format(name, elapsed, 2))
+            for label, hook_elapsed in self.hooks.get(name, []):
+                lines.append(self._format(label, hook_elapsed, 4))
+        lines.append(self._format('total', total, 2))
+        report = '\n'.join(lines) + '\n'
+        if self.path is not None:
+            with open(self.path, 'a') as f:
+                f.write(report)
+        else:
+            stream = self.stream or sys.stderr
+            stream.write(report)
+            stream.flush()
+
+    @staticmethod
+    def _format(label: str, elapsed: float, indent: int) -> str:
+        return '{}{:<{}} {:>10.3f} ms'.format(
+            ' ' * indent, label, 30 - indent, elapsed * 1000)
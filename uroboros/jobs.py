@@ -0,0 +1,286 @@
+"""Run a command over a list of inputs in parallel.
+
+`JobsOption` adds `-j/--jobs N` to a command. When N is not 1, the inputs
+given to the work list argument are split, and `run` of the command is
+called for each input in a pool of worker processes (or threads). Each call
+gets a copy of the arguments whose work list holds the single input.
+
+    class CompressCommand(Command):
+        name = 'compress'
+        options = [JobsOption('paths')]
+
+        def build_option(self, parser):
+            parser.add_argument('paths', nargs='*')
+            return parser
+
+        def run(self, args):
+            for path in args.paths:
+                compress(path)
+            return ExitStatus.SUCCESS
+
+    $ sample.py compress -j 4 a.txt b.txt c.txt
+
+Output written to `sys.stdout` by each call is captured and written at
+once, so that outputs of calls are not interleaved. They are written in
+the order of the inputs unless `--unordered` is given. stderr is not
+captured. Records given to `out` of the command are serialized by a sink
+of each job, so the header of CSV or a table is written for each input.
+The exit status is the first one which is not success.
+"""
+import argparse
+import copy
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import traceback
+
+from uroboros import utils
+from uroboros.constants import TYPE_CHECKING, ExitStatus
+from uroboros.option import Option
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterator, List, Optional, Tuple
+    from uroboros.output import Output
+    Job = Tuple[Callable[[argparse.Namespace], Any],
+                argparse.Namespace, str, List[Any]]
+
+# Destination of `run` of the command replaced by the runner of the jobs
+_FUNC_DEST = '__jobs_func'
+
+EXECUTOR_PROCESS = 'process'
+EXECUTOR_THREAD = 'thread'
+
+# The job inherited by forked workers. Only indexes of the inputs are sent
+# to the workers, so that the arguments and the command need not be
+# picklable.
+_job = None  # type: Optional[Job]
+
+# Sinks of the records of the jobs running in each thread
+_local = threading.local()
+
+
+class JobsOption(Option):
+    """Option to run the command for each input in parallel"""
+
+    def __init__(self,
+                 work_list: str,
+                 executor: str = EXECUTOR_PROCESS,
+                 ordered: bool = True):
+        """
+        Args:
+            work_list (str): `dest` of the argument holding the inputs
+            executor (str): 'process' or 'thread'. Threads are used instead
+                of processes if `fork` is not available on the platform.
+            ordered (bool): Write outputs in the order of the inputs by
+                default.
+        """
+        super(JobsOption, self).__init__()
+        assert executor in (EXECUTOR_PROCESS, EXECUTOR_THREAD), \
+            "Unknown executor '{}'.".format(executor)
+        self.work_list = work_list
+        self.executor = executor
+        self.ordered = ordered
+
+    def build_option(self, parser: 'argparse.ArgumentParser') \
+            -> 'argparse.ArgumentParser':
+        parser.add_argument(
+            '-j', '--jobs', type=int, default=1, metavar='N',
+            help='run N jobs in parallel (0 means the number of CPUs)')
+        if self.ordered:
+            parser.add_argument(
+                '--unordered', dest='ordered', action='store_false',
+                help='write outputs as soon as each job finishes')
+        else:
+            parser.add_argument(
+                '--ordered', dest='ordered', action='store_true',
+                help='write outputs in the order of the inputs')
+        return parser
+
+    def validate(self, args: 'argparse.Namespace') -> 'List[Exception]':
+        errors = []
+        if args.jobs < 0:
+            errors.append(Exception(
+                "--jobs must not be negative: {}".format(args.jobs)))
+        if not isinstance(getattr(args, self.work_list, None), list):
+            errors.append(Exception(
+                "'{}' is not a list of inputs.".format(self.work_list)))
+        return errors
+
+    def after_validate(self,
+                       safe_args: 'argparse.Namespace'
+                       ) -> 'argparse.Namespace':
+        jobs = safe_args.jobs or os.cpu_count() or 1
+        if jobs == 1:
+            return safe_args
+        executor = self.executor
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            executor = EXECUTOR_THREAD
+        work_list = self.work_list
+
+        def run_jobs(args: 'argparse.Namespace') -> 'ExitStatus':
+            # The arguments may be replaced by the hooks called after this
+            func = getattr(args, _FUNC_DEST)
+            job_args = copy.copy(args)
+            job_args.func = func
+            job = (func, job_args, work_list, getattr(args, work_list))
+            return run(job, jobs, executor, args.ordered)
+        setattr(safe_args, _FUNC_DEST, safe_args.func)
+        safe_args.func = run_jobs
+        return safe_args
+
+
+def run(job: 'Job', jobs: int, executor: str, ordered: bool) -> 'ExitStatus':
+    """Run the job for each input and write the outputs.
+
+    Args:
+        job (Job): `run` of the command, the arguments, the name of the
+            work list and the inputs
+        jobs (int): Number of workers
+        executor (str): 'process' or 'thread'
+        ordered (bool): Write outputs in the order of the inputs
+
+    Returns:
+        ExitStatus: The first exit status which is not success
+    """
+    size = min(jobs, len(job[3]))
+    if size == 0:
+        return ExitStatus.SUCCESS
+    if executor == EXECUTOR_PROCESS:
+        results = _run_in_processes(job, size, ordered)
+    else:
+        results = _run_in_threads(job, size, ordered)
+    return utils.aggregate_exit_status(_write_outputs(results))
+
+
+def _write_outputs(results: 'Iterator[Tuple[int, str]]') -> 'Iterator[int]':
+    for status, output in results:
+        sys.stdout.write(output)
+        sys.stdout.flush()
+        yield status
+
+
+def _run_in_processes(job: 'Job', size: int,
+                      ordered: bool) -> 'Iterator[Tuple[int, str]]':
+    global _job
+    # Workers flush the inherited buffers when they exit
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    _job = job
+    try:
+        pool = multiprocessing.get_context('fork').Pool(size)
+    finally:
+        _job = None
+    with pool:
+        indexes = range(len(job[3]))
+        if ordered:
+            yield from pool.imap(_run_forked, indexes)
+        else:
+            yield from pool.imap_unordered(_run_forked, indexes)
+
+
+def _run_forked(index: int) -> 'Tuple[int, str]':
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        status = _run_one(_job, index)
+        return status, sys.stdout.getvalue()
+    finally:
+        sys.stdout = stdout
+
+
+def _run_in_threads(job: 'Job', size: int,
+                    ordered: bool) -> 'Iterator[Tuple[int, str]]':
+    from concurrent import futures
+    stdout = sys.stdout
+    sys.stdout = _ThreadLocalStream(stdout)
+    try:
+        with futures.ThreadPoolExecutor(max_workers=size) as executor:
+            fs = [executor.submit(_run_captured, job, i, sys.stdout)
+                  for i in range(len(job[3]))]
+            if not ordered:
+                fs = futures.as_completed(fs)
+            for future in fs:
+                yield future.result()
+    finally:
+        sys.stdout = stdout
+
+
+def _run_captured(job: 'Job', index: int,
+                  stream: '_ThreadLocalStream') -> 'Tuple[int, str]':
+    buffer = stream.local.buffer = io.StringIO()
+    try:
+        status = _run_one(job, index)
+        return status, buffer.getvalue()
+    finally:
+        del stream.local.buffer
+
+
+def _run_one(job: 'Job', index: int) -> int:
+    func, args, work_list, inputs = job
+    args = copy.copy(args)
+    setattr(args, work_list, [inputs[index]])
+    # `out` of the command is the sink of this job in the current thread
+    binding = _local.output = _JobOutput(getattr(func, '__self__', None))
+    try:
+        try:
+            status = func(args)
+            if utils.is_awaitable(status):
+                status = utils.run_until_complete(status)
+        finally:
+            binding.close()
+        return int(utils.to_exit_status(status))
+    except SystemExit as e:
+        return utils.get_exit_code(e.code)
+    except Exception:
+        traceback.print_exc()
+        return ExitStatus.FAILURE
+    finally:
+        _local.output = None
+
+
+def job_output(command: 'Any') -> 'Optional[Output]':
+    """Return the sink of the records of the job running `command` in the
+    current thread, or None if the command is not run by a job."""
+    binding = getattr(_local, 'output', None)
+    if binding is None or binding.command is not command:
+        return None
+    if binding.out is None:
+        binding.out = command._create_output()
+    return binding.out
+
+
+class _JobOutput(object):
+    """Sink of the records of a job, created on the first use"""
+
+    __slots__ = ('command', 'out')
+
+    def __init__(self, command: 'Any'):
+        self.command = command
+        self.out = None  # type: Optional[Output]
+
+    def close(self):
+        """Write the records to the captured output of the job"""
+        if self.out is not None:
+            self.out.close()
+
+
+class _ThreadLocalStream(object):
+    """Stream writing to the buffer of the current thread if it is set"""
+
+    def __init__(self, stream: 'Any'):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self) -> 'Any':
+        return getattr(self.local, 'buffer', self.stream)
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name: str) -> 'Any':
+        return getattr(self.stream, name)
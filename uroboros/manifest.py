@@ -0,0 +1,462 @@
+"""Cache of the command tree on disk.
+
+The manifest holds the names, descriptions, import strings and option specs
+of all commands in a tree. It is built once by initializing the whole tree,
+and is used to dispatch commands and render the help without building the
+parsers of unrelated commands in the following invocations.
+
+The manifest records the modules defining the commands and options, and
+the names and classes of the commands registered to the tree (e.g. by
+`add_command` in the main script). It is regarded as stale if any of the
+modules is modified or the registered commands are changed.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from uroboros import utils
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import (
+        Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple)
+    from uroboros.command import Command
+    NodeDict = Dict[str, Any]
+
+logger = logging.getLogger(__name__)
+
+# Increment this when the format of the manifest is changed
+MANIFEST_VERSION = 3
+
+# Ways to detect modification of source files
+INVALIDATION_MTIME = 'mtime'
+INVALIDATION_HASH = 'hash'
+
+_HELP_ARGS = ('-h', '--help')
+
+
+class Manifest(object):
+    """Command tree loaded from the manifest"""
+
+    def __init__(self, data: 'Dict[str, Any]'):
+        self.data = data
+        self.commands = data['commands']  # type: List[NodeDict]
+        self._children = {}  # type: Dict[Tuple[int, str], int]
+        for index, node in enumerate(self.commands):
+            if node['parent'] is not None:
+                self._children[(node['parent'], node['name'])] = index
+        # Unique prefixes of the names of sub commands by the parent index
+        self._prefixes = {}  # type: Dict[int, Dict[str, Optional[str]]]
+
+    def _find_child(self, index: int, arg: str) -> 'Optional[int]':
+        child = self._children.get((index, arg))
+        if child is not None or not self.commands[index]['abbrev']:
+            return child
+        if index not in self._prefixes:
+            self._prefixes[index] = utils.build_prefix_table(
+                name for parent, name in self._children if parent == index)
+        name = self._prefixes[index].get(arg)
+        return None if name is None else self._children[(index, name)]
+
+    def _walk(self, argv: 'List[str]') -> 'Iterator[Tuple[str, int]]':
+        """Yield each argument and the index of the command reached by it."""
+        index = 0
+        for arg in argv:
+            if arg == '--':
+                return
+            child = self._find_child(index, arg)
+            if child is not None:
+                index = child
+            yield arg, index
+
+    def resolve_path(self, argv: 'List[str]') -> 'List[str]':
+        """Find the names of sub commands specified in `argv`.
+
+        See `uroboros.Command._resolve_path` for the limitation.
+
+        Args:
+            argv (List[str]): Arguments to parse
+
+        Returns:
+            List[str]: Names of the sub commands from the root to the leaf
+        """
+        path = []
+        current = 0
+        for _, index in self._walk(argv):
+            if index != current:
+                path.append(self.commands[index]['name'])
+                current = index
+        return path
+
+    def find_help(self, argv: 'List[str]') -> 'Optional[int]':
+        """Find the command whose help is requested in `argv`.
+
+        Args:
+            argv (List[str]): Arguments to parse
+
+        Returns:
+            Optional[int]: Index of the command, or None if the help is not
+                requested.
+        """
+        for arg, index in self._walk(argv):
+            if arg in _HELP_ARGS:
+                if arg in self.commands[index]['help_options']:
+                    return index
+                return None
+        return None
+
+    def format_help(self, index: int) -> str:
+        """Render the help message of the command without building parsers
+        of other commands.
+
+        Args:
+            index (int): Index of the command
+
+        Returns:
+            str: The help message
+        """
+        return _build_parser(self.commands[index]).format_help()
+
+    def print_help(self, index: int):
+        """Print the help message of the command to stdout."""
+        sys.stdout.write(self.format_help(index))
+
+
+def dump(command: 'Command',
+         path: str,
+         invalidation: str = INVALIDATION_MTIME) -> 'Manifest':
+    """Build the manifest of the command tree and write it to `path`.
+
+    The manifest is not cached if it cannot be written.
+
+    Args:
+        command (Command): The root command
+        path (str): Path of the manifest
+        invalidation (str): 'mtime' or 'hash' to detect modification of
+            source files.
+
+    Returns:
+        Manifest: The manifest written
+    """
+    cache = build(command, invalidation)
+    try:
+        _write_atomically(path, json.dumps(cache.data))
+    except OSError as e:
+        logger.warning("Failed to write the manifest '%s': %s", path, e)
+    return cache
+
+
+def build(command: 'Command',
+          invalidation: str = INVALIDATION_MTIME) -> 'Manifest':
+    """Build the manifest of the command tree.
+
+    All commands in the tree are loaded and initialized.
+
+    Args:
+        command (Command): The root command
+        invalidation (str): 'mtime' or 'hash' to detect modification of
+            source files.
+
+    Returns:
+        Manifest: The manifest
+    """
+    assert invalidation in (INVALIDATION_MTIME, INVALIDATION_HASH), \
+        "Unknown invalidation '{}'.".format(invalidation)
+    from uroboros import version
+    command.initialize()
+    commands = []
+    modules = set()
+    stack = [(command, None)]
+    while stack:
+        cmd, parent = stack.pop()
+        index = len(commands)
+        node = _dump_parser(cmd._parser)
+        node.update(
+            name=cmd.name,
+            parent=parent,
+            import_path=cmd._import_path,
+            short_description=cmd.short_description,
+            abbrev=cmd.allow_sub_command_abbrev,
+        )
+        commands.append(node)
+        modules.add(type(cmd).__module__)
+        modules.update(type(opt).__module__ for opt in cmd.get_options())
+        if cmd._import_path is not None:
+            modules.add(cmd._import_path.split(':', 1)[0])
+        for sub_cmd in reversed(cmd.sub_commands):
+            stack.append((sub_cmd, index))
+    data = {
+        'version': MANIFEST_VERSION,
+        'uroboros': version,
+        'invalidation': invalidation,
+        'sources': _stamp_sources(_module_files(modules), invalidation),
+        'tree': _fingerprint(command),
+        'commands': commands,
+    }
+    return Manifest(data)
+
+
+def load(path: str,
+         command: 'Optional[Command]' = None) -> 'Optional[Manifest]':
+    """Load the manifest from `path`.
+
+    Args:
+        path (str): Path of the manifest
+        command (Optional[Command]): The root command. If it is given, the
+            manifest is regarded as stale if the commands registered to
+            the tree are different from the ones when it was built.
+
+    Returns:
+        Optional[Manifest]: The manifest, or None if it does not exist,
+            is broken or stale.
+    """
+    from uroboros import version
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) \
+            or data.get('version') != MANIFEST_VERSION \
+            or data.get('uroboros') != version:
+        return None
+    try:
+        sources = data['sources']
+        current = _stamp_sources(sources.keys(), data['invalidation'])
+        if current != sources:
+            return None
+        if command is not None and data['tree'] != _fingerprint(command):
+            return None
+        return Manifest(data)
+    except OSError:
+        return None
+    except (AttributeError, KeyError, TypeError, ValueError):
+        # The structure is broken
+        return None
+
+
+def _fingerprint(command: 'Command') -> 'List[List[Any]]':
+    """Return the parent, name and class of each command registered to the
+    tree. Commands registered by import strings are recorded by the import
+    strings without loading them, since their modules are recorded as the
+    sources."""
+    nodes = []  # type: List[List[Any]]
+    stack = [(command, None)]  # type: List[Tuple[Command, Optional[int]]]
+    while stack:
+        cmd, parent = stack.pop()
+        index = len(nodes)
+        import_path = cmd._import_path
+        if import_path is None:
+            cls = type(cmd)
+            import_path = '{}:{}'.format(cls.__module__, cls.__qualname__)
+        nodes.append([parent, cmd.name, import_path])
+        if cmd._import_path is None:
+            for sub_cmd in reversed(cmd.sub_commands):
+                stack.append((sub_cmd, index))
+    return nodes
+
+
+def _module_files(module_names: 'Set[str]') -> 'List[str]':
+    files = []
+    for name in module_names:
+        module = sys.modules.get(name)
+        filename = getattr(module, '__file__', None)
+        if filename is not None:
+            files.append(os.path.abspath(filename))
+    return sorted(files)
+
+
+def _stamp_sources(files: 'Iterable[str]',
+                   invalidation: str) -> 'Dict[str, Any]':
+    stamps = {}
+    for filename in files:
+        if invalidation == INVALIDATION_HASH:
+            with open(filename, 'rb') as f:
+                stamps[filename] = hashlib.sha256(f.read()).hexdigest()
+        else:
+            stat = os.stat(filename)
+            stamps[filename] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def _write_atomically(path: str, content: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _action_name(parser: 'argparse.ArgumentParser',
+                 action: 'argparse.Action') -> 'Optional[str]':
+    registry = parser._registries['action']
+    for name, action_class in registry.items():
+        if name is not None and type(action) is action_class:
+            return name
+    # Subclasses of the builtin actions are dumped as the base ones
+    for name, action_class in registry.items():
+        if name is not None and isinstance(action, action_class):
+            return name
+    return None
+
+
+def _to_json(value: 'Any') -> 'Any':
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return str(value)
+
+
+def _dump_action(parser: 'argparse.ArgumentParser',
+                 action: 'argparse.Action') -> 'NodeDict':
+    spec = {
+        'action': _action_name(parser, action),
+        'option_strings': action.option_strings,
+        'dest': action.dest,
+        'nargs': action.nargs,
+        'const': _to_json(action.const),
+        'default': _to_json(action.default),
+        'choices': _to_json(action.choices),
+        'required': action.required,
+        'help': action.help,
+        'metavar': _to_json(action.metavar),
+    }
+    if isinstance(action, argparse._SubParsersAction):
+        spec['choices'] = [
+            [choice.dest, choice.help] for choice in action._choices_actions]
+        spec['title'] = action.container.title
+        spec['description'] = action.container.description
+    if isinstance(action, argparse._VersionAction):
+        spec['version'] = action.version
+    return spec
+
+
+def _dump_parser(parser: 'argparse.ArgumentParser') -> 'NodeDict':
+    actions = parser._actions
+    index_of = {id(action): i for i, action in enumerate(actions)}
+    groups = []
+    for group in parser._action_groups:
+        groups.append({
+            'title': group.title,
+            'description': group.description,
+            'actions': [index_of[id(a)] for a in group._group_actions],
+        })
+    formatter_class = parser.formatter_class
+    return {
+        'prog': parser.prog,
+        'usage': parser.usage,
+        'description': parser.description,
+        'epilog': parser.epilog,
+        'prefix_chars': parser.prefix_chars,
+        'formatter_class': '{}:{}'.format(
+            formatter_class.__module__, formatter_class.__qualname__),
+        'help_options': [
+            option for action in actions
+            if isinstance(action, argparse._HelpAction)
+            for option in action.option_strings],
+        'actions': [_dump_action(parser, action) for action in actions],
+        'groups': groups,
+        'mutually_exclusive_groups': [
+            {
+                'required': group.required,
+                'actions': [index_of[id(a)] for a in group._group_actions],
+            }
+            for group in parser._mutually_exclusive_groups
+        ],
+    }
+
+
+def _import_string(import_path: str) -> 'Any':
+    module_name, attr = import_path.split(':', 1)
+    obj = importlib.import_module(module_name)
+    for name in attr.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+_ACTION_KWARGS = {
+    'store': ('nargs', 'const', 'default', 'choices', 'metavar'),
+    'store_const': ('const', 'default'),
+    'store_true': ('default',),
+    'store_false': ('default',),
+    'append': ('nargs', 'const', 'default', 'choices', 'metavar'),
+    'append_const': ('const', 'default'),
+    'count': ('default',),
+    'help': ('default',),
+    'version': ('default', 'version'),
+    'extend': ('nargs', 'const', 'default', 'choices', 'metavar'),
+}
+
+
+def _add_action(container, spec: 'NodeDict'):
+    name = spec['action']
+    if name not in _ACTION_KWARGS:
+        # Unknown actions are shown as the nearest builtin one
+        name = 'store_const' if spec['nargs'] == 0 else 'store'
+    kwargs = {key: spec[key] for key in _ACTION_KWARGS[name]}
+    kwargs['help'] = spec['help']
+    args = spec['option_strings']
+    if args:
+        kwargs['dest'] = spec['dest']
+        if name not in ('help', 'version'):
+            kwargs['required'] = spec['required']
+    else:
+        args = [spec['dest']]
+    if isinstance(kwargs.get('metavar'), list):
+        kwargs['metavar'] = tuple(kwargs['metavar'])
+    container.add_argument(*args, action=name, **kwargs)
+
+
+def _build_parser(node: 'NodeDict') -> 'argparse.ArgumentParser':
+    parser = argparse.ArgumentParser(
+        prog=node['prog'],
+        usage=node['usage'],
+        description=node['description'],
+        epilog=node['epilog'],
+        prefix_chars=node['prefix_chars'],
+        formatter_class=_import_string(node['formatter_class']),
+        add_help=False,
+    )
+    specs = node['actions']
+    # The first two groups are the default ones of argparse
+    containers = {}
+    for i, group in enumerate(node['groups']):
+        if i < 2:
+            container = parser._action_groups[i]
+            container.description = group['description']
+        elif any(specs[a]['action'] == 'parsers' for a in group['actions']):
+            continue
+        else:
+            container = parser.add_argument_group(
+                group['title'], group['description'])
+        for a in group['actions']:
+            containers[a] = container
+    for group in node['mutually_exclusive_groups']:
+        exclusive = containers[group['actions'][0]] \
+            .add_mutually_exclusive_group(required=group['required'])
+        for a in group['actions']:
+            containers[a] = exclusive
+    for i, spec in enumerate(specs):
+        if spec['action'] == 'parsers':
+            sub_parsers = parser.add_subparsers(
+                title=spec['title'],
+                description=spec['description'],
+                dest=spec['dest'],
+                metavar=spec['metavar'],
+            )
+            for name, help_ in spec['choices']:
+                sub_parsers.add_parser(name, help=help_, add_help=False)
+        else:
+            _add_action(containers.get(i, parser), spec)
+    return parser
@@ -0,0 +1,260 @@
+"""Arguments converted on the first access.
+
+Set `namespace_class = LazyNamespace` in the root command to defer the
+expensive conversions until `run` (or a hook) reads the value. Wrap the
+`type` of an argument by `deferred`, or set a derived value by `defer` in
+a hook. The value is computed once on the first access, and cached.
+
+    class ConfigOption(Option):
+
+        def build_option(self, parser):
+            parser.add_argument('--config', type=deferred(load_config))
+            return parser
+
+        def after_validate(self, safe_args):
+            defer(safe_args, 'index',
+                  lambda: build_index(safe_args.config))
+            return safe_args
+
+Expensive defaults (e.g. probing the system) are given by `lazy_default`,
+which is computed only when the argument is not given:
+
+    parser.add_argument('--cluster',
+                        default=lazy_default(read_default_cluster))
+
+Conversion errors are raised on the access. Validators can force the values
+to report them as validation errors:
+
+        def validate(self, args):
+            return force(args, 'config')
+
+Without `LazyNamespace`, deferred types and lazy defaults are resolved right
+after parsing and `defer` computes the value immediately, so that options
+using them work in any command tree.
+"""
+import argparse
+
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List
+
+# Placeholder of the value which has not been computed
+_UNRESOLVED = object()
+
+
+class Deferred(object):
+    """A value computed by calling `func` on the first resolution"""
+
+    __slots__ = ('func', 'args', 'kwargs', '_value')
+
+    def __init__(self, func: 'Callable[..., Any]', *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._value = _UNRESOLVED
+
+    def resolve(self) -> 'Any':
+        # Copies of the namespace share the value
+        if self._value is _UNRESOLVED:
+            self._value = self.func(*self.args, **self.kwargs)
+        return self._value
+
+    def __repr__(self):
+        if self._value is not _UNRESOLVED:
+            return repr(self._value)
+        params = [repr(arg) for arg in self.args]
+        params.extend('{}={!r}'.format(k, v) for k, v in self.kwargs.items())
+        return '<deferred {}({})>'.format(
+            getattr(self.func, '__name__', repr(self.func)),
+            ', '.join(params))
+
+
+class _DeferredType(object):
+    """`type` of an argument returning a deferred conversion"""
+
+    def __init__(self, func: 'Callable[[str], Any]'):
+        self.func = func
+        # argparse shows the name in the error messages
+        self.__name__ = getattr(func, '__name__', repr(func))
+
+    def __call__(self, string: str) -> Deferred:
+        return Deferred(self.func, string)
+
+    def __repr__(self):
+        return 'deferred({!r})'.format(self.func)
+
+
+def deferred(func: 'Callable[[str], Any]') -> 'Callable[[str], Any]':
+    """Wrap `type` of an argument to convert the string on the first access.
+
+    Args:
+        func (Callable[[str], Any]): Conversion as `type` of argparse
+    """
+    return _DeferredType(func)
+
+
+def lazy_default(func: 'Callable[..., Any]', *args, **kwargs) -> Deferred:
+    """Return the default of an argument computed by `func` on demand.
+
+    The default is computed only when the argument is not given and the
+    value is read (or forced). It is computed once in a process, and shared
+    by the following executions, e.g. in batch or server mode. Unlike the
+    defaults of strings, it is not converted by `type` of the argument.
+
+        parser.add_argument('-j', '--jobs', type=int,
+                            default=lazy_default(os.cpu_count))
+    """
+    return Deferred(func, *args, **kwargs)
+
+
+def defer(namespace: 'argparse.Namespace',
+          name: str,
+          func: 'Callable[..., Any]',
+          *args,
+          **kwargs):
+    """Set the value computed by `func` on the first access to `name`.
+
+    The value is computed immediately unless `namespace` is `LazyNamespace`.
+    """
+    if isinstance(namespace, LazyNamespace):
+        setattr(namespace, name, Deferred(func, *args, **kwargs))
+    else:
+        setattr(namespace, name, func(*args, **kwargs))
+
+
+def _is_deferred(value: 'Any') -> bool:
+    if isinstance(value, Deferred):
+        return True
+    # Arguments with `nargs` have lists of the values
+    return isinstance(value, list) and \
+        any(isinstance(item, Deferred) for item in value)
+
+
+def _resolve(value: 'Any') -> 'Any':
+    if isinstance(value, Deferred):
+        return value.resolve()
+    resolved = []
+    for item in value:
+        if not isinstance(item, Deferred):
+            resolved.append(item)
+            continue
+        try:
+            resolved.append(item.resolve())
+        except Exception as e:
+            raise argparse.ArgumentTypeError(_describe(item, e)) from e
+    return resolved
+
+
+def _describe(value: 'Any', exc: Exception) -> str:
+    """Describe the error of the conversion as argparse does"""
+    if isinstance(value, Deferred) and len(value.args) == 1 and \
+            isinstance(value.args[0], str) and \
+            isinstance(exc, (TypeError, ValueError)) and \
+            not isinstance(exc, argparse.ArgumentTypeError):
+        return 'invalid {} value: {!r}'.format(
+            getattr(value.func, '__name__', repr(value.func)), value.args[0])
+    return str(exc)
+
+
+class LazyNamespace(argparse.Namespace):
+    """Namespace resolving deferred values on the first access.
+
+    Deferred values are kept aside until they are resolved, so that reading
+    the other values costs nothing more than `argparse.Namespace`.
+    """
+
+    __slots__ = ('_pending',)
+
+    def __init__(self, **kwargs):
+        object.__setattr__(self, '_pending', {})
+        super().__init__(**kwargs)
+
+    def __setattr__(self, name: str, value: 'Any'):
+        pending = self._pending  # type: Dict[str, Any]
+        if _is_deferred(value):
+            self.__dict__.pop(name, None)
+            pending[name] = value
+            return
+        pending.pop(name, None)
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name: str) -> 'Any':
+        # Called only when `name` is not resolved yet
+        try:
+            pending = object.__getattribute__(self, '_pending')
+        except AttributeError:
+            # Not initialized (e.g. while copying)
+            raise AttributeError(name) from None
+        if name not in pending:
+            raise AttributeError(name)
+        value = _resolve(pending[name])
+        del pending[name]
+        object.__setattr__(self, name, value)
+        return value
+
+    def __delattr__(self, name: str):
+        if self._pending.pop(name, _UNRESOLVED) is _UNRESOLVED:
+            object.__delattr__(self, name)
+
+    def __getstate__(self) -> 'Dict[str, Any]':
+        # Copies share the deferred values but not the pending table
+        state = dict(self.__dict__)
+        state.update(self._pending)
+        return state
+
+    def __setstate__(self, state: 'Dict[str, Any]'):
+        object.__setattr__(self, '_pending', {})
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dict__ or key in self._pending
+
+    def __eq__(self, other: 'Any') -> bool:
+        if not isinstance(other, argparse.Namespace):
+            return NotImplemented
+        force(self)
+        if isinstance(other, LazyNamespace):
+            force(other)
+        return vars(self) == vars(other)
+
+    def _get_kwargs(self) -> 'List[Any]':
+        # Show the deferred values without resolving them
+        return sorted(list(self.__dict__.items()) +
+                      list(self._pending.items()))
+
+
+def force(namespace: 'argparse.Namespace', *names: str) -> 'List[Exception]':
+    """Resolve the deferred values and return the errors of them.
+
+    Args:
+        namespace (argparse.Namespace): Parsed arguments
+        *names (str): Names of the values to resolve. All values are
+            resolved if nothing is given.
+
+    Returns:
+        List[Exception]: The errors raised by the conversions. The values
+            which failed are left deferred.
+    """
+    if isinstance(namespace, LazyNamespace):
+        values = namespace._pending
+    else:
+        values = {name: value for name, value in vars(namespace).items()
+                  if _is_deferred(value)}
+    if names:
+        values = {name: values[name] for name in names if name in values}
+    exceptions = []
+    for name, value in list(values.items()):
+        try:
+            resolved = _resolve(value)
+        except Exception as e:
+            exceptions.append(argparse.ArgumentTypeError(
+                'argument {}: {}'.format(name, _describe(value, e))))
+            continue
+        if isinstance(namespace, LazyNamespace):
+            del namespace._pending[name]
+            object.__setattr__(namespace, name, resolved)
+        else:
+            setattr(namespace, name, resolved)
+    return exceptions
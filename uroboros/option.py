@@ -1,21 +1,31 @@
 import abc
 import argparse
-from functools import lru_cache
-from typing import TYPE_CHECKING
+
+from uroboros.constants import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import List
+    from typing import List, Optional
+    OptionalParser = Optional[argparse.ArgumentParser]
 
 
 class Option(metaclass=abc.ABCMeta):
     """Common option class"""
 
+    # The parser configured by `build_option`
+    _built_parser = None  # type: OptionalParser
+
     def __init__(self):
         self.parser = argparse.ArgumentParser(add_help=False)
 
-    @lru_cache()
     def get_parser(self) -> 'argparse.ArgumentParser':
-        return self.build_option(self.parser)
+        """Return the parser configured by `build_option`.
+
+        The parser is built once and shared by all commands having this
+        option.
+        """
+        if self._built_parser is None:
+            self._built_parser = self.build_option(self.parser)
+        return self._built_parser
 
     @abc.abstractmethod
     def build_option(self, parser: 'argparse.ArgumentParser') \
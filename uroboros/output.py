@@ -0,0 +1,261 @@
+"""Records written by commands in a structured format.
+
+`Command.out` is the sink of the records of the executed command. Records
+are mappings (or sequences) serialized as ndjson, CSV or an aligned table,
+chosen by `output_format` of the root command or `--output FORMAT` if
+`allow_output` is set.
+
+    class ListCommand(Command):
+        name = 'list'
+
+        def run(self, args):
+            for name, value in os.environ.items():
+                self.out.emit({'name': name, 'value': value})
+            return ExitStatus.SUCCESS
+
+    $ sample.py --output csv list
+    name,value
+    SHELL,/bin/bash
+    ...
+
+Records are serialized into a buffer and written in large chunks. The
+buffer is flushed when `run` returns. If the reader has gone (e.g. `| head`),
+`emit` raises `uroboros.errors.OutputClosedError` to stop `run`, and the
+command exits with the status of SIGPIPE (141) without a traceback.
+"""
+import os
+import sys
+
+from uroboros import errors
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable, List, Optional, TextIO
+
+FORMAT_NDJSON = 'ndjson'
+FORMAT_CSV = 'csv'
+FORMAT_TABLE = 'table'
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV, FORMAT_TABLE)
+
+# Characters buffered before writing to the stream
+BUFFER_SIZE = 64 * 1024
+
+# Number of records to decide the widths of the columns of a table
+TABLE_SAMPLE_SIZE = 1000
+
+
+def create(output_format: str, stream: 'Optional[TextIO]' = None) -> 'Output':
+    """Return the output of the format writing to `stream` (stdout)."""
+    if output_format == FORMAT_NDJSON:
+        return NdjsonOutput(stream)
+    if output_format == FORMAT_CSV:
+        return CsvOutput(stream)
+    if output_format == FORMAT_TABLE:
+        return TableOutput(stream)
+    raise ValueError("Unknown output format '{}'.".format(output_format))
+
+
+class Output(object):
+    """Buffered sink of records"""
+
+    def __init__(self, stream: 'Optional[TextIO]' = None):
+        self.stream = sys.stdout if stream is None else stream
+        # Names of the columns. The keys of the first record are used if
+        # it is not given before emitting records.
+        self.fields = None  # type: Optional[List[str]]
+        self.closed = False
+        self._chunks = []  # type: List[str]
+        self._size = 0
+
+    def emit(self, record: 'Any'):
+        """Write a record.
+
+        Args:
+            record (Any): A mapping from the names of the fields to the
+                values, or a sequence of the values.
+
+        Raises:
+            uroboros.errors.OutputClosedError: The reader has gone.
+        """
+        raise NotImplementedError
+
+    def emit_many(self, records: 'Iterable[Any]'):
+        """Write records."""
+        emit = self.emit
+        for record in records:
+            emit(record)
+
+    def write(self, text: str):
+        """Write serialized text to the buffer."""
+        if self.closed:
+            raise errors.OutputClosedError()
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= BUFFER_SIZE:
+            self._write_buffer()
+
+    def flush(self):
+        """Write the buffered records to the stream."""
+        if self.closed:
+            return
+        self._write_buffer()
+        self._call(self.stream.flush)
+
+    def close(self):
+        """Flush the buffered records. The output cannot be used later."""
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+
+    def _write_buffer(self):
+        if not self._chunks:
+            return
+        text = ''.join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        self._call(self.stream.write, text)
+
+    def _call(self, method: 'Any', *args):
+        try:
+            method(*args)
+        except BrokenPipeError as e:
+            self.closed = True
+            self._chunks = []
+            _discard(self.stream)
+            raise errors.OutputClosedError() from e
+
+    def _fields_of(self, record: 'Any') -> 'Optional[List[str]]':
+        if self.fields is None and hasattr(record, 'keys'):
+            self.fields = list(record.keys())
+        return self.fields
+
+    def _values_of(self, record: 'Any') -> 'List[Any]':
+        if hasattr(record, 'keys'):
+            get = record.get
+            return [get(field) for field in self.fields]
+        return list(record)
+
+
+def _discard(stream: 'Any'):
+    """Redirect the file of the stream to devnull, so that flushing the
+    rest of its buffer does not fail again when the process exits."""
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, fd)
+    finally:
+        os.close(devnull)
+
+
+class NdjsonOutput(Output):
+    """A JSON document in each line"""
+
+    def __init__(self, stream: 'Optional[TextIO]' = None):
+        super(NdjsonOutput, self).__init__(stream)
+        import json
+        # Values which are not JSON types (e.g. paths) are strings
+        self._encode = json.JSONEncoder(default=str).encode
+
+    def emit(self, record: 'Any'):
+        if not isinstance(record, (dict, list)):
+            record = dict(record) if hasattr(record, 'keys') \
+                else list(record)
+        self.write(self._encode(record) + '\n')
+
+
+class CsvOutput(Output):
+    """Comma separated values with the header of the fields"""
+
+    def __init__(self, stream: 'Optional[TextIO]' = None):
+        super(CsvOutput, self).__init__(stream)
+        import csv
+        self._writer = csv.writer(self, lineterminator='\n')
+        self._started = False
+
+    def emit(self, record: 'Any'):
+        if not self._started:
+            self._started = True
+            fields = self._fields_of(record)
+            if fields is not None:
+                self._writer.writerow(fields)
+        self._writer.writerow(self._values_of(record))
+
+
+class TableOutput(Output):
+    """Columns aligned by the widths of the values of the first records.
+
+    The records are held until `TABLE_SAMPLE_SIZE` records are given or the
+    output is flushed. The later records are written as they are given, and
+    the values wider than the column shift the following columns.
+    """
+
+    separator = '  '
+
+    def __init__(self, stream: 'Optional[TextIO]' = None):
+        super(TableOutput, self).__init__(stream)
+        # Records held to decide the widths
+        self._rows = []  # type: Optional[List[List[Any]]]
+        self._widths = []  # type: List[int]
+        self._numeric = []  # type: List[bool]
+
+    def emit(self, record: 'Any'):
+        if self.closed:
+            raise errors.OutputClosedError()
+        if self._rows is None:
+            self.write(self._format(self._values_of(record)))
+            return
+        self._fields_of(record)
+        self._rows.append(self._values_of(record))
+        if len(self._rows) >= TABLE_SAMPLE_SIZE:
+            self._write_rows()
+
+    def flush(self):
+        if not self.closed and self._rows is not None:
+            self._write_rows()
+        super(TableOutput, self).flush()
+
+    def _write_rows(self):
+        rows, self._rows = self._rows, None
+        columns = max([len(row) for row in rows] + [len(self.fields or [])])
+        self._numeric = [True] * columns
+        widths = [0] * columns
+        if self.fields is not None:
+            widths = [len(str(field)) for field in self.fields]
+            widths.extend([0] * (columns - len(widths)))
+        for row in rows:
+            for i, value in enumerate(row):
+                if value is not None and (
+                        isinstance(value, bool) or
+                        not isinstance(value, (int, float))):
+                    self._numeric[i] = False
+                widths[i] = max(widths[i], len(_cell(value)))
+        self._widths = widths
+        if self.fields is not None:
+            self.write(self._format(self.fields))
+        for row in rows:
+            self.write(self._format(row))
+
+    def _format(self, values: 'List[Any]') -> str:
+        cells = []
+        last = len(values) - 1
+        widths = self._widths
+        numeric = self._numeric
+        for i, value in enumerate(values):
+            cell = _cell(value)
+            if i >= len(widths):
+                pass
+            elif numeric[i]:
+                # Numbers are aligned to the right
+                cell = cell.rjust(widths[i])
+            elif i != last:
+                cell = cell.ljust(widths[i])
+            cells.append(cell)
+        return self.separator.join(cells) + '\n'
+
+
+def _cell(value: 'Any') -> str:
+    return '' if value is None else str(value)
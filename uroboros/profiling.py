@@ -0,0 +1,215 @@
+"""Profile the execution of any command by an environment variable.
+
+    $ UROBOROS_PROFILE=cprofile python sample.py hello
+    $ python -m pstats sample.py.12345.1.prof
+
+    $ UROBOROS_PROFILE=sample python sample.py hello
+    $ flamegraph.pl sample.py.12345.1.folded > hello.svg
+
+`UROBOROS_PROFILE` chooses the profiler:
+
+- cprofile: `cProfile` writing the stats readable by `pstats`
+- sample: a sampler of the stacks on `SIGPROF`, writing the folded stacks
+  for flame graphs. It costs little since it looks at the stack only every
+  interval of CPU time. It is available only on Unix and in the main
+  thread.
+
+The other environment variables are optional:
+
+- UROBOROS_PROFILE_OUTPUT: Path of the output. `{name}`, `{pid}` and
+  `{seq}` are replaced with the name of the root command, the process id
+  and the sequence number of the execution in the process (from 1), so
+  that executions in a long-lived process (e.g. the server mode) do not
+  overwrite the profiles of the others. The default is
+  `{name}.{pid}.{seq}.prof` or `{name}.{pid}.{seq}.folded` in the current
+  directory.
+- UROBOROS_PROFILE_PHASE: Profile only the phase of the execution
+  (e.g. `run`). See `uroboros.instrumentation` for the phases.
+- UROBOROS_PROFILE_INTERVAL: Seconds of CPU time between samples
+  (default: 0.005)
+"""
+import collections
+import itertools
+import logging
+import os
+import threading
+
+from uroboros import instrumentation
+from uroboros.constants import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Counter, Dict, Optional, Union
+    from types import CodeType, FrameType
+    # `cProfile.Profile` or `StackSampler`
+    Profile = Any
+    # The previous handler of the signal
+    SignalHandler = Any
+    # Folded stacks and the numbers of their samples
+    Stacks = Counter[str]
+    Labels = Dict[CodeType, str]
+    from uroboros.command import Command
+    from uroboros.constants import ExitStatus
+
+ENV_NAME = instrumentation.PROFILE_ENV_NAME
+ENV_OUTPUT = 'UROBOROS_PROFILE_OUTPUT'
+ENV_PHASE = 'UROBOROS_PROFILE_PHASE'
+ENV_INTERVAL = 'UROBOROS_PROFILE_INTERVAL'
+
+PROFILER_CPROFILE = 'cprofile'
+PROFILER_SAMPLE = 'sample'
+
+DEFAULT_INTERVAL = 0.005
+
+# Sequence numbers of the executions profiled in this process
+_sequence = itertools.count(1)
+
+logger = logging.getLogger(__name__)
+
+
+def from_env() -> 'Optional[Profiler]':
+    """Return the profiler chosen by `UROBOROS_PROFILE`.
+
+    An invalid setting is logged and ignored not to break the command.
+    """
+    kind = os.environ.get(ENV_NAME)
+    if not kind:
+        return None
+    if kind not in (PROFILER_CPROFILE, PROFILER_SAMPLE):
+        logger.warning("Unknown profiler '%s' in %s.", kind, ENV_NAME)
+        return None
+    try:
+        interval = float(os.environ.get(ENV_INTERVAL) or DEFAULT_INTERVAL)
+    except ValueError:
+        logger.warning("Invalid interval in %s.", ENV_INTERVAL)
+        interval = DEFAULT_INTERVAL
+    return Profiler(kind,
+                    path=os.environ.get(ENV_OUTPUT) or None,
+                    phase=os.environ.get(ENV_PHASE) or None,
+                    interval=interval)
+
+
+class Profiler(instrumentation.Instrument):
+    """Profile the execution and write the result when it finishes"""
+
+    def __init__(self,
+                 kind: str,
+                 path: 'Optional[str]' = None,
+                 phase: 'Optional[str]' = None,
+                 interval: float = DEFAULT_INTERVAL):
+        """
+        Args:
+            kind (str): 'cprofile' or 'sample'
+            path (:obj: str, optional): Path of the output. `{name}` and
+                `{pid}` are replaced.
+            phase (:obj: str, optional): Profile only the phase
+            interval (float): Seconds of CPU time between samples
+        """
+        assert kind in (PROFILER_CPROFILE, PROFILER_SAMPLE), \
+            "Unknown profiler '{}'.".format(kind)
+        self.kind = kind
+        self.path = path
+        self.phase_name = phase
+        if kind == PROFILER_CPROFILE:
+            import cProfile
+            self.profile = cProfile.Profile()  # type: Profile
+        else:
+            self.profile = StackSampler(interval)
+        self.enabled = False
+        self.sequence = next(_sequence)
+
+    def _enable(self):
+        if not self.enabled:
+            # The sampler returns False if it is not available
+            self.enabled = self.profile.enable() is not False
+
+    def _disable(self):
+        if self.enabled:
+            self.profile.disable()
+            self.enabled = False
+
+    def start(self, command: 'Command'):
+        if self.phase_name is None:
+            self._enable()
+
+    def enter_phase(self, name: str, command: 'Command'):
+        if name == self.phase_name:
+            self._enable()
+
+    def phase(self, name: str, command: 'Command', elapsed: float):
+        if name == self.phase_name:
+            self._disable()
+
+    def finish(self,
+               command: 'Command',
+               status: 'Optional[Union[ExitStatus, int]]'):
+        self._disable()
+        path = self.output_path(command)
+        try:
+            if self.kind == PROFILER_CPROFILE:
+                self.profile.dump_stats(path)
+            else:
+                self.profile.dump(path)
+        except OSError as e:
+            logger.warning("Failed to write the profile: %s", e)
+
+    def output_path(self, command: 'Command') -> str:
+        extension = 'prof' if self.kind == PROFILER_CPROFILE else 'folded'
+        path = self.path or '{name}.{pid}.{seq}.' + extension
+        return path.format(name=command.name, pid=os.getpid(),
+                           seq=self.sequence)
+
+
+class StackSampler(object):
+    """Count the stacks of the main thread on each `SIGPROF`"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = collections.Counter()  # type: Stacks
+        # Labels of the code objects not to format them on each sample
+        self._labels = {}  # type: Labels
+        self._previous_handler = None  # type: SignalHandler
+
+    def enable(self) -> bool:
+        """Start sampling.
+
+        Returns:
+            bool: False if sampling is not available
+        """
+        import signal
+        if not hasattr(signal, 'setitimer'):
+            logger.warning('Sampling is not available on this platform.')
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            logger.warning('Sampling is available only in the main thread.')
+            return False
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return True
+
+    def disable(self):
+        import signal
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        # None means the handler was not installed from python
+        signal.signal(signal.SIGPROF,
+                      self._previous_handler or signal.SIG_DFL)
+        self._previous_handler = None
+
+    def _sample(self, signum: int, frame: 'Optional[FrameType]'):
+        labels = self._labels
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = '{} ({}:{})'.format(
+                    code.co_name, code.co_filename, code.co_firstlineno)
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[';'.join(stack)] += 1
+
+    def dump(self, path: str):
+        """Write the folded stacks (e.g. for `flamegraph.pl`)"""
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write('{} {}\n'.format(stack, count))
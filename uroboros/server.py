@@ -0,0 +1,403 @@
+"""Serve executions of a command over a Unix domain socket.
+
+The server keeps an initialized command tree warm in a long-lived process.
+A thin client sends its arguments, environment variables, working directory
+and the file descriptors of its stdio, then receives the exit status.
+Each request runs through `uroboros.Command.execute` in the server process
+with its stdio redirected to the client's ones.
+
+Requests are handled one by one in a process since the working directory,
+environment variables and stdio are shared in it. To handle requests
+concurrently, give the number of workers. The server initializes the whole
+command tree, freezes the objects from the garbage collector, and forks
+the workers. They share the memory pages of the warm tree copy-on-write.
+
+    # server
+    uroboros.server.serve(root_cmd, '/tmp/sample.sock', workers=4)
+
+    # client
+    $ python -m uroboros.server /tmp/sample.sock hello
+"""
+import argparse
+import array
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import traceback
+
+from uroboros import utils
+from uroboros.constants import TYPE_CHECKING, ExitStatus
+
+if TYPE_CHECKING:
+    from typing import (
+        Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple)
+    from uroboros.command import Command
+    Pids = Set[int]
+
+logger = logging.getLogger(__name__)
+
+# Length of the JSON body of a request
+_HEADER = struct.Struct('!I')
+# Exit status of a request
+_STATUS = struct.Struct('!i')
+# stdin, stdout and stderr
+_STDIO_FDS = (0, 1, 2)
+_BUFSIZE = 65536
+# Only the user running the server can connect to the socket
+_SOCKET_MODE = 0o600
+
+
+class Server(object):
+    """Server executing requests with the given command"""
+
+    def __init__(self,
+                 command: 'Command',
+                 socket_path: str,
+                 workers: int = 0,
+                 timeout: 'Optional[float]' = 10.0):
+        """
+        Args:
+            command (Command): The root command
+            socket_path (str): Path of the Unix domain socket to listen on
+            workers (int): Number of worker processes. If 0 is given,
+                requests are handled in this process.
+            timeout (:obj: float, optional): Seconds to wait for the
+                request of a client, so that a stalled client does not
+                block the server. None means no timeout.
+        """
+        assert hasattr(socket, 'AF_UNIX'), \
+            "Unix domain socket is not supported on this platform."
+        assert workers >= 0, "Number of workers must not be negative."
+        self.command = command
+        self.socket_path = socket_path
+        self.workers = workers
+        self.timeout = timeout
+        self._socket = None  # type: Optional[socket.socket]
+        self._worker_pids = set()  # type: Pids
+
+    def bind(self):
+        """Initialize the command and listen on the socket.
+
+        The whole tree is initialized before forking workers even if it
+        should be initialized lazily, so that the workers share it.
+
+        Raises:
+            FileExistsError: A file which is not a socket exists at the path
+        """
+        if self.workers > 0 or not self.command.lazy_initialization:
+            self.command.initialize()
+        _remove_socket(self.socket_path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self.socket_path)
+        # Other users must not execute commands as the user of the server.
+        # Nobody can connect to the socket until it listens.
+        os.chmod(self.socket_path, _SOCKET_MODE)
+        self._socket.listen(socket.SOMAXCONN)
+
+    def serve_forever(self):
+        """Handle requests until the socket is closed by `close`."""
+        if self._socket is None:
+            self.bind()
+        if self.workers > 0:
+            self._supervise()
+        else:
+            self._accept()
+
+    def _accept(self):
+        while self._socket is not None:
+            try:
+                conn, _ = self._socket.accept()
+            except OSError:
+                # The socket has been closed
+                break
+            with conn:
+                try:
+                    self.handle(conn)
+                except Exception:
+                    logger.exception("Failed to handle a request.")
+
+    def _supervise(self):
+        """Fork workers and fork again when any of them exits."""
+        _freeze_heap()
+        while self._socket is not None:
+            while len(self._worker_pids) < self.workers:
+                self._fork_worker()
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                continue
+            self._worker_pids.discard(pid)
+
+    def _fork_worker(self):
+        pid = os.fork()
+        if pid != 0:
+            self._worker_pids.add(pid)
+            return
+        status = ExitStatus.SUCCESS
+        try:
+            self._worker_pids.clear()
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self._accept()
+        except BaseException:
+            traceback.print_exc()
+            status = ExitStatus.FAILURE
+        finally:
+            # Never return to the caller of the parent
+            os._exit(status)
+
+    def close(self):
+        """Stop serving, terminate workers and remove the socket."""
+        for pid in self._worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in self._worker_pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._worker_pids.clear()
+        sock, self._socket = self._socket, None
+        if sock is not None:
+            sock.close()
+            _remove_socket(self.socket_path)
+
+    def handle(self, conn: 'socket.socket'):
+        """Execute a request received from `conn` and send the exit status.
+
+        A request which cannot be executed (e.g. the working directory
+        does not exist) fails with `ExitStatus.FAILURE`.
+
+        Args:
+            conn (socket.socket): Connection to the client
+        """
+        conn.settimeout(self.timeout)
+        request, fds = _recv_request(conn)
+        try:
+            status = self._execute_request(request, fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        conn.sendall(_STATUS.pack(status))
+
+    def _execute_request(self,
+                         request: 'Dict[str, Any]',
+                         fds: 'List[int]') -> int:
+        try:
+            if len(fds) != len(_STDIO_FDS):
+                raise ValueError(
+                    "{} file descriptors are expected but {} are given."
+                    .format(len(_STDIO_FDS), len(fds)))
+            with _client_context(request, fds):
+                return self.execute(request['argv'])
+        except Exception as e:
+            logger.exception("Failed to execute a request.")
+            if len(fds) == len(_STDIO_FDS):
+                _report_error(fds[2], e)
+            return ExitStatus.FAILURE
+
+    def execute(self, argv: 'List[str]') -> int:
+        """Execute the command as if it were run in a new process.
+
+        Args:
+            argv (List[str]): Arguments given by the client
+
+        Returns:
+            int: Exit status code
+        """
+        try:
+            return self.command.execute(argv)
+        except SystemExit as e:
+            return utils.get_exit_code(e.code)
+        except Exception:
+            traceback.print_exc()
+            return ExitStatus.FAILURE
+
+
+def serve(command: 'Command',
+          socket_path: str,
+          workers: int = 0,
+          timeout: 'Optional[float]' = 10.0):
+    """Serve executions of the command on `socket_path` until interrupted
+    or terminated.
+
+    Args:
+        command (Command): The root command
+        socket_path (str): Path of the Unix domain socket to listen on
+        workers (int): Number of worker processes. If 0 is given,
+            requests are handled in this process.
+        timeout (:obj: float, optional): Seconds to wait for the request
+            of a client
+    """
+    server = Server(command, socket_path, workers, timeout)
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _remove_socket(path: str):
+    """Remove the socket left at `path`, but never the other files."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(
+            "'{}' exists and is not a socket.".format(path))
+    os.unlink(path)
+
+
+def _report_error(fd: int, exc: Exception):
+    """Write the error to stderr of the client."""
+    message = 'uroboros.server: {}\n'.format(exc).encode('utf-8', 'replace')
+    try:
+        os.write(fd, message)
+    except OSError:
+        pass
+
+
+def _freeze_heap():
+    """Move all objects to the permanent generation of the garbage
+    collector, so that it does not touch the memory pages shared with
+    forked processes."""
+    gc.collect()
+    # `gc.freeze` is available since Python 3.7
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def call(socket_path: str,
+         argv: 'List[str]',
+         env: 'Optional[Dict[str, str]]' = None,
+         cwd: 'Optional[str]' = None,
+         stdio: 'Sequence[int]' = _STDIO_FDS) -> int:
+    """Execute `argv` on the server and return its exit status.
+
+    Args:
+        socket_path (str): Path of the Unix domain socket of the server
+        argv (List[str]): Arguments to execute
+        env (:obj: Dict[str, str], optional): Environment variables.
+            If None is given, use the ones of this process.
+        cwd (:obj: str, optional): Working directory. If None is given,
+            use the one of this process.
+        stdio (Sequence[int]): File descriptors of stdin, stdout and stderr
+
+    Returns:
+        int: Exit status code
+    """
+    body = json.dumps({
+        'argv': list(argv),
+        'env': dict(os.environ) if env is None else env,
+        'cwd': os.getcwd() if cwd is None else cwd,
+    }).encode('utf-8')
+    data = _HEADER.pack(len(body)) + body
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        fds = array.array('i', stdio)
+        sent = sock.sendmsg(
+            [data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+        if sent < len(data):
+            sock.sendall(data[sent:])
+        return _STATUS.unpack(_recv_exactly(sock, _STATUS.size))[0]
+
+
+def _recv_exactly(sock: 'socket.socket', size: int,
+                  data: bytes = b'') -> bytes:
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("The connection is closed unexpectedly.")
+        data += chunk
+    return data
+
+
+def _recv_request(conn: 'socket.socket'
+                  ) -> 'Tuple[Dict[str, Any], List[int]]':
+    fds = array.array('i')
+    data, ancdata, _, _ = conn.recvmsg(
+        _BUFSIZE, socket.CMSG_LEN(len(_STDIO_FDS) * fds.itemsize))
+    for level, kind, cdata in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cdata[:len(cdata) - len(cdata) % fds.itemsize])
+    try:
+        data = _recv_exactly(conn, _HEADER.size, data)
+        size = _HEADER.size + _HEADER.unpack_from(data)[0]
+        data = _recv_exactly(conn, size, data)
+        request = json.loads(data[_HEADER.size:size].decode('utf-8'))
+    except Exception:
+        for fd in fds:
+            os.close(fd)
+        raise
+    return request, list(fds)
+
+
+def _flush():
+    for stream in (sys.stdout, sys.stderr):
+        if stream is not None:
+            stream.flush()
+
+
+@contextlib.contextmanager
+def _client_context(request: 'Dict[str, Any]',
+                    fds: 'List[int]') -> 'Iterator[None]':
+    """Switch stdio, working directory and environment variables to the
+    ones of the client, and restore them finally."""
+    _flush()
+    saved_fds = [os.dup(fd) for fd in _STDIO_FDS]
+    saved_stdin = sys.stdin
+    saved_cwd = os.getcwd()
+    saved_env = dict(os.environ)
+    try:
+        for fd, target in zip(fds, _STDIO_FDS):
+            os.dup2(fd, target)
+        # Do not read the data buffered for the previous client
+        sys.stdin = io.open(
+            _STDIO_FDS[0], 'r', closefd=False,
+            encoding=getattr(saved_stdin, 'encoding', None))
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        yield
+    finally:
+        _flush()
+        sys.stdin = saved_stdin
+        for fd, target in zip(saved_fds, _STDIO_FDS):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+def main(argv: 'Optional[List[str]]' = None) -> int:
+    """Thin client executing the given arguments on the server."""
+    parser = argparse.ArgumentParser(
+        prog='python -m uroboros.server',
+        description='Execute a command on the uroboros server.')
+    parser.add_argument('socket', help='Path of the socket of the server')
+    parser.add_argument('args', nargs=argparse.REMAINDER,
+                        help='Arguments to execute')
+    args = parser.parse_args(argv)
+    return call(args.socket, args.args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,53 @@
+import sys
+from collections.abc import Awaitable
+from functools import lru_cache
+
+from uroboros.constants import TYPE_CHECKING, ExitStatus
+
+if TYPE_CHECKING:
+    import asyncio
+    import logging
+    from typing import (
+        Any, Dict, Iterable, Iterator, Optional, TextIO, Union)
+
+# `inspect.CO_COROUTINE`
+_CO_COROUTINE = 0x80
+_BUFSIZE = 65536
+
+
+class LazyLogger(object):
+    """Class attribute of the logger which imports `logging` when it is
+    used first.
+
+    Most executions log nothing, so that they need not pay for `logging`.
+    Accessing the attribute returns the `logging.Logger` itself.
+    """
+
+    def __init__(self, name: str):
+        self._logger_name = name
+        self._logger = None  # type: Optional[logging.Logger]
+
+    def __get__(self, instance: 'Any', owner: 'Any' = None) \
+            -> 'logging.Logger':
+        if self._logger is None:
+            import logging
+            self._logger = logging.getLogger(self._logger_name)
+        return self._logger
+
+
+@lru_cache(maxsize=None)
 def get_args_command_name(layer: int):
     """Return the specified layer's command name"""
     return "__layer{layer}_command".format(layer=layer)
 
 
+@lru_cache(maxsize=None)
 def get_args_validator_name(layer: int):
     """Return the specified layer's validator name"""
     return "__layer{layer}_validator".format(layer=layer)
 
 
+@lru_cache(maxsize=None)
 def get_args_section_name(layer: int):
     """Return the specified layer's parser name"""
     return "__layer{layer}_parser".format(layer=layer)
@@ -25,3 +65,127 @@ def call_one_by_one(objs, method_name: str, args, **kwargs):
             )
         args = getattr(obj, method_name)(args, **kwargs)
     return args
+
+
+def to_exit_status(exit_code: 'Any') -> 'ExitStatus':
+    """Convert the value returned by a command into `ExitStatus`"""
+    # FIXME: Just return when drop support for Python 3.5
+    try:
+        return ExitStatus(exit_code)
+    except ValueError:
+        if isinstance(exit_code, int):
+            if exit_code < 0 or exit_code > 255:
+                return ExitStatus.OUT_OF_RANGE
+        return ExitStatus.INVALID
+
+
+def get_exit_code(code: 'Any') -> int:
+    """Convert the code given to `SystemExit` into an exit status code.
+
+    A message given as the code is printed to stderr as python does.
+    """
+    if code is None:
+        return ExitStatus.SUCCESS
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return ExitStatus.FAILURE
+
+
+def aggregate_exit_status(statuses: 'Iterable[Union[ExitStatus, int]]'
+                          ) -> 'ExitStatus':
+    """Return the first exit status which is not success.
+
+    All statuses are consumed even if a failure is found.
+    """
+    result = ExitStatus.SUCCESS
+    for status in statuses:
+        if result == ExitStatus.SUCCESS:
+            result = to_exit_status(status)
+    return result
+
+
+def is_coroutine_function(func: 'Any') -> bool:
+    """Whether the function (or method) is defined with `async def`.
+
+    This does not import `asyncio` and `inspect` to keep startup fast.
+    """
+    func = getattr(func, '__func__', func)
+    code = getattr(func, '__code__', None)
+    return code is not None and bool(code.co_flags & _CO_COROUTINE)
+
+
+def is_awaitable(value: 'Any') -> bool:
+    """Whether the value can be used in `await` expression"""
+    return isinstance(value, Awaitable)
+
+
+async def maybe_await(value: 'Any') -> 'Any':
+    """Await the value if it is awaitable, or return it as it is."""
+    if is_awaitable(value):
+        return await value
+    return value
+
+
+def new_event_loop() -> 'asyncio.AbstractEventLoop':
+    import asyncio
+    return asyncio.new_event_loop()
+
+
+def run_until_complete(awaitable: 'Awaitable',
+                       loop: 'Optional[asyncio.AbstractEventLoop]' = None
+                       ) -> 'Any':
+    """Run the awaitable on the given loop or a new one until it completes.
+
+    The loop created by this function is closed finally.
+    """
+    if loop is not None:
+        return loop.run_until_complete(awaitable)
+    loop = new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        # `shutdown_asyncgens` is available since Python 3.6
+        if hasattr(loop, 'shutdown_asyncgens'):
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def iter_records(stream: 'TextIO', separator: str = '\n',
+                 bufsize: int = _BUFSIZE) -> 'Iterator[str]':
+    """Yield records of the stream without the separator.
+
+    The stream is read chunk by chunk, so that the whole of it is never
+    held in memory.
+    """
+    if separator == '\n':
+        for line in stream:
+            yield line[:-1] if line.endswith('\n') else line
+        return
+    rest = ''
+    while True:
+        chunk = stream.read(bufsize)
+        if not chunk:
+            break
+        records = (rest + chunk).split(separator)
+        rest = records.pop()
+        yield from records
+    if rest:
+        yield rest
+
+
+def build_prefix_table(names: 'Iterable[str]') -> 'Dict[str, Optional[str]]':
+    """Map each prefix of the names to the name which it abbreviates.
+
+    A prefix shared by several names is mapped to None unless it is one of
+    the names itself.
+    """
+    table = {}  # type: Dict[str, Optional[str]]
+    names = list(names)
+    for name in names:
+        for i in range(1, len(name) + 1):
+            prefix = name[:i]
+            table[prefix] = name if prefix not in table else None
+    for name in names:
+        table[name] = name
+    return table